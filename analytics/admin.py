@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import UtilizationRollup
+
+
+@admin.register(UtilizationRollup)
+class UtilizationRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        'room', 'date', 'hour', 'booked_minutes', 'seat_minutes',
+        'adult_headcount', 'child_headcount'
+    ]
+    list_filter = ['date', 'room__room_type']
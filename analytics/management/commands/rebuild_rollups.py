@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the utilization rollups from the bookings tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', default=None, help='First date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end_date', default=None, help='Last date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups(options['start_date'], options['end_date'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} utilization rollup rows'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UtilizationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('booked_minutes', models.PositiveIntegerField(default=0)),
+                ('seat_minutes', models.PositiveIntegerField(default=0)),
+                ('adult_headcount', models.PositiveIntegerField(default=0)),
+                ('child_headcount', models.PositiveIntegerField(default=0)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='utilization_rollups', to='rooms.room')),
+            ],
+            options={
+                'ordering': ['date', 'hour', 'room'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='utilizationrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'room', 'hour'), name='unique_rollup_room_hour'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import models
+from rooms.models import Room
+
+
+class UtilizationRollup(models.Model):
+    """
+    Pre-aggregated usage of one room for one business hour of one day.
+    Maintained incrementally as bookings are created and cancelled, and
+    rebuildable from the bookings tables with the rebuild_rollups command.
+    """
+    
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='utilization_rollups')
+    date = models.DateField()
+    hour = models.PositiveSmallIntegerField()
+    
+    # Minutes booked within the hour, summed over bookings
+    booked_minutes = models.PositiveIntegerField(default=0)
+    # Booked minutes weighted by the seats each booking occupies
+    seat_minutes = models.PositiveIntegerField(default=0)
+    # People present at some point during the hour
+    adult_headcount = models.PositiveIntegerField(default=0)
+    child_headcount = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date', 'hour', 'room']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'room', 'hour'], name='unique_rollup_room_hour'),
+        ]
+    
+    def __str__(self):
+        return f"{self.room} on {self.date} {self.hour:02d}:00"
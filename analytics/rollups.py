@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from core.occupancy import CHILD_AGE
+from core.sites import get_site_database
+from bookings.models import Booking, ArchivedBooking
+from .models import UtilizationRollup
+
+ROLLUP_FIELDS = ['booked_minutes', 'seat_minutes', 'adult_headcount', 'child_headcount']
+
+
+def hourly_slices(start_time, end_time):
+    """Yield (hour, minutes) for every hour a time window touches."""
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    for hour in range(start // 60, (end + 59) // 60):
+        minutes = min(end, (hour + 1) * 60) - max(start, hour * 60)
+        if minutes > 0:
+            yield hour, minutes
+
+
+def get_headcount(booking):
+    """(adults, children) a booking brings, using User.is_child."""
+    if booking.team_id:
+        return booking.team.adult_member_count, booking.team.child_member_count
+    return (0, 1) if booking.user.is_child else (1, 0)
+
+
+def get_deltas(booking, adults, children):
+    """Rollup increments per hour for one booking."""
+    return {
+        hour: {
+            'booked_minutes': minutes,
+            'seat_minutes': minutes * adults,
+            'adult_headcount': adults,
+            'child_headcount': children,
+        }
+        for hour, minutes in hourly_slices(booking.start_time, booking.end_time)
+    }
+
+
+def apply_booking(booking, sign):
+    """Add (sign=1) or remove (sign=-1) a booking's usage from the rollups."""
+    adults, children = get_headcount(booking)
+    deltas = get_deltas(booking, adults, children)
+    if not deltas:
+        return
+    
+    with transaction.atomic(using=get_site_database()):
+        UtilizationRollup.objects.bulk_create(
+            [UtilizationRollup(room_id=booking.room_id, date=booking.date, hour=hour) for hour in deltas],
+            ignore_conflicts=True,
+        )
+        for hour, delta in deltas.items():
+            UtilizationRollup.objects.filter(
+                room_id=booking.room_id, date=booking.date, hour=hour
+            ).update(**{field: F(field) + sign * value for field, value in delta.items()})
+
+
+def rebuild_rollups(start_date=None, end_date=None, batch_size=1000):
+    """
+    Recompute rollups from scratch for an optional date range.
+    Live ACTIVE/COMPLETED bookings and archived COMPLETED ones are counted.
+    Returns the number of rollup rows written.
+    """
+    date_filter = Q()
+    if start_date:
+        date_filter &= Q(date__gte=start_date)
+    if end_date:
+        date_filter &= Q(date__lte=end_date)
+    
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    sources = [
+        Booking.objects.filter(date_filter, status__in=['ACTIVE', 'COMPLETED']),
+        ArchivedBooking.objects.filter(date_filter, status='COMPLETED'),
+    ]
+    for queryset in sources:
+        # Team headcounts come from one annotated query instead of two per booking
+        queryset = queryset.select_related('user').annotate(
+            team_adults=Count('team__members', filter=Q(team__members__age__gte=CHILD_AGE)),
+            team_children=Count('team__members', filter=Q(team__members__age__lt=CHILD_AGE)),
+        ).order_by()
+        for booking in queryset.iterator(chunk_size=batch_size):
+            if booking.team_id:
+                adults, children = booking.team_adults, booking.team_children
+            else:
+                adults, children = (0, 1) if booking.user.is_child else (1, 0)
+            for hour, delta in get_deltas(booking, adults, children).items():
+                row = totals[(booking.room_id, booking.date, hour)]
+                for field, value in delta.items():
+                    row[field] += value
+    
+    with transaction.atomic(using=get_site_database()):
+        UtilizationRollup.objects.filter(date_filter).delete()
+        rows = [
+            UtilizationRollup(room_id=room_id, date=date, hour=hour, **values)
+            for (room_id, date, hour), values in totals.items()
+        ]
+        UtilizationRollup.objects.bulk_create(rows, batch_size=batch_size)
+    
+    return len(rows)
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from rooms.models import Room
+
+
+class UtilizationQuerySerializer(serializers.Serializer):
+    """Serializer for utilization range queries."""
+    
+    GROUP_BY_CHOICES = ['room', 'room_type', 'day', 'hour']
+    
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    group_by = serializers.ChoiceField(choices=GROUP_BY_CHOICES, default='room')
+    room_type = serializers.ChoiceField(choices=Room.ROOM_TYPES, required=False)
+    room = serializers.IntegerField(required=False)
+    
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date must not be before start date.")
+        
+        if (data['end_date'] - data['start_date']).days > 366:
+            raise serializers.ValidationError("Date range cannot exceed one year.")
+        
+        return data
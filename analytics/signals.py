@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from bookings.signals import get_booking_change
+from .rollups import apply_booking
+
+
+@receiver(post_save, sender=Booking)
+def update_utilization_rollups(sender, instance, created, update_fields=None, **kwargs):
+    """Keep rollups in step with bookings, inside the booking's transaction."""
+    change = get_booking_change(instance, created, update_fields)
+    if change == 'created':
+        apply_booking(instance, 1)
+    elif change == 'cancelled':
+        apply_booking(instance, -1)
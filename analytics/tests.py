@@ -0,0 +1,45 @@
+from analytics.models import UtilizationRollup
+from analytics.rollups import ROLLUP_FIELDS, rebuild_rollups
+from bookings.tests import BookingAPITestCase, make_room, make_team, make_user
+
+
+def rollup_rows():
+    return {
+        (row['room_id'], row['date'], row['hour']): tuple(row[field] for field in ROLLUP_FIELDS)
+        for row in UtilizationRollup.objects.values('room_id', 'date', 'hour', *ROLLUP_FIELDS)
+    }
+
+
+class UtilizationRollupTests(BookingAPITestCase):
+    """Rollups follow bookings incrementally and match a full rebuild."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.kid = make_user('kid', age=6)
+        self.team = make_team('Family', [self.user, make_user('grace'), self.kid])
+        self.desk = make_room('D1', 'SHARED', capacity=8)
+    
+    def test_increments_on_create_and_cancel(self):
+        booking_id = self.book(self.desk, '09:30', '11:00', user=self.user).json()['booking']['booking_id']
+        self.book(self.desk, '10:00', '10:30', team=self.team)
+        self.assertEqual(rollup_rows(), {
+            (self.desk.pk, self.day, 9): (30, 30, 1, 0),
+            (self.desk.pk, self.day, 10): (90, 120, 3, 1),
+        })
+        
+        self.client.post(f'/api/v1/cancel/{booking_id}/')
+        self.assertEqual(rollup_rows(), {
+            (self.desk.pk, self.day, 9): (0, 0, 0, 0),
+            (self.desk.pk, self.day, 10): (30, 60, 2, 1),
+        })
+    
+    def test_rebuild_matches_incremental_rollups(self):
+        booking_id = self.book(self.desk, '09:00', '12:00', user=self.user).json()['booking']['booking_id']
+        self.book(self.desk, '10:15', '11:45', team=self.team)
+        self.book(self.desk, '13:00', '14:00', user=self.kid)
+        self.client.post(f'/api/v1/cancel/{booking_id}/')
+        incremental = {key: values for key, values in rollup_rows().items() if any(values)}
+        
+        rebuild_rollups()
+        self.assertEqual(rollup_rows(), incremental)
@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+from django.db.models import Case, F, Max, Sum, When
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from rooms.models import Room
+from .models import UtilizationRollup
+from .serializers import UtilizationQuerySerializer
+
+BUSINESS_HOURS = range(9, 18)
+
+GROUP_FIELDS = {
+    'room': ['room_id', 'room__room_number', 'room__room_type'],
+    'room_type': ['room__room_type'],
+    'day': ['date'],
+    'hour': ['hour'],
+}
+
+
+def get_capacity_minutes(rooms, days, group_by):
+    """
+    Bookable minutes per group. Exclusive rooms offer 60 minutes per hour;
+    shared desks offer 60 seat-minutes per seat per hour.
+    """
+    capacity = defaultdict(int)
+    for room in rooms:
+        seats = room.capacity if room.is_shared_desk else 1
+        if group_by == 'room':
+            capacity[room.pk] += seats * 60 * len(BUSINESS_HOURS) * days
+        elif group_by == 'room_type':
+            capacity[room.room_type] += seats * 60 * len(BUSINESS_HOURS) * days
+        elif group_by == 'day':
+            capacity['all'] += seats * 60 * len(BUSINESS_HOURS)
+        else:
+            capacity['all'] += seats * 60 * days
+    return capacity
+
+
+@api_view(['GET'])
+def utilization(request):
+    """Room utilization over a date range, answered from the hourly rollups."""
+    serializer = UtilizationQuerySerializer(data=request.query_params)
+    
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    data = serializer.validated_data
+    group_by = data['group_by']
+    
+    rooms = Room.objects.filter(is_active=True)
+    if data.get('room_type'):
+        rooms = rooms.filter(room_type=data['room_type'])
+    if data.get('room'):
+        rooms = rooms.filter(pk=data['room'])
+    rooms = list(rooms)
+    
+    rollups = UtilizationRollup.objects.filter(
+        date__gte=data['start_date'],
+        date__lte=data['end_date'],
+        room__in=rooms,
+    )
+    rows = rollups.values(*GROUP_FIELDS[group_by]).annotate(
+        total_booked_minutes=Sum('booked_minutes'),
+        total_seat_minutes=Sum('seat_minutes'),
+        total_adult_headcount=Sum('adult_headcount'),
+        total_child_headcount=Sum('child_headcount'),
+        peak_headcount=Max('adult_headcount'),
+        # Shared desks are measured in seat-minutes, other rooms in minutes
+        used_minutes=Sum(Case(
+            When(room__room_type='SHARED', then=F('seat_minutes')),
+            default=F('booked_minutes'),
+        )),
+    ).order_by(*GROUP_FIELDS[group_by])
+    
+    days = (data['end_date'] - data['start_date']).days + 1
+    capacity = get_capacity_minutes(rooms, days, group_by)
+    
+    results = []
+    for row in rows:
+        if group_by == 'room':
+            key = row['room_id']
+            result = {
+                'room': row['room_id'],
+                'room_number': row['room__room_number'],
+                'room_type': row['room__room_type'],
+            }
+        elif group_by == 'room_type':
+            key = row['room__room_type']
+            result = {'room_type': key}
+        else:
+            key = 'all'
+            result = {'date': row['date']} if group_by == 'day' else {'hour': row['hour']}
+        
+        result.update({
+            'booked_minutes': row['total_booked_minutes'],
+            'seat_minutes': row['total_seat_minutes'],
+            'adult_headcount': row['total_adult_headcount'],
+            'child_headcount': row['total_child_headcount'],
+            'peak_headcount': row['peak_headcount'],
+            'utilization': round(row['used_minutes'] / capacity[key], 4) if capacity[key] else 0,
+        })
+        results.append(result)
+    
+    return Response({
+        'start_date': data['start_date'],
+        'end_date': data['end_date'],
+        'group_by': group_by,
+        'results': results,
+    })
@@ -0,0 +1,144 @@
+"""
+Standalone benchmark of the occupancy engine (core.occupancy).
+
+No Django, no database: builds one day with `--bookings` bookings spread
+over private rooms, conference rooms and large shared desks, then times
+
+- loading the day into per-room sorted interval lists;
+- single-room checks (has_free_seat / fits), as used when booking;
+- the full availability scan of every room, as served by available_rooms;
+- ranking the rooms of each type, as done by auto-booking;
+
+against a linear scan of each room's bookings for the single-room check.
+
+    python benchmarks/occupancy.py [--bookings 100000] [--queries 20000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.occupancy import (  # noqa: E402
+    CLOSING_MINUTE, CONFERENCE, OPENING_MINUTE, PRIVATE, SHARED, DaySchedule, Interval,
+)
+
+DURATIONS = [15, 30, 60, 90, 120, 240]
+
+
+def make_rooms(count):
+    """(room id, type, capacity) with a mix close to the default layout, desks scaled up."""
+    rooms = []
+    for room_id in range(count):
+        kind = random.random()
+        if kind < 0.55:
+            rooms.append((room_id, PRIVATE, 1))
+        elif kind < 0.75:
+            rooms.append((room_id, CONFERENCE, 8))
+        else:
+            rooms.append((room_id, SHARED, 400))
+    return rooms
+
+
+def random_window():
+    start = random.randrange(OPENING_MINUTE, CLOSING_MINUTE - 15, 15)
+    return start, min(start + random.choice(DURATIONS), CLOSING_MINUTE)
+
+
+def make_bookings(rooms, count):
+    """
+    (room id, Interval) pairs. Exclusive rooms get non-overlapping slots
+    from a packed timetable; shared desks take the rest, overlapping freely.
+    """
+    bookings = []
+    shared = [room for room in rooms if room[1] == SHARED]
+    for room_id, room_type, _ in rooms:
+        if room_type == SHARED:
+            continue
+        minute = OPENING_MINUTE
+        while len(bookings) < count // 4:
+            minute += random.choice([0, 15, 30])
+            end = minute + random.choice(DURATIONS[:3])
+            if end > CLOSING_MINUTE:
+                break
+            bookings.append((room_id, Interval(minute, end, 1)))
+            minute = end
+    while len(bookings) < count:
+        room_id = random.choice(shared)[0]
+        start, end = random_window()
+        bookings.append((room_id, Interval(start, end, random.choice([0, 1, 1, 1, 3]))))
+    return bookings
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / repeat
+    unit, scale = ('ms', 1e3) if per_call >= 1e-3 else ('us', 1e6)
+    print(f"{label:<44}{per_call * scale:>10.1f} {unit}")
+    return result
+
+
+def linear_has_free_seat(intervals, room_type, capacity, start, end):
+    overlapping = [interval for interval in intervals if interval.start < end and interval.end > start]
+    if room_type == SHARED:
+        return sum(interval.seats for interval in overlapping) < capacity
+    return not overlapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bookings', type=int, default=100_000)
+    parser.add_argument('--rooms', type=int, default=2_000)
+    parser.add_argument('--queries', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    rooms = make_rooms(args.rooms)
+    bookings = make_bookings(rooms, args.bookings)
+    print(f"{len(bookings)} bookings on {len(rooms)} rooms\n")
+
+    def build():
+        day = DaySchedule()
+        for room_id, room_type, capacity in rooms:
+            day.add_room(room_id, room_type, capacity, f'R{room_id:05d}')
+        for room_id, interval in bookings:
+            day.add(room_id, interval)
+        return day
+
+    day = timed('load day', build)
+
+    queries = [(random.choice(rooms), *random_window()) for _ in range(args.queries)]
+    by_room = {}
+    for room_id, interval in bookings:
+        by_room.setdefault(room_id, []).append(interval)
+
+    def engine_checks():
+        return [day.rooms[room[0]].has_free_seat(start, end) for room, start, end in queries]
+
+    def linear_checks():
+        return [
+            linear_has_free_seat(by_room.get(room_id, []), room_type, capacity, start, end)
+            for (room_id, room_type, capacity), start, end in queries
+        ]
+
+    engine = timed(f'{args.queries} has_free_seat, sorted intervals', engine_checks)
+    linear = timed(f'{args.queries} has_free_seat, linear scan', linear_checks)
+    assert engine == linear, 'engine and linear scan disagree'
+
+    timed(f'{args.queries} fits(3 seats)', lambda: [
+        day.rooms[room[0]].fits(start, end, 3) for room, start, end in queries
+    ])
+
+    timed('available(), every room', lambda: day.available(*random_window()), repeat=20)
+    for room_type in (PRIVATE, CONFERENCE, SHARED):
+        timed(f'rank({room_type.lower()})', lambda: day.rank(*random_window(), 2, room_type), repeat=20)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Per-request overhead of the full settings against the API-only profile.
+
+Each profile runs in its own interpreter (settings are per process) on a
+throwaway database and serves the same requests through the complete
+middleware stack in-process, so the difference is framework work:
+
+- a conditional GET of /api/v1/rooms/ answered with 304 (one version
+  query, no serialization: mostly middleware and routing);
+- a full GET of /api/v1/rooms/;
+- GET /api/v1/rooms/ with credentials (session cookie for the full
+  profile, token header for the API profile).
+
+    python benchmarks/request_overhead.py [--requests 2000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    'full': 'config.settings',
+    'api': 'config.settings_api',
+}
+
+SETTINGS = """\
+from {module} import *
+
+ALLOWED_HOSTS = ['*']
+for _alias, _database in DATABASES.items():
+    _database['NAME'] = {tmp!r} + '/' + _alias + '.sqlite3'
+"""
+
+
+def timed(client, count, path, **headers):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.get(path, **headers)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code in (200, 304), response.status_code
+    samples.sort()
+    return {
+        'median': statistics.median(samples) * 1e6,
+        'p95': samples[int(len(samples) * 0.95)] * 1e6,
+    }
+
+
+def measure(profile, count):
+    """Runs inside the child process, with DJANGO_SETTINGS_MODULE set."""
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from rest_framework.authtoken.models import Token
+    from rooms.provisioning import DEFAULT_SPEC, provision
+    from users.models import User
+
+    call_command('migrate', verbosity=0)
+    provision(DEFAULT_SPEC)
+    user = User.objects.create_user('bench', 'bench@example.com', 'bench', age=30, gender='M')
+
+    client = Client()
+    etag = client.get('/api/v1/rooms/')['ETag']
+
+    if 'django.contrib.sessions' in settings.INSTALLED_APPS:
+        authed = Client()
+        authed.force_login(user)
+        auth_headers = {}
+    else:
+        authed = client
+        auth_headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=user).key}'}
+
+    # Warm-up: URL resolver, middleware chain, caches
+    timed(client, 50, '/api/v1/rooms/')
+    return {
+        'middleware': len(settings.MIDDLEWARE),
+        '304': timed(client, count, '/api/v1/rooms/', HTTP_IF_NONE_MATCH=etag),
+        '200': timed(client, count, '/api/v1/rooms/'),
+        'authed 200': timed(authed, count, '/api/v1/rooms/', **auth_headers),
+    }
+
+
+def run_profile(profile, count):
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, 'bench_settings.py').write_text(
+            SETTINGS.format(module=PROFILES[profile], tmp=tmp)
+        )
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([tmp, str(ROOT)])
+        env['DJANGO_SETTINGS_MODULE'] = 'bench_settings'
+        result = subprocess.run(
+            [sys.executable, __file__, '--requests', str(count), '--child', profile],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+        )
+        return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--child', choices=list(PROFILES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.requests)))
+        return
+
+    results = {profile: run_profile(profile, args.requests) for profile in PROFILES}
+    print(f"{'':<14}" + ''.join(
+        f"{profile} ({result['middleware']} mw)".rjust(24) for profile, result in results.items()
+    ))
+    for case in ('304', '200', 'authed 200'):
+        cells = ''.join(
+            f"{result[case]['median']:>9.0f}us p95 {result[case]['p95']:>6.0f}us"
+            for result in results.values()
+        )
+        print(f"{case:<14}{cells}")
+
+
+if __name__ == '__main__':
+    main()
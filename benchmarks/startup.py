@@ -0,0 +1,106 @@
+"""
+Container start-up benchmark.
+
+Times, each in fresh interpreters like a real container start:
+
+- the old entrypoint (migrate, setup_rooms, a `shell -c` superuser
+  check: three processes) against `manage.py bootstrap`, on an empty
+  database and again on an already initialized one;
+- `django.setup()` alone, what every management command pays;
+- `django.setup()` plus loading the URLconf, what a web worker pays
+  before serving its first request.
+
+Runs against throwaway databases in a temporary directory:
+
+    python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SETTINGS = """\
+from config.settings import *
+
+for _alias, _database in DATABASES.items():
+    _database['NAME'] = {tmp!r} + '/' + _alias + '.sqlite3'
+"""
+
+SUPERUSER_SNIPPET = """
+from django.contrib.auth import get_user_model
+User = get_user_model()
+if not User.objects.filter(username='admin').exists():
+    User.objects.create_superuser('admin', 'admin@example.com', 'admin123', age=30, gender='M')
+"""
+
+OLD_ENTRYPOINT = [
+    ['manage.py', 'migrate', '-v0'],
+    ['manage.py', 'setup_rooms'],
+    ['manage.py', 'shell', '-c', SUPERUSER_SNIPPET],
+]
+BOOTSTRAP = [['manage.py', 'bootstrap']]
+
+SETUP = "import django; django.setup()"
+URLCONF = SETUP + "; from django.urls import get_resolver; get_resolver().url_patterns"
+
+
+def run(commands, env):
+    start = time.perf_counter()
+    for command in commands:
+        subprocess.run(
+            [sys.executable, *command], cwd=ROOT, env=env, check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    return time.perf_counter() - start
+
+
+def make_env(tmp):
+    Path(tmp, 'bench_settings.py').write_text(SETTINGS.format(tmp=tmp))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([tmp, str(ROOT)])
+    env['DJANGO_SETTINGS_MODULE'] = 'bench_settings'
+    return env
+
+
+def time_start(commands, runs):
+    """(cold, warm) medians: on an empty database, then on an initialized one."""
+    cold, warm = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = make_env(tmp)
+            cold.append(run(commands, env))
+            warm.append(run(commands, env))
+    return statistics.median(cold), statistics.median(warm)
+
+
+def time_import(code, runs):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = make_env(tmp)
+        return statistics.median(
+            run([['-c', code]], env) for _ in range(runs)
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'':<28}{'cold':>10}{'warm':>10}")
+    for name, commands in [('old entrypoint (3 procs)', OLD_ENTRYPOINT), ('bootstrap', BOOTSTRAP)]:
+        cold, warm = time_start(commands, args.runs)
+        print(f"{name:<28}{cold * 1000:>8.0f}ms{warm * 1000:>8.0f}ms")
+
+    print()
+    print(f"{'django.setup()':<28}{time_import(SETUP, args.runs) * 1000:>8.0f}ms")
+    print(f"{'setup + URLconf':<28}{time_import(URLCONF, args.runs) * 1000:>8.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
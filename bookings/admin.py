@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking
+from .models import Booking, ArchivedBooking, BookingSeries, OutboxMessage, WaitlistEntry
 
 
 @admin.register(Booking)
@@ -11,3 +11,43 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ['status', 'date', 'room__room_type']
     search_fields = ['booking_id', 'user__username', 'team__name']
     readonly_fields = ['booking_id', 'created_at', 'updated_at']
+
+
+@admin.register(BookingSeries)
+class BookingSeriesAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'room', 'booker_name', 'frequency', 'interval', 'weekdays',
+        'start_date', 'end_date', 'start_time', 'end_time', 'status'
+    ]
+    list_filter = ['status', 'frequency', 'room__room_type']
+    search_fields = ['user__username', 'team__name']
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = [
+        'booking_id', 'room', 'date', 'start_time', 'end_time',
+        'status', 'archived_at'
+    ]
+    list_filter = ['status', 'date']
+    search_fields = ['booking_id', 'user__username', 'team__name']
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'event', 'channel', 'target', 'status', 'attempts',
+        'next_attempt_at', 'created_at', 'sent_at'
+    ]
+    list_filter = ['status', 'channel', 'event']
+    search_fields = ['target', 'last_error']
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'room', 'room_type', 'booker_name', 'date', 'start_time',
+        'end_time', 'status', 'booking', 'created_at'
+    ]
+    list_filter = ['status', 'date', 'room_type']
+    search_fields = ['user__username', 'team__name']
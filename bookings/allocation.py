@@ -0,0 +1,68 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.occupancy import to_minutes
+from core.sites import get_site_database
+from rooms.models import Room
+from .availability import load_day
+from .models import Booking
+
+
+def rank_rooms(room_type, date, start_time, end_time, occupancy):
+    """
+    Rank the free rooms of a type for a window, best candidate first
+    (see DaySchedule.rank). The day's layout for every room of the type
+    is loaded at once.
+    """
+    rooms = {room.pk: room for room in Room.objects.filter(is_active=True, room_type=room_type)}
+    day = load_day(rooms.values(), date)
+    ranked = day.rank(to_minutes(start_time), to_minutes(end_time), occupancy)
+    return [rooms[schedule.room_id] for schedule in ranked]
+
+
+def auto_book(room_type, date, start_time, end_time, user=None, team=None):
+    """
+    Pick the best room of a type and book it.
+    If a concurrent request takes the chosen room first, the next best
+    candidate is tried instead of failing back to the client.
+    Raises ValidationError if no room can be booked.
+    """
+    template = Booking(date=date, start_time=start_time, end_time=end_time, user=user, team=team)
+    
+    candidates = rank_rooms(room_type, date, start_time, end_time, template.occupancy_count)
+    if not candidates:
+        raise ValidationError("No available room for the selected slot and type.")
+    
+    # Room type rules are the same for every candidate, check them once
+    template.room = candidates[0]
+    errors = template.get_rule_errors()
+    if errors:
+        raise ValidationError(errors)
+    
+    last_error = ValidationError("No available room for the selected slot and type.")
+    for room in candidates:
+        booking = Booking(
+            room=room, date=date, start_time=start_time, end_time=end_time, user=user, team=team
+        )
+        try:
+            with transaction.atomic(using=get_site_database()):
+                # Booking.clean re-checks exclusive rooms; shared desk
+                # capacity is re-checked here inside the same transaction
+                if room.is_shared_desk and not shared_desk_has_room(booking):
+                    continue
+                booking.save()
+            return booking
+        except ValidationError as e:
+            last_error = e
+    
+    raise last_error
+
+
+def shared_desk_has_room(booking):
+    """Whether a shared desk still has room for the booking's seats in its window."""
+    day = load_day(
+        [booking.room], booking.date, booking.start_time, booking.end_time, use_snapshot=False
+    )
+    return day.rooms[booking.room.pk].fits(
+        to_minutes(booking.start_time), to_minutes(booking.end_time), booking.occupancy_count
+    )
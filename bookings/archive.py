@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.sites import get_site_database
+from .models import Booking, ArchivedBooking
+
+
+def get_archive_cutoff(horizon_days=None):
+    """Bookings dated before the returned day are eligible for archiving."""
+    if horizon_days is None:
+        horizon_days = settings.BOOKING_ARCHIVE_HORIZON_DAYS
+    return timezone.localdate() - timedelta(days=horizon_days)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Move one batch of bookings dated before ``cutoff`` to the archive table.
+    Returns the number of bookings moved.
+    """
+    with transaction.atomic(using=get_site_database()):
+        batch = list(
+            Booking.objects.filter(date__lt=cutoff).order_by('date', 'pk')[:batch_size]
+        )
+        if not batch:
+            return 0
+        
+        archived = []
+        for booking in batch:
+            row = ArchivedBooking.from_booking(booking)
+            # Past bookings that were never cancelled have been used
+            if row.status == 'ACTIVE':
+                row.status = 'COMPLETED'
+            archived.append(row)
+        
+        ArchivedBooking.objects.bulk_create(archived)
+        Booking.objects.filter(pk__in=[booking.pk for booking in batch]).delete()
+    
+    return len(batch)
+
+
+def archive_bookings(cutoff=None, batch_size=None, max_batches=None):
+    """
+    Archive every booking dated before ``cutoff`` in bounded batches.
+    Each batch runs in its own transaction so the write lock is held briefly.
+    """
+    if cutoff is None:
+        cutoff = get_archive_cutoff()
+    if batch_size is None:
+        batch_size = settings.BOOKING_ARCHIVE_BATCH_SIZE
+    
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    
+    return total
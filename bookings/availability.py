@@ -0,0 +1,98 @@
+from datetime import time
+
+from core.occupancy import DaySchedule, Interval, to_minutes
+from rooms.models import Room
+from .holds import hold_store
+from .models import Booking
+from .snapshots import availability_snapshots, booking_rows
+
+
+def new_day(rooms):
+    """An empty DaySchedule for Room instances."""
+    day = DaySchedule()
+    for room in rooms:
+        day.add_room(room.pk, room.room_type, room.capacity, room.room_number)
+    return day
+
+
+def fill_bookings(day, date, start_time=None, end_time=None, use_snapshot=True):
+    """
+    Add the ACTIVE bookings of the day's rooms: from the warmed snapshot when
+    allowed and present, otherwise in one query (only those overlapping the
+    window, if one is given).
+    """
+    entries = availability_snapshots.get_day(date) if use_snapshot else None
+    if entries is not None:
+        for room_id, schedule in day.rooms.items():
+            for pk, (start, end, seats) in entries.get(room_id, {}).items():
+                schedule.add(Interval(start, end, seats, pk))
+        return
+    
+    bookings = Booking.objects.filter(room_id__in=list(day.rooms), date=date, status='ACTIVE')
+    if start_time is not None:
+        bookings = bookings.filter(start_time__lt=end_time, end_time__gt=start_time)
+    for pk, room_id, _, start, end, seats in booking_rows(bookings):
+        day.add(room_id, Interval(start, end, seats, pk))
+
+
+def fill_holds(day, date, start_time=None, end_time=None, exclude_hold=None):
+    """Add live holds from the hold store, except `exclude_hold`."""
+    start_time = start_time or time.min
+    end_time = end_time or time.max
+    for room_id, schedule in day.rooms.items():
+        for hold in hold_store.overlapping(room_id, date, start_time, end_time, exclude_hold):
+            schedule.add(Interval(
+                to_minutes(hold['start_time']), to_minutes(hold['end_time']),
+                hold['occupancy'], hold['hold_id'],
+            ))
+
+
+def load_day(rooms, date, start_time=None, end_time=None, exclude_hold=None, use_snapshot=True):
+    """
+    Everything the occupancy engine needs about `rooms` on `date`: their
+    bookings and holds, limited to the window if one is given. Checks made
+    inside a write transaction pass use_snapshot=False to read the database.
+    """
+    day = new_day(rooms)
+    fill_bookings(day, date, start_time, end_time, use_snapshot)
+    fill_holds(day, date, start_time, end_time, exclude_hold)
+    return day
+
+
+def load_available_rooms(date, start_time, end_time, room_type=None, location=None):
+    """
+    Rooms that can take the window, as (room, occupancy, available capacity).
+    
+    On a warmed day the rooms come from the snapshot and `room` is their
+    serialized form, so no query runs; otherwise `room` is a Room instance
+    and rooms and bookings take one query each.
+    """
+    snapshot_rooms = availability_snapshots.get_rooms()
+    warmed = snapshot_rooms is not None and availability_snapshots.get_day(date) is not None
+    
+    if warmed:
+        day = DaySchedule()
+        rooms = {}
+        for room in snapshot_rooms:
+            if room_type and room['room_type'] != room_type:
+                continue
+            if location and room['location'] != location:
+                continue
+            day.add_room(room['id'], room['room_type'], room['capacity'])
+            rooms[room['id']] = room['data']
+    else:
+        queryset = Room.objects.filter(is_active=True)
+        if room_type:
+            queryset = queryset.filter(room_type=room_type)
+        if location:
+            queryset = queryset.filter(location__code=location)
+        rooms = {room.pk: room for room in queryset}
+        day = new_day(rooms.values())
+    
+    fill_bookings(day, date, start_time, end_time, use_snapshot=warmed)
+    fill_holds(day, date, start_time, end_time)
+    return [
+        (rooms[schedule.room_id], occupancy, available_capacity)
+        for schedule, occupancy, available_capacity
+        in day.available(to_minutes(start_time), to_minutes(end_time))
+    ]
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """An async stream of events delivered to one SSE client."""
+    
+    def __init__(self, broker, max_queue_size):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+    
+    def deliver(self, event):
+        """Thread-safe hand-off of an event to the subscriber's event loop."""
+        self.loop.call_soon_threadsafe(self._put, event)
+    
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client that cannot keep up misses events rather than
+            # growing memory without bound; it resyncs by polling once
+            pass
+    
+    async def get(self):
+        return await self.queue.get()
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class BaseBroker:
+    """
+    Interface for fanning booking events out to SSE subscribers.
+    
+    The in-process broker only reaches clients connected to the same worker.
+    Multi-worker deployments should plug in a broker backed by a shared
+    channel (e.g. Redis pub/sub) that calls ``deliver_local`` for every
+    message it receives, via the BOOKING_EVENT_BROKER setting.
+    """
+    
+    max_queue_size = 100
+    
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    def publish(self, event):
+        """Send an event to every subscriber. Called from request threads."""
+        raise NotImplementedError
+    
+    def subscribe(self):
+        """Register a subscriber. Must be called from the event loop."""
+        subscription = Subscription(self, self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+    
+    def deliver_local(self, event):
+        """Deliver an event to the subscribers connected to this process."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+class InProcessBroker(BaseBroker):
+    """Pub/sub between threads and event loops of a single process."""
+    
+    def publish(self, event):
+        self.deliver_local(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured by BOOKING_EVENT_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.BOOKING_EVENT_BROKER)()
+    return _broker
+
+
+def booking_event(kind, booking):
+    """Compact availability delta for a created or cancelled booking."""
+    return {
+        'type': kind,
+        'booking_id': booking.booking_id,
+        'site': booking.site,
+        'room': booking.room_id,
+        'date': booking.date.isoformat(),
+        'start_time': booking.start_time.isoformat(),
+        'end_time': booking.end_time.isoformat(),
+        'occupancy': booking.occupancy_count,
+    }
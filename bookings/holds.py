@@ -0,0 +1,177 @@
+import secrets
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from core.locks import LockTimeout, cache_lock
+from core.sites import get_default_site
+
+
+class HoldStore:
+    """
+    Short-lived holds on a (room, date, time window), kept in the Django cache.
+    
+    Holds never touch the bookings table. Each (room, date) has one index
+    entry listing its holds so occupancy checks cost a single cache read,
+    and each (owner, date) another so quota checks do too. Reads skip
+    expired holds; an index is only written back, without them, under its
+    lock, and expires from the cache once its last hold has.
+    """
+    
+    key_prefix = 'booking-hold'
+    lock_timeout = 5
+    
+    def __init__(self, cache_alias=None, ttl=None):
+        self.cache_alias = cache_alias or settings.BOOKING_HOLD_CACHE
+        self.ttl = ttl or settings.BOOKING_HOLD_TTL_SECONDS
+    
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+    
+    def _hold_key(self, hold_id):
+        return f'{self.key_prefix}:{hold_id}'
+    
+    def _slot_key(self, room_id, date):
+        # Room ids are only unique within a site's database
+        return f'{self.key_prefix}:slot:{get_default_site()}:{room_id}:{date.isoformat()}'
+    
+    def _owner_key(self, date, user_id=None, team_id=None):
+        owner = f'team:{team_id}' if team_id is not None else f'user:{user_id}'
+        return f'{self.key_prefix}:owner:{get_default_site()}:{owner}:{date.isoformat()}'
+    
+    @contextmanager
+    def _index_lock(self, key):
+        """Serialize updates of one index across workers. Raises LockTimeout."""
+        with cache_lock(self.cache, key + ':lock', self.lock_timeout):
+            yield
+    
+    def _slot_lock(self, room_id, date):
+        return self._index_lock(self._slot_key(room_id, date))
+    
+    def _live(self, holds):
+        now = timezone.now()
+        return {hold_id: hold for hold_id, hold in (holds or {}).items() if hold['expires_at'] > now}
+    
+    def _load_index(self, key):
+        """
+        Return the live holds of an index. Never writes: an unlocked
+        write-back could drop a hold another worker has just added.
+        """
+        return self._live(self.cache.get(key))
+    
+    def _load_slot(self, room_id, date):
+        return self._load_index(self._slot_key(room_id, date))
+    
+    def _store_index(self, key, holds):
+        """Write an index. Call with its lock held."""
+        if not holds:
+            self.cache.delete(key)
+            return
+        last_expiry = max(hold['expires_at'] for hold in holds.values())
+        timeout = max(int((last_expiry - timezone.now()).total_seconds()) + 1, 1)
+        self.cache.set(key, holds, timeout)
+    
+    def _add_to_owner(self, hold):
+        key = self._owner_key(hold['date'], hold['user_id'], hold['team_id'])
+        with self._index_lock(key):
+            holds = self._load_index(key)
+            holds[hold['hold_id']] = hold
+            self._store_index(key, holds)
+    
+    def _remove_from_owner(self, hold):
+        key = self._owner_key(hold['date'], hold['user_id'], hold['team_id'])
+        with self._index_lock(key):
+            holds = self._load_index(key)
+            if holds.pop(hold['hold_id'], None) is not None:
+                self._store_index(key, holds)
+    
+    @contextmanager
+    def reserve(self, room, date):
+        """
+        Lock a (room, date) so an availability check and the hold it guards
+        happen atomically with respect to other holds. Raises LockTimeout
+        if the slot stays locked for lock_timeout seconds.
+        """
+        with self._slot_lock(room.pk, date):
+            yield
+    
+    def create(self, room, date, start_time, end_time, occupancy, user_id=None, team_id=None):
+        """Store a new hold and return it. Call inside ``reserve``."""
+        hold = {
+            'hold_id': 'HD' + secrets.token_hex(8).upper(),
+            'room_id': room.pk,
+            'date': date,
+            'start_time': start_time,
+            'end_time': end_time,
+            'occupancy': occupancy,
+            'user_id': user_id,
+            'team_id': team_id,
+            'expires_at': timezone.now() + timedelta(seconds=self.ttl),
+        }
+        # The owner's index goes first: if its lock times out nothing is held
+        if user_id is not None or team_id is not None:
+            self._add_to_owner(hold)
+        holds = self._load_slot(room.pk, date)
+        holds[hold['hold_id']] = hold
+        self._store_index(self._slot_key(room.pk, date), holds)
+        self.cache.set(self._hold_key(hold['hold_id']), hold, self.ttl)
+        return hold
+    
+    def get(self, hold_id):
+        """Return a hold, or None if it does not exist or has expired."""
+        hold = self.cache.get(self._hold_key(hold_id))
+        if hold is None or hold['expires_at'] <= timezone.now():
+            return None
+        return hold
+    
+    def release(self, hold_id):
+        """Drop a hold. Returns False if it was already gone."""
+        hold = self.cache.get(self._hold_key(hold_id))
+        if hold is None:
+            return False
+        
+        self.cache.delete(self._hold_key(hold_id))
+        try:
+            with self._slot_lock(hold['room_id'], hold['date']):
+                holds = self._load_slot(hold['room_id'], hold['date'])
+                if holds.pop(hold_id, None) is not None:
+                    self._store_index(self._slot_key(hold['room_id'], hold['date']), holds)
+            if hold['user_id'] is not None or hold['team_id'] is not None:
+                self._remove_from_owner(hold)
+        except LockTimeout:
+            # The hold can no longer be confirmed; its index entries keep
+            # counting against the slot and the owner's quota until it expires
+            pass
+        return True
+    
+    def overlapping(self, room_id, date, start_time, end_time, exclude=None):
+        """Live holds on a room overlapping the given window."""
+        return [
+            hold for hold_id, hold in self._load_slot(room_id, date).items()
+            if hold_id != exclude
+            and hold['start_time'] < end_time and hold['end_time'] > start_time
+        ]
+    
+    def get_occupancy(self, room_id, date, start_time, end_time, exclude=None):
+        """Headcount held on a room in the given window."""
+        return sum(
+            hold['occupancy']
+            for hold in self.overlapping(room_id, date, start_time, end_time, exclude)
+        )
+    
+    
+    def get_owner_holds(self, dates, user_id=None, team_id=None, exclude=None):
+        """Live holds of a user or team on each of `dates`, in one cache read."""
+        keys = {self._owner_key(date, user_id, team_id): date for date in dates}
+        found = self.cache.get_many(list(keys))
+        return {
+            keys[key]: [hold for hold_id, hold in self._live(holds).items() if hold_id != exclude]
+            for key, holds in found.items()
+        }
+
+
+hold_store = HoldStore()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.sites import use_site
+from bookings.archive import archive_bookings, get_archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move bookings older than the archive horizon into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.BOOKING_ARCHIVE_HORIZON_DAYS,
+            help='Archive bookings dated more than this many days ago',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.BOOKING_ARCHIVE_BATCH_SIZE,
+            help='Number of bookings moved per transaction',
+        )
+        parser.add_argument(
+            '--site',
+            choices=list(settings.SITE_DATABASES),
+            default=settings.DEFAULT_SITE,
+            help='Office site whose bookings are archived',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches (default: until done)',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff(options['days'])
+        with use_site(options['site']):
+            total = archive_bookings(
+                cutoff=cutoff,
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+            )
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Archived {total} bookings dated before {cutoff}')
+        )
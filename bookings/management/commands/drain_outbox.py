@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.sites import use_site
+from bookings.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued booking emails and webhooks from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help='Messages claimed per batch',
+        )
+        parser.add_argument(
+            '--site',
+            choices=list(settings.SITE_DATABASES),
+            action='append',
+            help='Drain only this site (repeatable; default: every site)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the outbox is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once every due message has been attempted',
+        )
+
+    def handle(self, *args, **options):
+        sites = options['site'] or list(settings.SITE_DATABASES)
+        worker = OutboxWorker(batch_size=options['batch_size'])
+        
+        try:
+            while True:
+                busy = False
+                for site in sites:
+                    with use_site(site):
+                        sent, failed = worker.drain_once()
+                    if sent or failed:
+                        busy = True
+                        self.stdout.write(f'[{site}] sent {sent}, failed {failed}')
+                
+                if busy:
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+        finally:
+            worker.close()
@@ -0,0 +1,70 @@
+from datetime import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Subquery
+from django.utils import timezone
+from bookings.models import Booking
+from users.models import Team
+
+
+class Command(BaseCommand):
+    help = 'Show query plans for the hot booking queries'
+
+    def get_checks(self):
+        """(label, queryset, expected index) for each query issued by the views."""
+        today = timezone.localdate()
+        start_time, end_time = time(10, 0), time(11, 0)
+        active = Booking.objects.filter(status='ACTIVE')
+        
+        return [
+            (
+                'availability.fill_bookings (check_availability / available_rooms)',
+                active.filter(
+                    room_id__in=[1, 2], date=today, start_time__lt=end_time, end_time__gt=start_time
+                ).annotate(adult_members=Count('team__members')).order_by(),
+                'booking_active_slot_idx',
+            ),
+            (
+                'Booking.check_overlapping_bookings',
+                active.filter(room_id=1, date=today),
+                'booking_active_slot_idx',
+            ),
+            (
+                'BookingListView',
+                active.select_related('room', 'user', 'team'),
+                'booking_active_recent_idx',
+            ),
+            (
+                'BookingDetailView',
+                Booking.objects.filter(booking_id='BK0'),
+                'sqlite_autoindex_bookings_booking',
+            ),
+            (
+                'UserBookingListView (own bookings)',
+                active.filter(
+                    Q(user_id=1) | Q(team_id__in=Subquery(
+                        Team.members.through.objects.filter(user_id=1).values('team_id')
+                    )),
+                    date__gte=today,
+                ),
+                'booking_user_status_date_idx',
+            ),
+            (
+                'TeamBookingListView',
+                active.filter(team_id=1, date__gte=today),
+                'booking_team_status_date_idx',
+            ),
+            (
+                'cancel_booking',
+                active.filter(booking_id='BK0'),
+                'sqlite_autoindex_bookings_booking',
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        # The index assertions themselves run under `manage.py test`
+        # (bookings.tests.BookingIndexTests); this only prints the plans
+        for label, queryset, expected_index in self.get_checks():
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label} (expects {expected_index})'))
+            self.stdout.write(plan)
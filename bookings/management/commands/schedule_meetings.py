@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from bookings.scheduling import MeetingScheduler, commit_plan
+from bookings.serializers import MeetingScheduleSerializer
+
+
+class Command(BaseCommand):
+    help = 'Pack a batch of team meeting requests (JSON file) into conference rooms'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='JSON file: {"date": ..., "requests": [{"team", "duration_minutes", "earliest", "latest"}]}',
+        )
+        parser.add_argument(
+            '--commit',
+            action='store_true',
+            help='Book the placed meetings instead of only printing the plan',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path']) as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+        
+        serializer = MeetingScheduleSerializer(data=payload)
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors))
+        
+        data = serializer.validated_data
+        plan = MeetingScheduler(data['date'], data['requests']).run()
+        
+        for placement in plan['placed']:
+            self.stdout.write(
+                f"#{placement['request']:<3} {placement['team'].name:<20} "
+                f"{placement['room'].room_number} {placement['start_time']}-{placement['end_time']}"
+            )
+        for miss in plan['unplaced']:
+            self.stdout.write(
+                self.style.WARNING(f"#{miss['request']:<3} {miss['team'].name:<20} {miss['reason']}")
+            )
+        
+        if options['commit'] or data['commit']:
+            try:
+                bookings = commit_plan(plan)
+            except ValidationError as e:
+                raise CommandError(f'Plan could not be committed: {"; ".join(e.messages)}')
+            self.stdout.write(self.style.SUCCESS(f'Booked {len(bookings)} meetings'))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Placed {len(plan['placed'])} of {len(data['requests'])} requests (dry run)"
+                )
+            )
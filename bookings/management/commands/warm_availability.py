@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.sites import use_site
+from bookings.snapshots import availability_snapshots, warm_availability
+
+
+class Command(BaseCommand):
+    help = 'Precompute availability snapshots for the coming days (run before opening)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AVAILABILITY_SNAPSHOT_DAYS,
+            help='Number of days to warm, starting today',
+        )
+        parser.add_argument(
+            '--site',
+            choices=list(settings.SITE_DATABASES),
+            action='append',
+            help='Warm only this site (repeatable; default: every site)',
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(availability_snapshots.cache, (LocMemCache, DummyCache)):
+            # The snapshots would only exist in this command's own process
+            raise CommandError(
+                f"AVAILABILITY_SNAPSHOT_CACHE ('{settings.AVAILABILITY_SNAPSHOT_CACHE}') is local "
+                "to this process, so the server would never see the warmed snapshots. "
+                "Point it at a cache shared by all workers (e.g. Redis or Memcached) in CACHES."
+            )
+        
+        today = timezone.localdate()
+        for site in options['site'] or list(settings.SITE_DATABASES):
+            with use_site(site):
+                rooms, bookings = warm_availability(today, options['days'])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"[{site}] Warmed {options['days']} days: {rooms} rooms, {bookings} bookings"
+                )
+            )
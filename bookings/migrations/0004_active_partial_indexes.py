@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_archivedbooking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_room_id_a7f66e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_booking_eb8fc3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_bo_status_233e96_idx',
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['room', 'date', 'start_time', 'end_time'], name='booking_active_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['-created_at'], name='booking_active_recent_idx'),
+        ),
+    ]
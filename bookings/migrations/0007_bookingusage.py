@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_usage(apps, schema_editor):
+    """Seed the counters from the existing ACTIVE bookings."""
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingUsage = apps.get_model('bookings', 'BookingUsage')
+    
+    usage = {}
+    for booking in Booking.objects.filter(status='ACTIVE').iterator():
+        key = (booking.user_id, booking.team_id, booking.date)
+        row = usage.setdefault(key, [0, 0])
+        row[0] += 1
+        row[1] += (
+            (booking.end_time.hour * 60 + booking.end_time.minute)
+            - (booking.start_time.hour * 60 + booking.start_time.minute)
+        )
+    
+    BookingUsage.objects.bulk_create(
+        [
+            BookingUsage(user_id=user_id, team_id=team_id, date=date,
+                         active_bookings=count, booked_minutes=minutes)
+            for (user_id, team_id, date), (count, minutes) in usage.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0001_initial'),
+        ('bookings', '0006_booking_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('active_bookings', models.PositiveIntegerField(default=0)),
+                ('booked_minutes', models.PositiveIntegerField(default=0)),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_usage', to='users.team')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='bookingusage',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('user', 'date'), name='unique_user_usage_per_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingusage',
+            constraint=models.UniqueConstraint(condition=models.Q(('team__isnull', False)), fields=('team', 'date'), name='unique_team_usage_per_day'),
+        ),
+        migrations.RunPython(backfill_usage, migrations.RunPython.noop),
+    ]
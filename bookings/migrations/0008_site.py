@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:08
+
+import core.sites
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('bookings', '0007_bookingusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='site',
+            field=models.CharField(default=core.sites.get_default_site, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='site',
+            field=models.CharField(default=core.sites.get_default_site, editable=False, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='archivedbooking',
+            name='team',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_team_bookings', to='users.team'),
+        ),
+        migrations.AlterField(
+            model_name='archivedbooking',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_individual_bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='team',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='team_bookings', to='users.team'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='individual_bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='bookingseries',
+            name='team',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to='users.team'),
+        ),
+        migrations.AlterField(
+            model_name='bookingseries',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='bookingusage',
+            name='team',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_usage', to='users.team'),
+        ),
+        migrations.AlterField(
+            model_name='bookingusage',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='booking_usage', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,11 +1,31 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import datetime, time
+from datetime import datetime, timedelta
+import secrets
+import string
+from core.occupancy import (
+    Interval, RoomSchedule, booking_seats, room_rule_error, to_minutes, within_business_hours,
+)
+from core.sites import get_default_site
 from users.models import User, Team
 from rooms.models import Room
 
 
+BOOKING_ID_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def generate_booking_id():
+    """
+    Generate a booking ID: BK + timestamp to the second + random suffix.
+    The suffix keeps IDs unique when many bookings are created in the same
+    second, e.g. when a recurring series is materialized with bulk_create.
+    """
+    timestamp = datetime.now().strftime("%y%m%d%H%M%S")
+    suffix = ''.join(secrets.choice(BOOKING_ID_ALPHABET) for _ in range(6))
+    return f"BK{timestamp}{suffix}"
+
+
 class Booking(models.Model):
     """
     Booking model representing room reservations.
@@ -27,9 +47,18 @@ class Booking(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     
-    # User/Team information
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='individual_bookings', null=True, blank=True)
-    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='team_bookings', null=True, blank=True)
+    # User/Team information. Users and teams are shared across sites and may
+    # live in another database, so these FKs carry no DB constraint.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='individual_bookings', null=True, blank=True, db_constraint=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='team_bookings', null=True, blank=True, db_constraint=False)
+    
+    # Recurring series this booking is an occurrence of, if any
+    series = models.ForeignKey(
+        'BookingSeries', on_delete=models.SET_NULL, related_name='bookings', null=True, blank=True
+    )
+    
+    # Office site; the site's database holds this row
+    site = models.CharField(max_length=20, default=get_default_site, editable=False)
     
     # Booking metadata
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
@@ -40,9 +69,21 @@ class Booking(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['room', 'date', 'start_time']),
-            models.Index(fields=['booking_id']),
-            models.Index(fields=['status']),
+            # Availability and overlap checks only ever look at ACTIVE bookings
+            models.Index(
+                fields=['room', 'date', 'start_time', 'end_time'],
+                condition=models.Q(status='ACTIVE'),
+                name='booking_active_slot_idx',
+            ),
+            # Booking list: ACTIVE bookings, newest first
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status='ACTIVE'),
+                name='booking_active_recent_idx',
+            ),
+            # Per-user and per-team booking history
+            models.Index(fields=['user', 'status', 'date'], name='booking_user_status_date_idx'),
+            models.Index(fields=['team', 'status', 'date'], name='booking_team_status_date_idx'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -71,6 +112,18 @@ class Booking(models.Model):
     
     def clean(self):
         """Validate booking constraints and business rules."""
+        errors = self.get_rule_errors()
+        
+        # Check for overlapping bookings
+        overlap_error = self.check_overlapping_bookings()
+        if overlap_error:
+            errors['start_time'] = overlap_error
+        
+        if errors:
+            raise ValidationError(errors)
+    
+    def get_rule_errors(self):
+        """Check the business rules that do not depend on other bookings."""
         errors = {}
         
         # Check that booking has either user or team (but not both)
@@ -93,50 +146,33 @@ class Booking(models.Model):
         if room_validation_error:
             errors['room'] = room_validation_error
         
-        # Check for overlapping bookings
-        overlap_error = self.check_overlapping_bookings()
-        if overlap_error:
-            errors['start_time'] = overlap_error
-        
-        if errors:
-            raise ValidationError(errors)
+        return errors
     
     def is_valid_time_slot(self):
         """Check if booking is within allowed hours (9 AM - 6 PM)."""
         if not self.start_time or not self.end_time:
             return False
-        
-        allowed_start = time(9, 0)  # 9 AM
-        allowed_end = time(18, 0)   # 6 PM
-        
-        return (self.start_time >= allowed_start and 
-                self.end_time <= allowed_end)
+        return within_business_hours(to_minutes(self.start_time), to_minutes(self.end_time))
     
     def validate_room_constraints(self):
         """Validate room-specific booking constraints."""
         if not self.room:
             return None
         
-        # Private room constraints
-        if self.room.is_private_room:
-            if self.team:
-                return "Private rooms can only be booked by individual users."
-        
-        # Conference room constraints
-        elif self.room.is_conference_room:
-            if self.user:
-                return "Conference rooms can only be booked by teams with 3+ members."
-            if self.team and not self.team.is_eligible_for_conference_room():
-                return "Conference rooms require teams with at least 3 members."
-        
-        # Shared desk constraints are handled at the availability level
-        return None
+        # Team size only matters for conference rooms, don't count members otherwise
+        member_count = None
+        if self.team and self.room.is_conference_room:
+            member_count = self.team.member_count
+        return room_rule_error(self.room.room_type, is_team=bool(self.team), member_count=member_count)
     
     def check_overlapping_bookings(self):
         """Check for time slot conflicts in the same room."""
         if not self.room or not self.date or not self.start_time or not self.end_time:
             return None
         
+        if self.room.is_shared_desk:
+            return self.check_shared_desk_capacity()
+        
         overlapping_bookings = Booking.objects.filter(
             room=self.room,
             date=self.date,
@@ -149,6 +185,32 @@ class Booking(models.Model):
         
         return None
     
+    def check_shared_desk_capacity(self):
+        """
+        Shared desks take overlapping bookings while all of their seats fit.
+        Counted from the database inside the save transaction: the
+        availability check before it may have read a stale snapshot.
+        """
+        if self.status != 'ACTIVE':
+            return None
+        
+        # Imported here: snapshots imports this module
+        from .snapshots import booking_rows
+        overlapping = Booking.objects.filter(
+            room=self.room,
+            date=self.date,
+            status='ACTIVE',
+            start_time__lt=self.end_time,
+            end_time__gt=self.start_time,
+        ).exclude(pk=self.pk)
+        schedule = RoomSchedule(self.room.pk, self.room.room_type, self.room.capacity)
+        for pk, _, _, start, end, seats in booking_rows(overlapping):
+            schedule.add(Interval(start, end, seats, pk))
+        
+        if schedule.fits(to_minutes(self.start_time), to_minutes(self.end_time), self.occupancy_count):
+            return None
+        return "Shared desk is full for the selected time slot."
+    
     def times_overlap(self, other_booking):
         """Check if two bookings have overlapping time slots."""
         return (self.start_time < other_booking.end_time and 
@@ -156,14 +218,13 @@ class Booking(models.Model):
     
     def generate_booking_id(self):
         """Generate a unique booking ID."""
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        return f"BK{timestamp}"
+        return generate_booking_id()
     
     def cancel(self):
         """Cancel the booking and update status."""
         self.status = 'CANCELLED'
         self.cancelled_at = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'cancelled_at', 'updated_at'])
     
     @property
     def is_active(self):
@@ -185,8 +246,264 @@ class Booking(models.Model):
     
     @property
     def occupancy_count(self):
-        """Return the number of people this booking accounts for."""
+        """Return the number of seats this booking takes."""
         if self.team:
             # Children are included in headcount but don't occupy seats
-            return self.team.adult_member_count
-        return 1 if not self.user.is_child else 0
+            return booking_seats(team_adults=self.team.adult_member_count)
+        return booking_seats(user_age=self.user.age)
+
+
+class BookingSeries(models.Model):
+    """
+    A recurring booking pattern (a small subset of RRULE).
+    Occurrences are expanded lazily and materialized as regular Booking rows.
+    """
+    
+    FREQUENCY_CHOICES = [
+        ('DAILY', 'Daily'),
+        ('WEEKLY', 'Weekly'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('ACTIVE', 'Active'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='booking_series')
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_series', null=True, blank=True, db_constraint=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='booking_series', null=True, blank=True, db_constraint=False)
+    
+    # Recurrence rule
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1)
+    # Comma separated weekday numbers (Monday=0); blank means every day
+    # for DAILY and the weekday of start_date for WEEKLY
+    weekdays = models.CharField(max_length=20, blank=True)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
+    created_at = models.DateTimeField(auto_now_add=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'booking series'
+    
+    def __str__(self):
+        return f"{self.get_frequency_display()} {self.room} ({self.start_time}-{self.end_time})"
+    
+    def get_weekdays(self):
+        """Weekdays (Monday=0) on which the series occurs."""
+        if self.weekdays:
+            return {int(day) for day in self.weekdays.split(',')}
+        if self.frequency == 'WEEKLY':
+            return {self.start_date.weekday()}
+        return set(range(7))
+    
+    def occurrences(self, window_start=None, window_end=None):
+        """Lazily yield occurrence dates, optionally clipped to a window."""
+        first = max(window_start or self.start_date, self.start_date)
+        last = min(window_end or self.end_date, self.end_date)
+        weekdays = self.get_weekdays()
+        # Weekly intervals count whole weeks from the week start_date falls in
+        week_origin = self.start_date - timedelta(days=self.start_date.weekday())
+        
+        day = first
+        while day <= last:
+            if day.weekday() in weekdays:
+                if self.frequency == 'DAILY':
+                    matches = (day - self.start_date).days % self.interval == 0
+                else:
+                    matches = ((day - week_origin).days // 7) % self.interval == 0
+                if matches:
+                    yield day
+            day += timedelta(days=1)
+    
+    @property
+    def booker_name(self):
+        if self.team:
+            return self.team.name
+        return str(self.user)
+
+
+class BookingUsage(models.Model):
+    """
+    Per-day booking counters for a user or a team, used to enforce quotas.
+    Updated incrementally when bookings are created or cancelled so the
+    create path reads one row instead of counting bookings.
+    """
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_usage', null=True, blank=True, db_constraint=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='booking_usage', null=True, blank=True, db_constraint=False)
+    date = models.DateField()
+    active_bookings = models.PositiveIntegerField(default=0)
+    booked_minutes = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date'],
+                condition=models.Q(user__isnull=False),
+                name='unique_user_usage_per_day'
+            ),
+            models.UniqueConstraint(
+                fields=['team', 'date'],
+                condition=models.Q(team__isnull=False),
+                name='unique_team_usage_per_day'
+            ),
+        ]
+    
+    def __str__(self):
+        owner = self.team if self.team_id else self.user
+        return f"{owner} on {self.date}: {self.active_bookings} bookings, {self.booked_minutes} min"
+
+
+class ArchivedBooking(models.Model):
+    """
+    Cold storage for bookings older than the archive horizon.
+    Rows are moved here in batches by the archive_bookings command so the
+    live bookings table and its indexes only hold recent data.
+    """
+    
+    booking_id = models.CharField(max_length=20, unique=True)
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='archived_bookings')
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_individual_bookings', null=True, blank=True, db_constraint=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='archived_team_bookings', null=True, blank=True, db_constraint=False)
+    site = models.CharField(max_length=20, default=get_default_site, editable=False)
+    status = models.CharField(max_length=10, choices=Booking.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    # Fields copied verbatim between the live and archive tables
+    COPIED_FIELDS = [
+        'booking_id', 'room_id', 'date', 'start_time', 'end_time', 'user_id',
+        'team_id', 'site', 'status', 'created_at', 'updated_at', 'cancelled_at',
+    ]
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.booking_id} (archived)"
+    
+    @classmethod
+    def from_booking(cls, booking):
+        """Build an (unsaved) archive row from a live booking."""
+        return cls(**{field: getattr(booking, field) for field in cls.COPIED_FIELDS})
+    
+    def to_booking(self):
+        """Rebuild an unsaved Booking so archived rows render like live ones."""
+        booking = Booking(**{field: getattr(self, field) for field in self.COPIED_FIELDS})
+        # Reuse the relations loaded via select_related instead of refetching them
+        booking.room = self.room
+        booking.user = self.user
+        booking.team = self.team
+        return booking
+
+
+class OutboxMessage(models.Model):
+    """
+    A notification or side effect to deliver after a booking change.
+    
+    Rows are written in the same transaction as the booking, so a message
+    exists if and only if the change committed. The drain_outbox command
+    delivers them with retries and exponential backoff.
+    """
+    
+    CHANNEL_CHOICES = [
+        ('EMAIL', 'Email'),
+        ('WEBHOOK', 'Webhook'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    event = models.CharField(max_length=30)
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    target = models.CharField(max_length=500, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The drain loop only ever scans due PENDING rows
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outbox_pending_due_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+            models.Index(fields=['claim_token'], name='outbox_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} via {self.channel} ({self.status})"
+
+
+class WaitlistEntry(models.Model):
+    """
+    A request to be booked into a full (room or room type, date, window)
+    as soon as a cancellation frees it. Promotion is first come, first served.
+    """
+    
+    STATUS_CHOICES = [
+        ('WAITING', 'Waiting'),
+        ('PROMOTED', 'Promoted'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    
+    room = models.ForeignKey(
+        Room, on_delete=models.CASCADE, related_name='waitlist_entries', null=True, blank=True
+    )
+    room_type = models.CharField(max_length=10, choices=Room.ROOM_TYPES, blank=True)
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='waitlist_entries', null=True, blank=True, db_constraint=False)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='waitlist_entries', null=True, blank=True, db_constraint=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='WAITING')
+    booking = models.ForeignKey(
+        Booking, on_delete=models.SET_NULL, related_name='waitlist_entries', null=True, blank=True
+    )
+    site = models.CharField(max_length=20, default=get_default_site, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = 'waitlist entries'
+        indexes = [
+            # FIFO scan of the live waiters for a date on every cancellation
+            models.Index(
+                fields=['date', 'id'],
+                name='waitlist_fifo_idx',
+                condition=models.Q(status='WAITING'),
+            ),
+        ]
+    
+    def __str__(self):
+        target = self.room or self.get_room_type_display()
+        return f"Waitlist #{self.pk}: {target} on {self.date} {self.start_time}-{self.end_time}"
+    
+    @property
+    def booker_name(self):
+        if self.team_id:
+            return self.team.name
+        return self.user.get_full_name()
@@ -0,0 +1,188 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from core.http import ConnectionPool
+from users.models import User
+from .events import booking_event
+from .models import OutboxMessage
+
+EMAIL_SUBJECTS = {
+    'booking.created': 'Booking {booking_id} confirmed',
+    'booking.cancelled': 'Booking {booking_id} cancelled',
+    'booking.promoted': 'Booking {booking_id} confirmed from the waitlist',
+}
+
+
+def enqueue_booking_notifications(booking, change):
+    """
+    Queue the confirmation email and webhooks for a booking change.
+    
+    Called from post_save, i.e. inside the booking's transaction; nothing
+    slow happens here, delivery is left to drain_outbox.
+    """
+    event = f'booking.{change}'
+    payload = booking_event(change, booking)
+    payload.update({
+        'room_number': booking.room.room_number,
+        'user': booking.user_id,
+        'team': booking.team_id,
+    })
+    
+    messages = [OutboxMessage(event=event, channel='EMAIL', payload=payload)]
+    messages.extend(
+        OutboxMessage(event=event, channel='WEBHOOK', target=url, payload=payload)
+        for url in settings.BOOKING_WEBHOOK_URLS
+    )
+    OutboxMessage.objects.bulk_create(messages)
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff with jitter, capped at OUTBOX_RETRY_MAX_SECONDS."""
+    delay = min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+class MailSession:
+    """
+    The SMTP connection shared by a batch's emails, opened on first use so
+    a batch without emails never connects. If it cannot be opened, every
+    email of the batch fails with that error, without retrying the connect.
+    """
+    
+    def __init__(self):
+        self.connection = None
+        self.error = None
+    
+    def get(self):
+        if self.error is not None:
+            raise self.error
+        if self.connection is None:
+            connection = get_connection(fail_silently=False)
+            try:
+                connection.open()
+            except Exception as e:
+                self.error = e
+                raise
+            self.connection = connection
+        return self.connection
+    
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.connection.close()
+        except Exception:
+            # Everything was handed over already; a failed QUIT changes nothing
+            pass
+
+
+class OutboxWorker:
+    """
+    Drain due outbox messages in batches.
+    
+    A batch is claimed with a single UPDATE that stamps a claim token and
+    pushes next_attempt_at out by a lease, so several workers can run at
+    once and a crashed worker's batch is retried after the lease.
+    """
+    
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.http = ConnectionPool(timeout=settings.BOOKING_WEBHOOK_TIMEOUT)
+    
+    def claim(self):
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = list(OutboxMessage.objects.filter(
+            status='PENDING', next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id').values_list('pk', flat=True)[:self.batch_size])
+        if not due:
+            return []
+        
+        OutboxMessage.objects.filter(
+            pk__in=due, status='PENDING', next_attempt_at__lte=now
+        ).update(
+            claim_token=token,
+            next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        )
+        return list(OutboxMessage.objects.filter(claim_token=token, status='PENDING'))
+    
+    def drain_once(self):
+        """Deliver one batch. Returns (sent, failed) counts."""
+        messages = self.claim()
+        if not messages:
+            return 0, 0
+        
+        sent = []
+        failed = 0
+        # One SMTP session for every email in the batch; a mail outage only
+        # fails the emails, which are retried like any other delivery error
+        mail = MailSession()
+        try:
+            for message in messages:
+                try:
+                    self.deliver(message, mail)
+                except Exception as e:
+                    self.schedule_retry(message, e)
+                    failed += 1
+                else:
+                    sent.append(message.pk)
+        finally:
+            mail.close()
+        
+        OutboxMessage.objects.filter(pk__in=sent).update(
+            status='SENT', sent_at=timezone.now(), claim_token=''
+        )
+        return len(sent), failed
+    
+    def schedule_retry(self, message, error):
+        message.attempts += 1
+        message.last_error = f'{type(error).__name__}: {error}'[:1000]
+        message.claim_token = ''
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            message.status = 'FAILED'
+        else:
+            message.next_attempt_at = timezone.now() + get_retry_delay(message.attempts)
+        message.save(update_fields=['attempts', 'last_error', 'claim_token', 'status', 'next_attempt_at'])
+    
+    def deliver(self, message, mail):
+        if message.channel == 'WEBHOOK':
+            self.http.post_json(message.target, {
+                'id': message.pk,
+                'event': message.event,
+                'data': message.payload,
+            }, headers={'X-Outbox-Message': str(message.pk)})
+        else:
+            self.send_email(message, mail)
+    
+    def send_email(self, message, mail):
+        payload = message.payload
+        if payload['team']:
+            recipients = User.objects.filter(teams__id=payload['team'])
+        else:
+            recipients = User.objects.filter(pk=payload['user'])
+        recipients = [email for email in recipients.values_list('email', flat=True) if email]
+        if not recipients:
+            return
+        
+        body = (
+            f"Room {payload['room_number']} on {payload['date']}, "
+            f"{payload['start_time']} - {payload['end_time']}."
+        )
+        EmailMessage(
+            subject=EMAIL_SUBJECTS[message.event].format(booking_id=payload['booking_id']),
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=recipients,
+            connection=mail.get(),
+        ).send()
+    
+    def close(self):
+        self.http.close()
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from core.sites import get_site_database
+from .holds import hold_store
+from .models import BookingUsage
+
+QUOTA_ERROR_CODE = 'quota_exceeded'
+
+
+def booking_minutes(start_time, end_time):
+    return (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+
+
+def get_quota_error(dates, start_time, end_time, user=None, team=None, exclude_hold=None):
+    """
+    Return why booking the window on ``dates`` would exceed a quota, or None.
+    Reads the owner's usage counters for all dates in a single query. The
+    owner's live holds count as bookings, except ``exclude_hold`` (the hold
+    being confirmed).
+    """
+    quotas = settings.BOOKING_QUOTAS
+    max_bookings = quotas['MAX_ACTIVE_BOOKINGS_PER_TEAM' if team is not None else 'MAX_ACTIVE_BOOKINGS_PER_USER']
+    max_hours = quotas['MAX_HOURS_PER_DAY']
+    if max_bookings is None and max_hours is None:
+        return None
+    
+    minutes = booking_minutes(start_time, end_time)
+    if team is not None:
+        usage_rows = BookingUsage.objects.filter(date__in=dates, team=team)
+        held = hold_store.get_owner_holds(dates, team_id=team.pk, exclude=exclude_hold)
+    else:
+        usage_rows = BookingUsage.objects.filter(date__in=dates, user=user)
+        held = hold_store.get_owner_holds(dates, user_id=user.pk, exclude=exclude_hold)
+    
+    usage_by_date = {usage.date: (usage.active_bookings, usage.booked_minutes) for usage in usage_rows}
+    for date, holds in held.items():
+        active_bookings, booked_minutes = usage_by_date.get(date, (0, 0))
+        usage_by_date[date] = (
+            active_bookings + len(holds),
+            booked_minutes + sum(booking_minutes(hold['start_time'], hold['end_time']) for hold in holds),
+        )
+    
+    for date, (active_bookings, booked_minutes) in sorted(usage_by_date.items()):
+        if max_bookings is not None and active_bookings + 1 > max_bookings:
+            return f"Booking limit reached: at most {max_bookings} active bookings per day ({date})."
+        if max_hours is not None and booked_minutes + minutes > max_hours * 60:
+            return f"Booking limit reached: at most {max_hours} booked hours per day ({date})."
+    
+    # An owner without a counter row has nothing booked that day yet
+    if max_hours is not None and minutes > max_hours * 60:
+        return f"Booking limit reached: at most {max_hours} booked hours per day."
+    
+    return None
+
+
+def apply_usage(booking, sign):
+    """Add (sign=1) or remove (sign=-1) a booking from its owner's counters."""
+    if booking.team_id:
+        owner = {'team_id': booking.team_id}
+    else:
+        owner = {'user_id': booking.user_id}
+    minutes = booking_minutes(booking.start_time, booking.end_time)
+    
+    with transaction.atomic(using=get_site_database()):
+        BookingUsage.objects.bulk_create(
+            [BookingUsage(date=booking.date, **owner)], ignore_conflicts=True
+        )
+        BookingUsage.objects.filter(date=booking.date, **owner).update(
+            active_bookings=F('active_bookings') + sign,
+            booked_minutes=F('booked_minutes') + sign * minutes,
+        )
@@ -0,0 +1,224 @@
+import time as clock
+from bisect import insort
+from collections import defaultdict
+from datetime import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from core.occupancy import CLOSING_TIME, OPENING_TIME, to_minutes
+from core.sites import get_site_database
+from rooms.models import Room
+from .holds import hold_store
+from .models import Booking
+from .quotas import get_quota_error
+
+
+def to_time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def overlaps(intervals, start, end):
+    return any(busy_start < end and busy_end > start for busy_start, busy_end in intervals)
+
+
+class MeetingScheduler:
+    """
+    Pack a batch of team meeting requests into conference rooms for one day.
+    
+    Each request is a dict with ``team``, ``duration`` (minutes) and an
+    ``earliest`` start / ``latest`` end time. Requests are placed greedily,
+    tightest deadline first, at the earliest start that fits, preferring the
+    room whose free gap it fills best. A bounded local search then tries to
+    fit each unplaced request by moving one placed meeting elsewhere.
+    """
+    
+    NO_ROOM_FREE = "No conference room free (or the team is busy) in the requested window."
+    
+    def __init__(self, date, requests, max_iterations=None, time_budget=None):
+        self.date = date
+        self.requests = requests
+        self.max_iterations = max_iterations or settings.MEETING_SCHEDULER_MAX_ITERATIONS
+        self.time_budget = time_budget or settings.MEETING_SCHEDULER_TIME_BUDGET_SECONDS
+        self.day_start = to_minutes(OPENING_TIME)
+        self.day_end = to_minutes(CLOSING_TIME)
+        
+        self.rooms = list(Room.objects.filter(is_active=True, room_type='CONFERENCE'))
+        self.room_busy = {room.pk: [] for room in self.rooms}
+        self.team_busy = defaultdict(list)
+        self.placements = {}
+        self.unplaced = {}
+        self._load_day()
+    
+    def _load_day(self):
+        """Load the day's ACTIVE bookings and holds in one query."""
+        team_ids = {request['team'].pk for request in self.requests}
+        day_bookings = Booking.objects.filter(
+            Q(room_id__in=list(self.room_busy)) | Q(team_id__in=team_ids),
+            date=self.date,
+            status='ACTIVE',
+        ).order_by()
+        
+        for booking in day_bookings:
+            interval = (to_minutes(booking.start_time), to_minutes(booking.end_time))
+            if booking.room_id in self.room_busy:
+                insort(self.room_busy[booking.room_id], interval)
+            if booking.team_id in team_ids:
+                insort(self.team_busy[booking.team_id], interval)
+        
+        for room in self.rooms:
+            for hold in hold_store.overlapping(room.pk, self.date, OPENING_TIME, CLOSING_TIME):
+                insort(
+                    self.room_busy[room.pk],
+                    (to_minutes(hold['start_time']), to_minutes(hold['end_time']))
+                )
+    
+    def get_window(self, request):
+        earliest = max(to_minutes(request['earliest']), self.day_start)
+        latest = min(to_minutes(request['latest']), self.day_end)
+        return earliest, latest
+    
+    def find_slot(self, index):
+        """Best (room, start) for a request given current placements, or None."""
+        request = self.requests[index]
+        earliest, latest = self.get_window(request)
+        duration = request['duration']
+        team_intervals = self.team_busy[request['team'].pk]
+        
+        best = None
+        for room in self.rooms:
+            busy = self.room_busy[room.pk]
+            # Left-justified schedules only ever start at the window start or
+            # right after another meeting in the room or of the team ends
+            starts = {earliest} | {
+                end for _, end in busy + team_intervals if earliest < end <= latest - duration
+            }
+            for start in sorted(starts):
+                end = start + duration
+                if end > latest:
+                    break
+                if overlaps(busy, start, end) or overlaps(team_intervals, start, end):
+                    continue
+                gap_end = min([busy_start for busy_start, _ in busy if busy_start >= end] + [self.day_end])
+                score = (start, gap_end - end, room.room_number)
+                if best is None or score < best[0]:
+                    best = (score, room, start)
+                break
+        
+        if best is None:
+            return None
+        return best[1], best[2]
+    
+    def place(self, index, room, start):
+        request = self.requests[index]
+        interval = (start, start + request['duration'])
+        insort(self.room_busy[room.pk], interval)
+        insort(self.team_busy[request['team'].pk], interval)
+        self.placements[index] = (room, start)
+    
+    def unplace(self, index):
+        request = self.requests[index]
+        room, start = self.placements.pop(index)
+        interval = (start, start + request['duration'])
+        self.room_busy[room.pk].remove(interval)
+        self.team_busy[request['team'].pk].remove(interval)
+    
+    def validate_request(self, request):
+        """Return why a request can never be placed, or None."""
+        if not request['team'].is_eligible_for_conference_room():
+            return "Conference rooms require teams with at least 3 members."
+        earliest, latest = self.get_window(request)
+        if latest - earliest < request['duration']:
+            return "Duration does not fit in the requested window within 9 AM - 6 PM."
+        return None
+    
+    def run(self):
+        candidates = []
+        for index, request in enumerate(self.requests):
+            reason = self.validate_request(request)
+            if reason:
+                self.unplaced[index] = reason
+            else:
+                candidates.append(index)
+        
+        # Greedy: tightest deadline first, longer meetings first on ties
+        candidates.sort(key=lambda i: (self.get_window(self.requests[i])[1], -self.requests[i]['duration']))
+        for index in candidates:
+            slot = self.find_slot(index)
+            if slot:
+                self.place(index, *slot)
+            else:
+                self.unplaced[index] = self.NO_ROOM_FREE
+        
+        self.improve()
+        return self.get_plan()
+    
+    def improve(self):
+        """Local search: relocate one placed meeting to make room for an unplaced one."""
+        deadline = clock.monotonic() + self.time_budget
+        iterations = 0
+        
+        for index in [i for i, reason in self.unplaced.items() if reason == self.NO_ROOM_FREE]:
+            for other in list(self.placements):
+                iterations += 1
+                if iterations > self.max_iterations or clock.monotonic() > deadline:
+                    return
+                
+                previous = self.placements[other]
+                self.unplace(other)
+                slot = self.find_slot(index)
+                if slot:
+                    self.place(index, *slot)
+                    moved = self.find_slot(other)
+                    if moved:
+                        self.place(other, *moved)
+                        del self.unplaced[index]
+                        break
+                    self.unplace(index)
+                self.place(other, *previous)
+    
+    def get_plan(self):
+        placed = []
+        for index, (room, start) in sorted(self.placements.items()):
+            request = self.requests[index]
+            placed.append({
+                'request': index,
+                'team': request['team'],
+                'room': room,
+                'start_time': to_time(start),
+                'end_time': to_time(start + request['duration']),
+            })
+        unplaced = [
+            {'request': index, 'team': self.requests[index]['team'], 'reason': reason}
+            for index, reason in sorted(self.unplaced.items())
+        ]
+        return {'date': self.date, 'placed': placed, 'unplaced': unplaced}
+
+
+def commit_plan(plan):
+    """
+    Book every placed meeting of a plan in one transaction. Raises
+    ValidationError, booking nothing, if any meeting conflicts or would take
+    its team over a daily quota (counting the plan's earlier meetings).
+    """
+    with transaction.atomic(using=get_site_database()):
+        bookings = []
+        for placement in plan['placed']:
+            quota_error = get_quota_error(
+                [plan['date']], placement['start_time'], placement['end_time'], team=placement['team']
+            )
+            if quota_error:
+                raise ValidationError(f"{placement['team'].name}: {quota_error}")
+            
+            booking = Booking(
+                room=placement['room'],
+                date=plan['date'],
+                start_time=placement['start_time'],
+                end_time=placement['end_time'],
+                team=placement['team'],
+            )
+            booking.save()
+            bookings.append(booking)
+    return bookings
@@ -1,5 +1,12 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, BookingSeries, WaitlistEntry
+from core.occupancy import CONFERENCE, room_rule_error, to_minutes, within_business_hours
+from rooms.models import Room
+from users.models import User, Team
+from .series import create_series_bookings, get_series_dates
+from .waitlist import get_position
 from users.serializers import UserSerializer, TeamSerializer
 from rooms.serializers import RoomSerializer
 
@@ -52,7 +59,7 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = [
             'booking_id', 'room', 'date', 'start_time', 'end_time',
             'user', 'team', 'booking_type', 'booker_name', 'occupancy_count',
-            'status', 'status_display', 'created_at', 'cancelled_at'
+            'series', 'status', 'status_display', 'created_at', 'cancelled_at'
         ]
         read_only_fields = ['booking_id', 'created_at', 'cancelled_at']
 
@@ -73,3 +80,221 @@ class BookingListSerializer(serializers.ModelSerializer):
             'start_time', 'end_time', 'booker_name', 'booking_type',
             'status', 'status_display', 'created_at'
         ]
+
+
+class WeekdaysField(serializers.ListField):
+    """Weekday numbers (Monday=0), stored as a comma separated string."""
+    
+    child = serializers.IntegerField(min_value=0, max_value=6)
+    
+    def to_representation(self, data):
+        if not data:
+            return []
+        return [int(day) for day in data.split(',')]
+    
+    def to_internal_value(self, data):
+        days = super().to_internal_value(data)
+        return ','.join(str(day) for day in sorted(set(days)))
+
+
+class BookingSeriesSerializer(serializers.ModelSerializer):
+    """Serializer for creating and displaying recurring booking series."""
+    
+    weekdays = WeekdaysField(required=False, allow_empty=True)
+    booker_name = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = BookingSeries
+        fields = [
+            'id', 'room', 'start_time', 'end_time', 'user', 'team',
+            'frequency', 'interval', 'weekdays', 'start_date', 'end_date',
+            'booker_name', 'status', 'created_at', 'cancelled_at'
+        ]
+        read_only_fields = ['id', 'status', 'created_at', 'cancelled_at']
+    
+    def validate(self, data):
+        """Validate booker and recurrence window."""
+        user = data.get('user')
+        team = data.get('team')
+        
+        if not user and not team:
+            raise serializers.ValidationError("Either user or team must be provided.")
+        
+        if user and team:
+            raise serializers.ValidationError("Cannot specify both user and team.")
+        
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("End date must not be before start date.")
+        
+        if data.get('interval', 1) < 1:
+            raise serializers.ValidationError("Interval must be at least 1.")
+        
+        try:
+            get_series_dates(BookingSeries(**data))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
+        
+        return data
+    
+    def create(self, validated_data):
+        """Create the series and materialize its occurrences."""
+        series = BookingSeries(**validated_data)
+        try:
+            self.bookings = create_series_bookings(series)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.message_dict)
+        return series
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Serializer for joining and displaying the waitlist."""
+    
+    booker_name = serializers.ReadOnlyField()
+    booking = serializers.SlugRelatedField(slug_field='booking_id', read_only=True)
+    position = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'room', 'room_type', 'date', 'start_time', 'end_time',
+            'user', 'team', 'booker_name', 'status', 'position', 'booking',
+            'created_at', 'promoted_at'
+        ]
+        read_only_fields = ['id', 'status', 'booking', 'created_at', 'promoted_at']
+    
+    def validate(self, data):
+        """Validate target, booker and time window."""
+        user = data.get('user')
+        team = data.get('team')
+        room = data.get('room')
+        room_type = data.get('room_type')
+        
+        if not room and not room_type:
+            raise serializers.ValidationError("Either room or room_type must be provided.")
+        
+        if room and room_type:
+            raise serializers.ValidationError("Cannot specify both room and room_type.")
+        
+        if not user and not team:
+            raise serializers.ValidationError("Either user or team must be provided.")
+        
+        if user and team:
+            raise serializers.ValidationError("Cannot specify both user and team.")
+        
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError("End time must be after start time.")
+        
+        # Entries that break the booking rules could never be promoted
+        if not within_business_hours(to_minutes(data['start_time']), to_minutes(data['end_time'])):
+            raise serializers.ValidationError(
+                {'start_time': "Bookings are only allowed between 9 AM and 6 PM."}
+            )
+        
+        target_type = room.room_type if room else room_type
+        member_count = team.member_count if team and target_type == CONFERENCE else None
+        rule_error = room_rule_error(target_type, is_team=bool(team), member_count=member_count)
+        if rule_error:
+            raise serializers.ValidationError({'room' if room else 'room_type': rule_error})
+        
+        return data
+    
+    def get_position(self, entry):
+        if entry.status != 'WAITING':
+            return None
+        return get_position(entry)
+
+
+class BookingHoldSerializer(serializers.Serializer):
+    """Serializer for displaying a hold kept in the hold store."""
+    
+    hold_id = serializers.CharField()
+    room = serializers.IntegerField(source='room_id')
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    user = serializers.IntegerField(source='user_id', allow_null=True)
+    team = serializers.IntegerField(source='team_id', allow_null=True)
+    expires_at = serializers.DateTimeField()
+
+
+class AutoBookingSerializer(serializers.Serializer):
+    """Serializer for booking the best available room of a type."""
+    
+    room_type = serializers.ChoiceField(choices=Room.ROOM_TYPES)
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    team = serializers.PrimaryKeyRelatedField(queryset=Team.objects.all(), required=False, allow_null=True)
+    
+    def validate(self, data):
+        """Validate booker and time window."""
+        user = data.get('user')
+        team = data.get('team')
+        
+        if not user and not team:
+            raise serializers.ValidationError("Either user or team must be provided.")
+        
+        if user and team:
+            raise serializers.ValidationError("Cannot specify both user and team.")
+        
+        if data['end_time'] <= data['start_time']:
+            raise serializers.ValidationError("End time must be after start time.")
+        
+        return data
+
+
+class MeetingRequestSerializer(serializers.Serializer):
+    """One team meeting request for the batch scheduler."""
+    
+    team = serializers.PrimaryKeyRelatedField(queryset=Team.objects.all())
+    duration_minutes = serializers.IntegerField(source='duration', min_value=1)
+    earliest = serializers.TimeField()
+    latest = serializers.TimeField()
+    
+    def validate(self, data):
+        if data['latest'] <= data['earliest']:
+            raise serializers.ValidationError("Latest end must be after earliest start.")
+        return data
+
+
+class MeetingScheduleSerializer(serializers.Serializer):
+    """A batch of meeting requests to pack into conference rooms for one day."""
+    
+    date = serializers.DateField()
+    commit = serializers.BooleanField(default=False)
+    requests = MeetingRequestSerializer(many=True, allow_empty=False)
+    
+    def validate_requests(self, value):
+        max_requests = settings.MEETING_SCHEDULER_MAX_REQUESTS
+        if len(value) > max_requests:
+            raise serializers.ValidationError(f"At most {max_requests} requests per batch.")
+        return value
+
+
+class ScheduledMeetingSerializer(serializers.Serializer):
+    """A meeting placed by the scheduler."""
+    
+    request = serializers.IntegerField()
+    team = serializers.PrimaryKeyRelatedField(read_only=True)
+    team_name = serializers.CharField(source='team.name')
+    room = serializers.PrimaryKeyRelatedField(read_only=True)
+    room_number = serializers.CharField(source='room.room_number')
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+
+class UnplacedMeetingSerializer(serializers.Serializer):
+    """A meeting request the scheduler could not place."""
+    
+    request = serializers.IntegerField()
+    team = serializers.PrimaryKeyRelatedField(read_only=True)
+    reason = serializers.CharField()
+
+
+class MeetingPlanSerializer(serializers.Serializer):
+    """Serializer for displaying a scheduling plan."""
+    
+    date = serializers.DateField()
+    placed = ScheduledMeetingSerializer(many=True)
+    unplaced = UnplacedMeetingSerializer(many=True)
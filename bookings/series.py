@@ -0,0 +1,162 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from core.occupancy import Interval, to_minutes
+from core.sites import get_site_database
+from .availability import fill_holds, new_day
+from .models import Booking
+from .snapshots import booking_rows
+
+
+def build_occurrence(series, date):
+    """Build an unsaved Booking for one occurrence of a series."""
+    booking = Booking(
+        room=series.room,
+        date=date,
+        start_time=series.start_time,
+        end_time=series.end_time,
+        user=series.user,
+        team=series.team,
+        series=series,
+    )
+    booking.booking_id = booking.generate_booking_id()
+    return booking
+
+
+def validate_series_rules(series):
+    """
+    Run the per-booking business rules once for the whole series.
+    Every occurrence shares room, booker and time slot, so checking a single
+    template booking is enough.
+    """
+    template = Booking(
+        room=series.room,
+        start_time=series.start_time,
+        end_time=series.end_time,
+        user=series.user,
+        team=series.team,
+    )
+    errors = template.get_rule_errors()
+    if errors:
+        raise ValidationError(errors)
+
+
+def find_conflicting_dates(series, dates):
+    """
+    Return the occurrence dates the series' booker does not fit on, counting
+    existing ACTIVE bookings and live holds like a single booking would.
+    The bookings for all dates are read with a single range query on (room, date).
+    """
+    room = series.room
+    start, end = to_minutes(series.start_time), to_minutes(series.end_time)
+    seats = build_occurrence(series, dates[0]).occupancy_count
+    
+    overlapping_bookings = Booking.objects.filter(
+        room=room,
+        status='ACTIVE',
+        date__gte=dates[0],
+        date__lte=dates[-1],
+        start_time__lt=series.end_time,
+        end_time__gt=series.start_time,
+    )
+    intervals_by_date = defaultdict(list)
+    for pk, _, date, booking_start, booking_end, booking_seats in booking_rows(overlapping_bookings):
+        intervals_by_date[date].append(Interval(booking_start, booking_end, booking_seats, pk))
+    
+    conflicts = []
+    for date in dates:
+        day = new_day([room])
+        for interval in intervals_by_date[date]:
+            day.add(room.pk, interval)
+        fill_holds(day, date, series.start_time, series.end_time)
+        if not day.rooms[room.pk].fits(start, end, seats):
+            conflicts.append(date)
+    return conflicts
+
+
+def get_series_dates(series):
+    """
+    Occurrence dates of a new series. Expands at most one date past
+    BOOKING_SERIES_MAX_OCCURRENCES, so a far-off end_date stays cheap.
+    Raises ValidationError if the rule produces none or too many.
+    """
+    max_occurrences = settings.BOOKING_SERIES_MAX_OCCURRENCES
+    dates = list(islice(series.occurrences(), max_occurrences + 1))
+    if not dates:
+        raise ValidationError({'end_date': "The recurrence rule produces no occurrences."})
+    if len(dates) > max_occurrences:
+        raise ValidationError(
+            {'end_date': f"A series can have at most {max_occurrences} occurrences."}
+        )
+    return dates
+
+
+def create_series_bookings(series):
+    """
+    Validate a new series and materialize all of its occurrences.
+    Raises ValidationError if the rules fail or any occurrence conflicts.
+    """
+    validate_series_rules(series)
+    dates = get_series_dates(series)
+    
+    using = get_site_database()
+    with transaction.atomic(using=using):
+        conflicts = find_conflicting_dates(series, dates)
+        if conflicts:
+            raise ValidationError({
+                'start_time': "Time slot conflicts with existing bookings on "
+                              + ", ".join(date.isoformat() for date in conflicts) + "."
+            })
+        
+        series.save()
+        bookings = Booking.objects.bulk_create(
+            [build_occurrence(series, date) for date in dates]
+        )
+        
+        # bulk_create skips post_save, send it so receivers see every occurrence
+        for booking in bookings:
+            post_save.send(sender=Booking, instance=booking, created=True, using=using)
+    
+    return bookings
+
+
+def cancel_series(series, from_date=None):
+    """
+    Cancel a series and its remaining ACTIVE occurrences.
+    Occurrences before ``from_date`` (default: today) are left untouched.
+    Returns the cancelled bookings.
+    """
+    if from_date is None:
+        from_date = timezone.localdate()
+    now = timezone.now()
+    using = get_site_database()
+    
+    with transaction.atomic(using=using):
+        bookings = list(
+            series.bookings.filter(status='ACTIVE', date__gte=from_date)
+        )
+        Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(
+            status='CANCELLED', cancelled_at=now, updated_at=now
+        )
+        
+        series.status = 'CANCELLED'
+        series.cancelled_at = now
+        series.save(update_fields=['status', 'cancelled_at'])
+        
+        update_fields = {'status', 'cancelled_at', 'updated_at'}
+        for booking in bookings:
+            booking.status = 'CANCELLED'
+            booking.cancelled_at = now
+            booking.updated_at = now
+            post_save.send(
+                sender=Booking, instance=booking, created=False, update_fields=update_fields,
+                using=using,
+            )
+    
+    return bookings
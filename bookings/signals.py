@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.sites import get_sites
+from rooms.models import Room
+from rooms.signals import rooms_provisioned
+from users.models import User, Team
+
+from .events import booking_event, get_broker
+from .models import Booking
+from .outbox import enqueue_booking_notifications
+from .quotas import apply_usage
+from .snapshots import availability_snapshots
+from .waitlist import promote_waiters
+
+
+def get_booking_change(instance, created, update_fields):
+    """Classify a Booking save as 'created', 'cancelled' or None."""
+    if created:
+        return 'created' if instance.status == 'ACTIVE' else None
+    if instance.status == 'CANCELLED' and update_fields and 'status' in update_fields:
+        return 'cancelled'
+    return None
+
+
+@receiver(post_save, sender=Booking)
+def publish_booking_change(sender, instance, created, update_fields=None, **kwargs):
+    """Push availability deltas to SSE subscribers once the write commits."""
+    change = get_booking_change(instance, created, update_fields)
+    if change is None:
+        return
+    
+    event = booking_event(change, instance)
+    transaction.on_commit(lambda: get_broker().publish(event), using=instance._state.db)
+
+
+@receiver(post_save, sender=Booking)
+def update_booking_usage(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the quota counters in step with bookings, inside the same transaction."""
+    change = get_booking_change(instance, created, update_fields)
+    if change == 'created':
+        apply_usage(instance, 1)
+    elif change == 'cancelled':
+        apply_usage(instance, -1)
+
+
+@receiver(post_save, sender=Booking)
+def enqueue_notifications(sender, instance, created, update_fields=None, **kwargs):
+    """Queue emails and webhooks in the outbox, inside the booking's transaction."""
+    change = get_booking_change(instance, created, update_fields)
+    if change == 'created' and getattr(instance, 'waitlist_entry', None) is not None:
+        change = 'promoted'
+    if change is not None:
+        enqueue_booking_notifications(instance, change)
+
+
+@receiver(post_save, sender=Booking)
+def promote_from_waitlist(sender, instance, created, update_fields=None, **kwargs):
+    """Hand a cancelled booking's slot to the waitlist, inside the cancellation's transaction."""
+    if get_booking_change(instance, created, update_fields) == 'cancelled':
+        promote_waiters(instance)
+
+
+@receiver(post_save, sender=Booking)
+def update_availability_snapshot(sender, instance, created, update_fields=None, **kwargs):
+    """Apply the booking to its warmed availability day once the write commits."""
+    change = get_booking_change(instance, created, update_fields)
+    if change is None:
+        return
+    sign = 1 if change == 'created' else -1
+    transaction.on_commit(
+        lambda: availability_snapshots.apply(instance, sign), using=instance._state.db
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def remove_from_availability_snapshot(sender, instance, **kwargs):
+    if instance.status == 'ACTIVE':
+        transaction.on_commit(
+            lambda: availability_snapshots.apply(instance, -1), using=instance._state.db
+        )
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def invalidate_snapshots_for_room(sender, instance, **kwargs):
+    availability_snapshots.invalidate(site=instance.site)
+
+
+@receiver(rooms_provisioned)
+def invalidate_snapshots_for_provisioning(sender, site, **kwargs):
+    # Rooms may have been added, deactivated or resized in bulk
+    availability_snapshots.invalidate(site=site)
+
+
+@receiver(m2m_changed, sender=Team.members.through)
+def invalidate_snapshots_for_members(sender, action, **kwargs):
+    # Team booking seat counts depend on the current members
+    if action.startswith('post_'):
+        for site in get_sites():
+            availability_snapshots.invalidate(site=site)
+
+
+@receiver(post_save, sender=User)
+def invalidate_snapshots_for_user(sender, instance, created, update_fields=None, **kwargs):
+    # Only an age change moves seat counts (children take no seat)
+    if created or (update_fields is not None and 'age' not in update_fields):
+        return
+    for site in get_sites():
+        availability_snapshots.invalidate(site=site)
@@ -0,0 +1,148 @@
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.locks import LockTimeout, cache_lock
+from core.occupancy import CHILD_AGE, booking_seats, to_minutes
+from core.sites import get_default_site
+from rooms.models import Room
+from .models import Booking
+
+
+class AvailabilitySnapshotStore:
+    """
+    Precomputed per-day free/busy data, kept in the Django cache.
+    
+    A day snapshot maps room id -> {booking pk: (start minute, end minute,
+    seats)}; a shared desk's headcount for a window is the sum of the seats
+    of the entries overlapping it. A separate entry holds the active rooms
+    with their serialized form, so availability needs no query at all.
+    
+    Snapshots are built by warm_availability and kept current by deltas
+    from Booking save/cancel/delete. Changes that alter many entries at
+    once (rooms, team membership, a user's age) bump a generation number
+    instead, which orphans every snapshot until the next warm-up; readers
+    then fall back to the database.
+    """
+    
+    key_prefix = 'availability'
+    lock_timeout = 5
+    
+    @property
+    def cache(self):
+        return caches[settings.AVAILABILITY_SNAPSHOT_CACHE]
+    
+    def _generation(self, site):
+        key = f'{self.key_prefix}:{site}:generation'
+        generation = self.cache.get(key)
+        if generation is None:
+            generation = time.time_ns()
+            if not self.cache.add(key, generation, None):
+                generation = self.cache.get(key, generation)
+        return generation
+    
+    def _key(self, suffix, site=None):
+        site = site or get_default_site()
+        return f'{self.key_prefix}:{site}:{self._generation(site)}:{suffix}'
+    
+    def _timeout(self, date):
+        # Keep a day's snapshot until the day is over
+        end_of_day = timezone.make_aware(datetime.combine(date + timedelta(days=1), datetime.min.time()))
+        return max(int((end_of_day - timezone.now()).total_seconds()), 60)
+    
+    def invalidate(self, site=None):
+        site = site or get_default_site()
+        self.cache.set(f'{self.key_prefix}:{site}:generation', time.time_ns(), None)
+    
+    # Reads
+    
+    def get_rooms(self):
+        return self.cache.get(self._key('rooms'))
+    
+    def get_day(self, date):
+        return self.cache.get(self._key(date.isoformat()))
+    
+    # Writes
+    
+    def store_rooms(self, rooms):
+        # Imported here so loading the signal receivers doesn't pull in DRF
+        from rooms.serializers import RoomSerializer
+        self.cache.set(self._key('rooms'), [
+            {
+                'id': room.pk,
+                'room_type': room.room_type,
+                'capacity': room.capacity,
+                'location': room.location.code if room.location_id else None,
+                'data': RoomSerializer(room).data,
+            }
+            for room in rooms
+        ], None)
+    
+    def store_day(self, date, day):
+        self.cache.set(self._key(date.isoformat()), day, self._timeout(date))
+    
+    def apply(self, booking, sign):
+        """Add (sign=1) or remove (sign=-1) a booking from a warmed day."""
+        key = self._key(booking.date.isoformat(), site=booking.site)
+        try:
+            with cache_lock(self.cache, key + ':lock', self.lock_timeout):
+                day = self.cache.get(key)
+                if day is None:
+                    return
+                entries = day.setdefault(booking.room_id, {})
+                if sign > 0:
+                    entries[booking.pk] = (
+                        to_minutes(booking.start_time),
+                        to_minutes(booking.end_time),
+                        booking.occupancy_count,
+                    )
+                else:
+                    entries.pop(booking.pk, None)
+                self.cache.set(key, day, self._timeout(booking.date))
+        except LockTimeout:
+            # The delta can't be applied safely; drop the site's snapshots so
+            # readers fall back to the database until the next warm-up
+            self.invalidate(booking.site)
+
+
+availability_snapshots = AvailabilitySnapshotStore()
+
+
+def booking_rows(bookings):
+    """
+    (pk, room id, date, start minute, end minute, seats) for each booking,
+    with team seats counted by the database in the same query.
+    """
+    rows = bookings.annotate(
+        adult_members=Count('team__members', filter=Q(team__members__age__gte=CHILD_AGE))
+    ).order_by().values_list(
+        'pk', 'room_id', 'date', 'start_time', 'end_time', 'team_id', 'user__age', 'adult_members'
+    )
+    for pk, room_id, date, start_time, end_time, team_id, user_age, adult_members in rows:
+        seats = booking_seats(user_age, adult_members if team_id else None)
+        yield pk, room_id, date, to_minutes(start_time), to_minutes(end_time), seats
+
+
+def warm_availability(start_date, days):
+    """
+    Build snapshots for the selected site's active rooms over `days` days
+    from `start_date`. Two queries regardless of the number of days.
+    """
+    rooms = list(Room.objects.filter(is_active=True).select_related('location'))
+    end_date = start_date + timedelta(days=days - 1)
+    
+    bookings = Booking.objects.filter(status='ACTIVE', date__range=(start_date, end_date))
+    
+    days_data = {start_date + timedelta(days=offset): {} for offset in range(days)}
+    for pk, room_id, date, start, end, seats in booking_rows(bookings):
+        days_data[date].setdefault(room_id, {})[pk] = (start, end, seats)
+    
+    availability_snapshots.store_rooms(rooms)
+    for date, day in days_data.items():
+        availability_snapshots.store_day(date, day)
+    
+    return len(rooms), sum(len(entries) for day in days_data.values() for entries in day.values())
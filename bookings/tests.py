@@ -0,0 +1,805 @@
+import asyncio
+import json
+import random
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.allocation import rank_rooms, shared_desk_has_room
+from bookings.archive import archive_bookings
+from bookings.events import InProcessBroker, get_broker
+from bookings.holds import hold_store
+from bookings.management.commands.explain_queries import Command as ExplainQueries
+from bookings.models import (
+    ArchivedBooking, Booking, BookingSeries, BookingUsage, OutboxMessage, WaitlistEntry,
+)
+from bookings.outbox import OutboxWorker
+from bookings.scheduling import MeetingScheduler
+from bookings.views import BookingCreateView, get_available_rooms
+from bookings.waitlist import room_fits
+from rooms.models import Room
+from users.models import Team, User
+
+
+def make_user(username, age=30):
+    return User.objects.create(username=username, first_name=username, age=age, gender='O')
+
+
+def make_team(name, members):
+    team = Team.objects.create(name=name, created_by=members[0])
+    team.members.set(members)
+    return team
+
+
+def make_room(room_number, room_type='PRIVATE', capacity=1):
+    return Room.objects.create(room_number=room_number, room_type=room_type, capacity=capacity)
+
+
+# Replica copies are only refreshed by sync_replicas, so read the primary
+@override_settings(DATABASE_REPLICAS={})
+class BookingAPITestCase(TestCase):
+    """
+    Base for tests that go through the API. Holds, quotas, throttles and
+    idempotency records live in the cache, so it starts empty every test.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.day = timezone.localdate() + timedelta(days=2)
+    
+    def book(self, room, start='09:00', end='10:00', day=None, **booker):
+        """POST a booking; `booker` is user=<User> or team=<Team>."""
+        data = {'room': room.pk, 'date': (day or self.day).isoformat(), 'start_time': start, 'end_time': end}
+        data.update({key: value.pk for key, value in booker.items()})
+        return self.client.post('/api/v1/bookings/', data, format='json')
+
+
+class BookingIndexTests(TestCase):
+    """The hot booking queries must be answered from their (partial) indexes."""
+    
+    def test_hot_queries_use_expected_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Index names in query plans are only checked on SQLite')
+        
+        for label, queryset, expected_index in ExplainQueries().get_checks():
+            with self.subTest(label):
+                self.assertIn(expected_index, queryset.explain())
+
+
+# The per-view ORM checks the occupancy engine replaced, kept as the reference
+# behavior the engine must reproduce.
+
+def reference_seats(booking):
+    if booking.team:
+        return booking.team.members.filter(age__gte=10).count()
+    return 0 if booking.user.age < 10 else 1
+
+
+def reference_overlapping(room, day, start_time, end_time):
+    return Booking.objects.filter(
+        room=room, date=day, status='ACTIVE', start_time__lt=end_time, end_time__gt=start_time
+    )
+
+
+def reference_occupancy(room, day, start_time, end_time):
+    return (
+        sum(reference_seats(booking) for booking in reference_overlapping(room, day, start_time, end_time))
+        + hold_store.get_occupancy(room.pk, day, start_time, end_time)
+    )
+
+
+def reference_check_availability(room, day, start_time, end_time, seats):
+    if not room.is_shared_desk:
+        if hold_store.overlapping(room.pk, day, start_time, end_time):
+            return "No available room for the selected slot and type."
+        if reference_overlapping(room, day, start_time, end_time).exists():
+            return "No available room for the selected slot and type."
+        return None
+    if reference_occupancy(room, day, start_time, end_time) + seats > room.capacity:
+        return "Shared desk is full for the selected time slot."
+    return None
+
+
+def reference_available_rooms(day, start_time, end_time, room_type=None):
+    overlapping = Booking.objects.filter(
+        room=OuterRef('pk'), date=day, status='ACTIVE', start_time__lt=end_time, end_time__gt=start_time
+    ).order_by().values('room')
+    rooms = Room.objects.filter(is_active=True).annotate(
+        is_booked=Exists(overlapping),
+        user_seats=Coalesce(Subquery(
+            overlapping.filter(user__age__gte=10).annotate(n=Count('pk')).values('n')
+        ), 0),
+        team_seats=Coalesce(Subquery(
+            overlapping.filter(team__members__age__gte=10).annotate(n=Count('team__members')).values('n')
+        ), 0),
+    )
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+    
+    available = []
+    for room in rooms:
+        if room.is_shared_desk:
+            occupancy = room.user_seats + room.team_seats
+            occupancy += hold_store.get_occupancy(room.pk, day, start_time, end_time)
+            if room.capacity - occupancy > 0:
+                available.append((room.pk, occupancy, room.capacity - occupancy))
+        elif not room.is_booked and not hold_store.overlapping(room.pk, day, start_time, end_time):
+            available.append((room.pk, 0, room.capacity))
+    return available
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def reference_rank_rooms(room_type, day, start_time, end_time, seats):
+    start, end = to_minutes(start_time), to_minutes(end_time)
+    ranked = []
+    for room in Room.objects.filter(is_active=True, room_type=room_type):
+        if room.is_shared_desk:
+            free_seats = room.capacity - reference_occupancy(room, day, start_time, end_time)
+            if free_seats > 0 and free_seats >= seats:
+                ranked.append((free_seats - seats, room.room_number, room.pk))
+            continue
+        
+        busy = [
+            (to_minutes(booking.start_time), to_minutes(booking.end_time))
+            for booking in Booking.objects.filter(room=room, date=day, status='ACTIVE')
+        ]
+        busy += [
+            (to_minutes(hold['start_time']), to_minutes(hold['end_time']))
+            for hold in hold_store.overlapping(room.pk, day, time(9), time(18))
+        ]
+        if any(busy_start < end and busy_end > start for busy_start, busy_end in busy):
+            continue
+        gap_start = max([9 * 60] + [busy_end for _, busy_end in busy if busy_end <= start])
+        gap_end = min([18 * 60] + [busy_start for busy_start, _ in busy if busy_start >= end])
+        ranked.append(((start - gap_start) + (gap_end - end), room.room_number, room.pk))
+    
+    ranked.sort(key=lambda candidate: candidate[:2])
+    return [pk for _, _, pk in ranked]
+
+
+def reference_room_fits(candidate):
+    room = candidate.room
+    if not room.is_shared_desk:
+        if hold_store.overlapping(room.pk, candidate.date, candidate.start_time, candidate.end_time):
+            return False
+        return not reference_overlapping(room, candidate.date, candidate.start_time, candidate.end_time).exists()
+    occupancy = reference_occupancy(room, candidate.date, candidate.start_time, candidate.end_time)
+    return occupancy + reference_seats(candidate) <= room.capacity
+
+
+class OccupancyParityTests(TestCase):
+    """
+    On a random day of bookings and holds, every check that delegates to
+    the occupancy engine answers what the ORM query it replaced did.
+    """
+    
+    day = date(2030, 1, 7)
+    
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(49)
+        cls.users = [
+            User.objects.create(username=f'parity{n}', age=rng.choice([6, 9, 10, 30]), gender='O')
+            for n in range(12)
+        ]
+        cls.teams = []
+        for n in range(5):
+            team = Team.objects.create(name=f'Parity {n}', created_by=cls.users[0])
+            team.members.set(rng.sample(cls.users, rng.randint(1, 5)))
+            cls.teams.append(team)
+        
+        layout = [('PRIVATE', 1)] * 3 + [('CONFERENCE', 8)] * 2 + [('SHARED', 4)] * 3
+        cls.rooms = [
+            Room.objects.create(room_number=f'P{n}', room_type=room_type, capacity=capacity)
+            for n, (room_type, capacity) in enumerate(layout)
+        ]
+        
+        # Written without validation: overlapping and overbooked rooms are part of the test
+        bookings = []
+        for n in range(80):
+            start_time, end_time = cls.random_window(rng)
+            booker = rng.choice(cls.users + cls.teams)
+            bookings.append(Booking(
+                booking_id=f'PARITY{n:04}',
+                room=rng.choice(cls.rooms),
+                date=cls.day,
+                start_time=start_time,
+                end_time=end_time,
+                user=booker if isinstance(booker, User) else None,
+                team=booker if isinstance(booker, Team) else None,
+                status=rng.choice(['ACTIVE'] * 4 + ['CANCELLED']),
+            ))
+        Booking.objects.bulk_create(bookings)
+    
+    @staticmethod
+    def random_window(rng):
+        start = rng.randrange(9 * 60, 18 * 60, 15)
+        end = rng.randrange(start + 15, 18 * 60 + 15, 15)
+        return time(start // 60, start % 60), time(end // 60, end % 60)
+    
+    def setUp(self):
+        self.rng = random.Random(490)
+        self.holds = []
+        for _ in range(6):
+            start_time, end_time = self.random_window(self.rng)
+            self.holds.append(hold_store.create(
+                self.rng.choice(self.rooms), self.day, start_time, end_time, self.rng.randint(0, 2)
+            ))
+        self.windows = [self.random_window(self.rng) for _ in range(40)]
+    
+    def tearDown(self):
+        for hold in self.holds:
+            hold_store.release(hold['hold_id'])
+    
+    def test_check_availability(self):
+        view = BookingCreateView()
+        for start_time, end_time in self.windows:
+            for room in self.rooms:
+                seats = self.rng.randint(0, 3)
+                self.assertEqual(
+                    view.check_availability(room, self.day, start_time, end_time, seats),
+                    reference_check_availability(room, self.day, start_time, end_time, seats),
+                    (room.room_number, start_time, end_time, seats),
+                )
+    
+    def test_available_rooms(self):
+        for start_time, end_time in self.windows:
+            for room_type in [None, 'PRIVATE', 'CONFERENCE', 'SHARED']:
+                payload = get_available_rooms(self.day, start_time, end_time, room_type)
+                self.assertEqual(
+                    [
+                        (entry['room']['id'], entry['current_occupancy'], entry['available_capacity'])
+                        for entry in payload['available_rooms']
+                    ],
+                    reference_available_rooms(self.day, start_time, end_time, room_type),
+                    (room_type, start_time, end_time),
+                )
+    
+    def test_rank_rooms(self):
+        for start_time, end_time in self.windows:
+            for room_type in ['PRIVATE', 'CONFERENCE', 'SHARED']:
+                seats = self.rng.randint(0, 3)
+                self.assertEqual(
+                    [room.pk for room in rank_rooms(room_type, self.day, start_time, end_time, seats)],
+                    reference_rank_rooms(room_type, self.day, start_time, end_time, seats),
+                    (room_type, start_time, end_time, seats),
+                )
+    
+    def test_waitlist_room_fits(self):
+        for start_time, end_time in self.windows:
+            booker = self.rng.choice(self.users + self.teams)
+            for room in self.rooms:
+                candidate = Booking(
+                    room=room,
+                    date=self.day,
+                    start_time=start_time,
+                    end_time=end_time,
+                    user=booker if isinstance(booker, User) else None,
+                    team=booker if isinstance(booker, Team) else None,
+                )
+                self.assertEqual(
+                    room_fits(candidate),
+                    reference_room_fits(candidate),
+                    (room.room_number, start_time, end_time, booker),
+                )
+
+
+class BookingSeriesTests(BookingAPITestCase):
+    """Recurring series are created and cancelled as a whole."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.room = make_room('S1')
+    
+    def create_series(self, **overrides):
+        data = {
+            'room': self.room.pk, 'user': self.user.pk, 'start_time': '09:00', 'end_time': '10:00',
+            'frequency': 'DAILY', 'start_date': self.day.isoformat(),
+            'end_date': (self.day + timedelta(days=4)).isoformat(),
+        }
+        data.update(overrides)
+        return self.client.post('/api/v1/bookings/series/', data, format='json')
+    
+    def test_create_and_cancel(self):
+        response = self.create_series()
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.json()['bookings']), 5)
+        series_id = response.json()['series']['id']
+        self.assertEqual(Booking.objects.filter(series_id=series_id, status='ACTIVE').count(), 5)
+        
+        response = self.client.post(f'/api/v1/bookings/series/{series_id}/cancel/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(BookingSeries.objects.get(pk=series_id).status, 'CANCELLED')
+        self.assertFalse(Booking.objects.filter(series_id=series_id, status='ACTIVE').exists())
+    
+    def test_conflicting_occurrence_rejects_the_series(self):
+        other = make_user('grace')
+        self.assertEqual(self.book(self.room, day=self.day + timedelta(days=2), user=other).status_code, 201)
+        
+        response = self.create_series()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn((self.day + timedelta(days=2)).isoformat(), str(response.json()))
+        self.assertFalse(BookingSeries.objects.exists())
+    
+    
+    def test_team_overflowing_a_shared_desk_rejects_the_series(self):
+        desk = make_room('D1', 'SHARED', capacity=3)
+        team = make_team('Pair', [self.user, make_user('grace')])
+        self.assertEqual(self.book(desk, day=self.day + timedelta(days=1), user=make_user('alan')).status_code, 201)
+        self.assertEqual(self.book(desk, day=self.day + timedelta(days=3), user=make_user('edsger')).status_code, 201)
+        self.assertEqual(self.book(desk, day=self.day + timedelta(days=3), user=make_user('barbara')).status_code, 201)
+        
+        response = self.create_series(room=desk.pk, user=None, team=team.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn((self.day + timedelta(days=3)).isoformat(), str(response.json()))
+        self.assertNotIn((self.day + timedelta(days=1)).isoformat(), str(response.json()))
+    
+    def test_live_hold_rejects_the_series(self):
+        hold_store.create(self.room, self.day + timedelta(days=4), time(9, 30), time(10, 30), 1)
+        
+        response = self.create_series()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn((self.day + timedelta(days=4)).isoformat(), str(response.json()))
+
+
+class ArchiveTests(BookingAPITestCase):
+    """archive_bookings moves old bookings out of the live table in batches."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.room = make_room('A1')
+        today = timezone.localdate()
+        Booking.objects.bulk_create([
+            Booking(
+                booking_id=f'OLD{n}', room=self.room, user=self.user, date=today - timedelta(days=100 + n),
+                start_time=time(9), end_time=time(10), status='CANCELLED' if n == 0 else 'ACTIVE',
+            )
+            for n in range(5)
+        ] + [
+            Booking(booking_id='RECENT', room=self.room, user=self.user, date=today - timedelta(days=5),
+                    start_time=time(9), end_time=time(10)),
+        ])
+        self.cutoff = today - timedelta(days=90)
+    
+    def test_archives_in_batches(self):
+        self.assertEqual(archive_bookings(self.cutoff, batch_size=2, max_batches=1), 2)
+        self.assertEqual(ArchivedBooking.objects.count(), 2)
+        
+        self.assertEqual(archive_bookings(self.cutoff, batch_size=2), 3)
+        self.assertEqual(list(Booking.objects.values_list('booking_id', flat=True)), ['RECENT'])
+        self.assertEqual(
+            dict(ArchivedBooking.objects.values_list('booking_id', 'status')),
+            {'OLD0': 'CANCELLED', 'OLD1': 'COMPLETED', 'OLD2': 'COMPLETED', 'OLD3': 'COMPLETED', 'OLD4': 'COMPLETED'},
+        )
+        self.assertEqual(archive_bookings(self.cutoff, batch_size=2), 0)
+    
+    def test_archived_booking_is_still_found_by_id(self):
+        archive_bookings(self.cutoff, batch_size=10)
+        response = self.client.get('/api/v1/bookings/OLD3/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'COMPLETED')
+
+
+class BookingHoldTests(BookingAPITestCase):
+    """Holds block their slot until confirmed, released or expired."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.other = make_user('grace')
+        self.room = make_room('H1')
+    
+    def place_hold(self, user):
+        data = {'room': self.room.pk, 'date': self.day.isoformat(), 'start_time': '09:00',
+                'end_time': '10:00', 'user': user.pk}
+        return self.client.post('/api/v1/bookings/holds/', data, format='json')
+    
+    def test_hold_blocks_the_slot_until_confirmed(self):
+        response = self.place_hold(self.user)
+        self.assertEqual(response.status_code, 201, response.content)
+        hold_id = response.json()['hold']['hold_id']
+        
+        self.assertEqual(self.place_hold(self.other).status_code, 400)
+        self.assertEqual(self.book(self.room, user=self.other).status_code, 400)
+        
+        response = self.client.post(f'/api/v1/bookings/holds/{hold_id}/confirm/')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['booking']['room']['id'], self.room.pk)
+        self.assertIsNone(hold_store.get(hold_id))
+        self.assertEqual(self.client.post(f'/api/v1/bookings/holds/{hold_id}/confirm/').status_code, 404)
+    
+    def test_released_hold_frees_the_slot(self):
+        hold_id = self.place_hold(self.user).json()['hold']['hold_id']
+        self.assertEqual(self.client.delete(f'/api/v1/bookings/holds/{hold_id}/').status_code, 204)
+        self.assertEqual(self.client.delete(f'/api/v1/bookings/holds/{hold_id}/').status_code, 404)
+        self.assertEqual(self.book(self.room, user=self.other).status_code, 201)
+    
+    def test_expired_hold_frees_the_slot(self):
+        hold_id = self.place_hold(self.user).json()['hold']['hold_id']
+        later = timezone.now() + timedelta(seconds=settings.BOOKING_HOLD_TTL_SECONDS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertIsNone(hold_store.get(hold_id))
+            self.assertEqual(self.client.post(f'/api/v1/bookings/holds/{hold_id}/confirm/').status_code, 404)
+            self.assertEqual(self.book(self.room, user=self.other).status_code, 201)
+    
+    def test_reads_never_rewrite_the_index(self):
+        self.place_hold(self.user)
+        later = timezone.now() + timedelta(seconds=settings.BOOKING_HOLD_TTL_SECONDS + 1)
+        with mock.patch('django.utils.timezone.now', return_value=later), \
+                mock.patch.object(hold_store.cache, 'set') as cache_set, \
+                mock.patch.object(hold_store.cache, 'delete') as cache_delete:
+            self.assertEqual(hold_store.overlapping(self.room.pk, self.day, time(9), time(10)), [])
+            self.assertEqual(hold_store.get_occupancy(self.room.pk, self.day, time(9), time(10)), 0)
+        cache_set.assert_not_called()
+        cache_delete.assert_not_called()
+
+
+class BookingEventTests(BookingAPITestCase):
+    """Booking changes reach SSE subscribers once they commit."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.room = make_room('E1')
+        publish = mock.patch.object(get_broker(), 'publish')
+        self.publish = publish.start()
+        self.addCleanup(publish.stop)
+    
+    def published(self):
+        return [call.args[0] for call in self.publish.call_args_list]
+    
+    def test_create_and_cancel_publish_deltas(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking_id = self.book(self.room, user=self.user).json()['booking']['booking_id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(f'/api/v1/cancel/{booking_id}/').status_code, 200)
+        
+        created, cancelled = self.published()
+        self.assertEqual(created, {
+            'type': 'created', 'booking_id': booking_id, 'site': 'default', 'room': self.room.pk,
+            'date': self.day.isoformat(), 'start_time': '09:00:00', 'end_time': '10:00:00', 'occupancy': 1,
+        })
+        self.assertEqual(cancelled, dict(created, type='cancelled'))
+    
+    def test_rejected_booking_publishes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book(self.room, user=self.user)
+        self.publish.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.book(self.room, user=make_user('grace')).status_code, 400)
+        self.assertEqual(self.published(), [])
+    
+    def test_in_process_broker_hands_events_to_the_loop(self):
+        broker = InProcessBroker()
+        
+        async def receive():
+            subscription = broker.subscribe()
+            await asyncio.get_running_loop().run_in_executor(None, broker.publish, {'type': 'created'})
+            event = await asyncio.wait_for(subscription.get(), 1)
+            subscription.close()
+            return event
+        
+        self.assertEqual(asyncio.run(receive()), {'type': 'created'})
+        self.assertEqual(broker._subscribers, set())
+
+
+class SharedDeskCapacityTests(BookingAPITestCase):
+    """A shared desk takes a booking only if all of its seats fit."""
+    
+    def setUp(self):
+        super().setUp()
+        self.desk = make_room('D1', 'SHARED', capacity=4)
+        for name in ['ada', 'grace', 'alan']:
+            self.assertEqual(self.book(self.desk, user=make_user(name)).status_code, 201)
+        self.members = [make_user(name) for name in ['edsger', 'barbara', 'donald']]
+    
+    def test_team_that_would_overflow_is_rejected(self):
+        team = make_team('Trio', self.members)
+        response = self.book(self.desk, team=team)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], "Shared desk is full for the selected time slot.")
+        self.assertEqual(self.client.post('/api/v1/bookings/holds/', {
+            'room': self.desk.pk, 'date': self.day.isoformat(), 'start_time': '09:00', 'end_time': '10:00',
+            'team': team.pk,
+        }, format='json').status_code, 400)
+        self.assertFalse(shared_desk_has_room(Booking(
+            room=self.desk, date=self.day, start_time=time(9), end_time=time(10), team=team
+        )))
+    
+    def test_save_rejects_a_team_that_would_overflow(self):
+        # Booking.clean runs on every save, e.g. for stale snapshots or direct writes
+        booking = Booking(
+            room=self.desk, date=self.day, start_time=time(9, 30), end_time=time(10, 30),
+            team=make_team('Trio', self.members),
+        )
+        with self.assertRaisesMessage(ValidationError, "Shared desk is full for the selected time slot."):
+            booking.save()
+        self.assertEqual(Booking.objects.filter(room=self.desk).count(), 3)
+    
+    def test_team_that_fits_is_accepted(self):
+        team = make_team('Solo', self.members[:1] + [make_user('kid', age=6)])
+        self.assertEqual(self.book(self.desk, team=team).status_code, 201)
+        self.assertEqual(self.book(self.desk, user=make_user('ken')).status_code, 400)
+
+
+class MeetingSchedulerTests(BookingAPITestCase):
+    """The batch scheduler places meetings around room and team commitments."""
+    
+    def setUp(self):
+        super().setUp()
+        self.team = make_team('Trio', [make_user(name) for name in ['ada', 'grace', 'alan']])
+        self.room = make_room('C1', 'CONFERENCE', capacity=8)
+    
+    def test_starts_when_the_team_is_free_again(self):
+        # The team is busy 10-11 elsewhere; the conference room is empty all day
+        Booking.objects.bulk_create([Booking(
+            booking_id='TEAMBUSY', room=make_room('X1', 'SHARED', capacity=8), team=self.team,
+            date=self.day, start_time=time(10), end_time=time(11),
+        )])
+        plan = MeetingScheduler(self.day, [
+            {'team': self.team, 'duration': 60, 'earliest': time(10), 'latest': time(12)},
+        ]).run()
+        
+        self.assertEqual(plan['unplaced'], [])
+        placement, = plan['placed']
+        self.assertEqual((placement['room'], placement['start_time']), (self.room, time(11)))
+
+
+class OwnerBookingListTests(BookingAPITestCase):
+    """Users see their own and their teams' bookings; teams see their own."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.team = make_team('Trio', [self.user, make_user('grace'), make_user('alan')])
+        self.outsider = make_user('edsger')
+        self.desk = make_room('D1', 'SHARED', capacity=8)
+        
+        self.own = self.book(self.desk, '09:00', '10:00', day=self.day + timedelta(days=1), user=self.user)
+        self.team_booking = self.book(self.desk, '11:00', '12:00', team=self.team)
+        self.book(self.desk, user=self.outsider)
+        cancelled = self.book(self.desk, '14:00', '15:00', user=self.user).json()['booking']['booking_id']
+        self.client.post(f'/api/v1/cancel/{cancelled}/')
+        Booking.objects.bulk_create([Booking(
+            booking_id='PAST', room=self.desk, user=self.user, date=timezone.localdate() - timedelta(days=3),
+            start_time=time(9), end_time=time(10),
+        )])
+    
+    def booking_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [booking['booking_id'] for booking in response.json()['results']]
+    
+    def test_user_history(self):
+        own, team_booking = (response.json()['booking']['booking_id'] for response in [self.own, self.team_booking])
+        url = f'/api/v1/users/{self.user.pk}/bookings/'
+        self.assertEqual(self.booking_ids(url), [team_booking, own])
+        self.assertEqual(self.booking_ids(url + '?when=past'), ['PAST'])
+        self.assertEqual(len(self.booking_ids(url + '?when=all')), 4)
+        self.assertEqual(self.client.get('/api/v1/users/999/bookings/').status_code, 404)
+    
+    def test_team_history(self):
+        team_booking = self.team_booking.json()['booking']['booking_id']
+        self.assertEqual(self.booking_ids(f'/api/v1/teams/{self.team.pk}/bookings/?when=all'), [team_booking])
+
+
+@override_settings(BOOKING_QUOTAS={
+    'MAX_ACTIVE_BOOKINGS_PER_USER': 2, 'MAX_ACTIVE_BOOKINGS_PER_TEAM': 1, 'MAX_HOURS_PER_DAY': 9,
+})
+class BookingQuotaTests(BookingAPITestCase):
+    """Daily quotas count bookings, live holds and batch-scheduled meetings."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.desk = make_room('D1', 'SHARED', capacity=8)
+    
+    def usage(self):
+        return BookingUsage.objects.values_list('active_bookings', 'booked_minutes').get(user=self.user, date=self.day)
+    
+    def test_counters_follow_create_and_cancel(self):
+        booking_id = self.book(self.desk, '09:00', '10:30', user=self.user).json()['booking']['booking_id']
+        self.book(self.desk, '11:00', '12:00', user=self.user)
+        self.assertEqual(self.usage(), (2, 150))
+        
+        response = self.book(self.desk, '13:00', '14:00', user=self.user)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['code'], 'quota_exceeded')
+        
+        self.client.post(f'/api/v1/cancel/{booking_id}/')
+        self.assertEqual(self.usage(), (1, 60))
+        self.assertEqual(self.book(self.desk, '13:00', '14:00', user=self.user).status_code, 201)
+    
+    def test_live_holds_count_until_confirmed(self):
+        self.book(self.desk, '09:00', '10:00', user=self.user)
+        hold = self.client.post('/api/v1/bookings/holds/', {
+            'room': self.desk.pk, 'date': self.day.isoformat(), 'start_time': '11:00', 'end_time': '12:00',
+            'user': self.user.pk,
+        }, format='json')
+        self.assertEqual(hold.status_code, 201)
+        hold_id = hold.json()['hold']['hold_id']
+        
+        self.assertEqual(self.book(self.desk, '13:00', '14:00', user=self.user).json()['code'], 'quota_exceeded')
+        self.assertEqual(self.client.post(f'/api/v1/bookings/holds/{hold_id}/confirm/').status_code, 201)
+        self.assertEqual(self.usage(), (2, 120))
+        self.assertEqual(hold_store.get_owner_holds([self.day], user_id=self.user.pk), {})
+    
+    def schedule_payload(self, team, commit=True):
+        return {
+            'date': self.day.isoformat(), 'commit': commit,
+            'requests': [
+                {'team': team.pk, 'duration_minutes': 60, 'earliest': '09:00', 'latest': '18:00'},
+                {'team': team.pk, 'duration_minutes': 60, 'earliest': '09:00', 'latest': '18:00'},
+            ],
+        }
+    
+    def test_committed_plan_respects_quotas(self):
+        team = make_team('Trio', [self.user, make_user('grace'), make_user('alan')])
+        make_room('C1', 'CONFERENCE', capacity=8)
+        payload = self.schedule_payload(team)
+        
+        response = self.client.post('/api/v1/bookings/schedule/', payload, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('Booking limit reached', response.json()['error'])
+        self.assertFalse(Booking.objects.exists())
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(payload, f)
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'Booking limit reached'):
+                call_command('schedule_meetings', f.name, stdout=StringIO())
+        self.assertFalse(Booking.objects.exists())
+
+
+class IdempotencyTests(BookingAPITestCase):
+    """Retries with the same Idempotency-Key replay the first response."""
+    
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('ada')
+        self.room = make_room('I1')
+        self.data = {'room': self.room.pk, 'date': self.day.isoformat(), 'start_time': '09:00',
+                     'end_time': '10:00', 'user': self.user.pk}
+    
+    def post(self, data, key):
+        return self.client.post('/api/v1/bookings/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+    
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.data, 'key-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', first)
+        
+        retry = self.post(self.data, 'key-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Booking.objects.count(), 1)
+        
+        # Without the key the same body is a new, conflicting booking
+        self.assertEqual(self.client.post('/api/v1/bookings/', self.data, format='json').status_code, 400)
+    
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.post(self.data, 'key-1')
+        response = self.post(dict(self.data, start_time='11:00', end_time='12:00'), 'key-1')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+    
+    def test_cancel_retry_replays(self):
+        booking_id = self.post(self.data, 'key-1').json()['booking']['booking_id']
+        url = f'/api/v1/cancel/{booking_id}/'
+        first = self.client.post(url, HTTP_IDEMPOTENCY_KEY='key-2')
+        self.assertEqual(first.status_code, 200)
+        retry = self.client.post(url, HTTP_IDEMPOTENCY_KEY='key-2')
+        self.assertEqual((retry.status_code, retry['Idempotent-Replayed']), (200, 'true'))
+
+
+@override_settings(BOOKING_WEBHOOK_URLS=['http://hooks.example.com/bookings'])
+class OutboxTests(BookingAPITestCase):
+    """drain_outbox delivers each message, retrying failures with backoff."""
+    
+    def setUp(self):
+        super().setUp()
+        user = make_user('ada')
+        user.email = 'ada@example.com'
+        user.save()
+        self.book(make_room('O1'), user=user)
+        self.worker = OutboxWorker()
+        post_json = mock.patch.object(self.worker.http, 'post_json')
+        self.post_json = post_json.start()
+        self.addCleanup(post_json.stop)
+    
+    def statuses(self):
+        return dict(OutboxMessage.objects.values_list('channel', 'status'))
+    
+    def test_delivers_email_and_webhook(self):
+        self.assertEqual(self.worker.drain_once(), (2, 0))
+        self.assertEqual(self.statuses(), {'EMAIL': 'SENT', 'WEBHOOK': 'SENT'})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ada@example.com'])
+        self.assertEqual(self.post_json.call_args.args[0], 'http://hooks.example.com/bookings')
+        self.assertEqual(self.worker.drain_once(), (0, 0))
+    
+    def test_mail_outage_only_delays_emails(self):
+        connection = mock.Mock()
+        connection.open.side_effect = OSError('SMTP is down')
+        with mock.patch('bookings.outbox.get_connection', return_value=connection):
+            self.assertEqual(self.worker.drain_once(), (1, 1))
+        
+        self.assertEqual(self.statuses(), {'EMAIL': 'PENDING', 'WEBHOOK': 'SENT'})
+        email = OutboxMessage.objects.get(channel='EMAIL')
+        self.assertEqual((email.attempts, email.last_error), (1, 'OSError: SMTP is down'))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        # Not due again until its backoff has passed
+        self.assertEqual(self.worker.drain_once(), (0, 0))
+    
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_gives_up_after_max_attempts(self):
+        self.post_json.side_effect = OSError('connection refused')
+        self.assertEqual(self.worker.drain_once(), (1, 1))
+        OutboxMessage.objects.filter(channel='WEBHOOK').update(next_attempt_at=timezone.now())
+        self.assertEqual(self.worker.drain_once(), (0, 1))
+        
+        webhook = OutboxMessage.objects.get(channel='WEBHOOK')
+        self.assertEqual((webhook.status, webhook.attempts), ('FAILED', 2))
+        OutboxMessage.objects.filter(channel='WEBHOOK').update(next_attempt_at=timezone.now())
+        self.assertEqual(self.worker.drain_once(), (0, 0))
+
+
+class WaitlistPromotionTests(BookingAPITestCase):
+    """Cancelling a booking hands its slot to the waiters that fit, in order."""
+    
+    def join(self, room, **booker):
+        data = {'room': room.pk, 'date': self.day.isoformat(), 'start_time': '09:00', 'end_time': '10:00'}
+        data.update({key: value.pk for key, value in booker.items()})
+        response = self.client.post('/api/v1/bookings/waitlist/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return WaitlistEntry.objects.get(pk=response.json()['entry']['id'])
+    
+    def cancel(self, response):
+        booking_id = response.json()['booking']['booking_id']
+        self.assertEqual(self.client.post(f'/api/v1/cancel/{booking_id}/').status_code, 200)
+    
+    def test_private_room_goes_to_the_first_waiter(self):
+        room = make_room('W1')
+        booking = self.book(room, user=make_user('grace'))
+        first, second = self.join(room, user=make_user('ada')), self.join(room, user=make_user('alan'))
+        
+        self.cancel(booking)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('PROMOTED', 'WAITING'))
+        self.assertEqual(first.booking.user.username, 'ada')
+        self.assertEqual(Booking.objects.get(room=room, status='ACTIVE'), first.booking)
+    
+    def test_shared_desk_skips_waiters_that_do_not_fit(self):
+        desk = make_room('W2', 'SHARED', capacity=2)
+        booking = self.book(desk, user=make_user('grace'))
+        self.book(desk, user=make_user('alan'))
+        team = self.join(desk, team=make_team('Pair', [make_user('ada'), make_user('edsger')]))
+        single = self.join(desk, user=make_user('barbara'))
+        
+        self.cancel(booking)
+        team.refresh_from_db()
+        single.refresh_from_db()
+        self.assertEqual((team.status, single.status), ('WAITING', 'PROMOTED'))
+        self.assertEqual(Booking.objects.filter(room=desk, status='ACTIVE').count(), 2)
@@ -3,8 +3,21 @@ from . import views
 
 urlpatterns = [
     path('bookings/', views.BookingCreateView.as_view(), name='booking-create'),
+    path('bookings/auto/', views.AutoBookingCreateView.as_view(), name='booking-auto-create'),
+    path('bookings/schedule/', views.MeetingScheduleView.as_view(), name='booking-schedule'),
     path('bookings/list/', views.BookingListView.as_view(), name='booking-list'),
+    path('bookings/series/', views.BookingSeriesCreateView.as_view(), name='booking-series-create'),
+    path('bookings/series/<int:pk>/', views.BookingSeriesDetailView.as_view(), name='booking-series-detail'),
+    path('bookings/series/<int:pk>/cancel/', views.cancel_booking_series, name='booking-series-cancel'),
+    path('bookings/holds/', views.BookingHoldCreateView.as_view(), name='booking-hold-create'),
+    path('bookings/holds/<str:hold_id>/', views.release_hold, name='booking-hold-release'),
+    path('bookings/holds/<str:hold_id>/confirm/', views.BookingHoldConfirmView.as_view(), name='booking-hold-confirm'),
+    path('bookings/waitlist/', views.WaitlistCreateView.as_view(), name='booking-waitlist-create'),
+    path('bookings/waitlist/<int:pk>/', views.WaitlistEntryDetailView.as_view(), name='booking-waitlist-detail'),
     path('bookings/<str:booking_id>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('cancel/<str:booking_id>/', views.cancel_booking, name='booking-cancel'),
+    path('users/<int:user_id>/bookings/', views.UserBookingListView.as_view(), name='user-booking-list'),
+    path('teams/<int:team_id>/bookings/', views.TeamBookingListView.as_view(), name='team-booking-list'),
     path('rooms/available/', views.available_rooms, name='rooms-available'),
+    path('rooms/available/events/', views.availability_events, name='rooms-available-events'),
 ]
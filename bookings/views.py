@@ -1,23 +1,69 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q, Subquery
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from datetime import datetime
-from .models import Booking
+from operator import attrgetter
+import asyncio
+import json
+from .models import Booking, ArchivedBooking, BookingSeries, WaitlistEntry
 from .serializers import (
     BookingCreateSerializer, 
     BookingSerializer, 
-    BookingListSerializer
+    BookingListSerializer,
+    BookingSeriesSerializer,
+    BookingHoldSerializer,
+    AutoBookingSerializer,
+    MeetingScheduleSerializer,
+    MeetingPlanSerializer,
+    WaitlistEntrySerializer
 )
+from .allocation import auto_book
+from .availability import load_available_rooms, load_day
+from .scheduling import MeetingScheduler, commit_plan
+from .events import get_broker
+from .holds import hold_store
+from .quotas import QUOTA_ERROR_CODE, get_quota_error
+from .series import cancel_series, get_series_dates
+from core.conditional import ConditionalGetMixin
+from core.idempotency import idempotent
+from core.locks import LockTimeout
+from core.occupancy import to_minutes
+from core.singleflight import request_key, single_flight
+from core.sites import SiteMergedResults, get_current_site, get_site_database, get_sites
+from core.throttling import BookingCreateRateThrottle
 from rooms.models import Room
 from rooms.serializers import RoomSerializer, RoomAvailabilitySerializer
+from users.models import User, Team
+
+
+def get_quota_response(dates, start_time, end_time, user=None, team=None, exclude_hold=None):
+    """Return a 400 response if the booking would exceed a quota, else None."""
+    quota_error = get_quota_error(
+        dates, start_time, end_time, user=user, team=team, exclude_hold=exclude_hold
+    )
+    if quota_error:
+        return Response(
+            {"error": quota_error, "code": QUOTA_ERROR_CODE},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
 
 
 class BookingCreateView(generics.CreateAPIView):
     """Create a new booking."""
     
     serializer_class = BookingCreateSerializer
+    throttle_classes = [BookingCreateRateThrottle]
     
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         
@@ -29,23 +75,27 @@ class BookingCreateView(generics.CreateAPIView):
                 start_time = serializer.validated_data['start_time']
                 end_time = serializer.validated_data['end_time']
                 
-                # Check availability
-                if not self.is_room_available(room, date, start_time, end_time):
+                # Enforce per-owner quotas
+                quota_response = get_quota_response(
+                    [date], start_time, end_time,
+                    user=serializer.validated_data.get('user'),
+                    team=serializer.validated_data.get('team')
+                )
+                if quota_response:
+                    return quota_response
+                
+                # Check availability for the seats this booking takes
+                seats = Booking(**serializer.validated_data).occupancy_count
+                availability_error = self.check_availability(room, date, start_time, end_time, seats)
+                if availability_error:
                     return Response(
-                        {"error": "No available room for the selected slot and type."},
+                        {"error": availability_error},
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                # For shared desks, check capacity
-                if room.is_shared_desk:
-                    current_occupancy = self.get_shared_desk_occupancy(room, date, start_time, end_time)
-                    if current_occupancy >= room.capacity:
-                        return Response(
-                            {"error": "Shared desk is full for the selected time slot."},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                
-                booking = serializer.save()
+                # The outbox rows written by post_save commit with the booking
+                with transaction.atomic(using=get_site_database()):
+                    booking = serializer.save()
                 response_serializer = BookingSerializer(booking)
                 
                 return Response(
@@ -55,7 +105,7 @@ class BookingCreateView(generics.CreateAPIView):
                     },
                     status=status.HTTP_201_CREATED
                 )
-                
+            
             except Exception as e:
                 return Response(
                     {"error": str(e)},
@@ -64,44 +114,217 @@ class BookingCreateView(generics.CreateAPIView):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def is_room_available(self, room, date, start_time, end_time):
-        """Check if room is available for the given time slot."""
-        overlapping_bookings = Booking.objects.filter(
-            room=room,
-            date=date,
-            status='ACTIVE',
-            start_time__lt=end_time,
-            end_time__gt=start_time
+    def check_availability(self, room, date, start_time, end_time, seats, exclude_hold=None):
+        """Return an error message if `seats` cannot be booked in the slot, else None."""
+        # Warmed days need no query (Booking.clean re-checks against the database on save)
+        schedule = load_day([room], date, start_time, end_time, exclude_hold).rooms[room.pk]
+        if schedule.fits(to_minutes(start_time), to_minutes(end_time), seats):
+            return None
+        
+        if room.is_shared_desk:
+            return "Shared desk is full for the selected time slot."
+        return "No available room for the selected slot and type."
+
+
+class BookingHoldCreateView(BookingCreateView):
+    """Place a short-lived hold on a room slot, to be confirmed later."""
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        booking = Booking(**serializer.validated_data)
+        errors = booking.get_rule_errors()
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        quota_response = get_quota_response(
+            [booking.date], booking.start_time, booking.end_time,
+            user=booking.user, team=booking.team
+        )
+        if quota_response:
+            return quota_response
+        
+        try:
+            with hold_store.reserve(booking.room, booking.date):
+                availability_error = self.check_availability(
+                    booking.room, booking.date, booking.start_time, booking.end_time,
+                    booking.occupancy_count
+                )
+                if availability_error:
+                    return Response(
+                        {"error": availability_error},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                hold = hold_store.create(
+                    booking.room, booking.date, booking.start_time, booking.end_time,
+                    occupancy=booking.occupancy_count,
+                    user_id=booking.user_id,
+                    team_id=booking.team_id,
+                )
+        except LockTimeout:
+            return Response(
+                {"error": "This room is busy, please retry."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        return Response(
+            {
+                "message": "Hold placed successfully",
+                "hold": BookingHoldSerializer(hold).data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class BookingHoldConfirmView(BookingCreateView):
+    """Convert a hold into a booking."""
+    
+    def create(self, request, hold_id):
+        hold = hold_store.get(hold_id)
+        if hold is None:
+            return Response(
+                {"error": "Hold not found or expired"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = self.get_serializer(data={
+            'room': hold['room_id'],
+            'date': hold['date'],
+            'start_time': hold['start_time'],
+            'end_time': hold['end_time'],
+            'user': hold['user_id'],
+            'team': hold['team_id'],
+        })
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # The hold already counts toward the quota; don't count it twice
+        quota_response = get_quota_response(
+            [hold['date']], hold['start_time'], hold['end_time'],
+            user=serializer.validated_data.get('user'),
+            team=serializer.validated_data.get('team'),
+            exclude_hold=hold_id
         )
+        if quota_response:
+            return quota_response
         
-        # For private and conference rooms, no overlapping bookings allowed
-        if room.is_private_room or room.is_conference_room:
-            return not overlapping_bookings.exists()
+        try:
+            # The hold itself must not count against its own confirmation
+            availability_error = self.check_availability(
+                serializer.validated_data['room'], hold['date'],
+                hold['start_time'], hold['end_time'], hold['occupancy'], exclude_hold=hold_id
+            )
+            if availability_error:
+                return Response(
+                    {"error": availability_error},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            with transaction.atomic(using=get_site_database()):
+                booking = serializer.save()
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # For shared desks, check capacity
-        return True  # Capacity check is done separately
+        hold_store.release(hold_id)
+        return Response(
+            {
+                "message": "Booking confirmed successfully",
+                "booking": BookingSerializer(booking).data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+@api_view(['DELETE'])
+def release_hold(request, hold_id):
+    """Release a hold before it expires."""
+    if not hold_store.release(hold_id):
+        return Response(
+            {"error": "Hold not found or expired"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AutoBookingCreateView(generics.CreateAPIView):
+    """Book the best available room of the requested type."""
     
-    def get_shared_desk_occupancy(self, room, date, start_time, end_time):
-        """Get current occupancy for a shared desk in the given time slot."""
-        overlapping_bookings = Booking.objects.filter(
-            room=room,
-            date=date,
-            status='ACTIVE',
-            start_time__lt=end_time,
-            end_time__gt=start_time
+    serializer_class = AutoBookingSerializer
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        quota_response = get_quota_response(
+            [data['date']], data['start_time'], data['end_time'],
+            user=data.get('user'), team=data.get('team')
         )
+        if quota_response:
+            return quota_response
         
-        total_occupancy = 0
-        for booking in overlapping_bookings:
-            total_occupancy += booking.occupancy_count
+        try:
+            booking = auto_book(
+                data['room_type'], data['date'], data['start_time'], data['end_time'],
+                user=data.get('user'), team=data.get('team')
+            )
+        except DjangoValidationError as e:
+            if hasattr(e, 'error_dict'):
+                return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
+            return Response(
+                {"error": e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return total_occupancy
+        return Response(
+            {
+                "message": "Booking created successfully",
+                "booking": BookingSerializer(booking).data
+            },
+            status=status.HTTP_201_CREATED
+        )
 
 
-class BookingListView(generics.ListAPIView):
-    """List all active bookings."""
+class MeetingScheduleView(generics.GenericAPIView):
+    """Pack a batch of team meeting requests into conference rooms."""
+    
+    serializer_class = MeetingScheduleSerializer
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        plan = MeetingScheduler(data['date'], data['requests']).run()
+        response = {"plan": MeetingPlanSerializer(plan).data}
+        
+        if data['commit']:
+            try:
+                bookings = commit_plan(plan)
+            except DjangoValidationError as e:
+                return Response(
+                    {"error": f"Plan could not be committed: {'; '.join(e.messages)}"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            response["booking_ids"] = [booking.booking_id for booking in bookings]
+            return Response(response, status=status.HTTP_201_CREATED)
+        
+        return Response(response, status=status.HTTP_200_OK)
+
+
+class BookingListView(ConditionalGetMixin, generics.ListAPIView):
+    """List all active bookings, across every site unless one is selected."""
     
     serializer_class = BookingListSerializer
+    conditional_models = (Booking, Room, User, Team)
     
     def get_queryset(self):
         queryset = Booking.objects.filter(status='ACTIVE').select_related(
@@ -123,24 +346,97 @@ class BookingListView(generics.ListAPIView):
             queryset = queryset.filter(room__room_type=room_type)
         
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        if get_current_site() is not None or len(get_sites()) == 1:
+            return super().list(request, *args, **kwargs)
+        
+        # Query every site's database in parallel and merge by Meta.ordering
+        merged = SiteMergedResults(self.get_queryset, key=attrgetter('created_at'), reverse=True)
+        page = self.paginate_queryset(merged)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class BookingDetailView(generics.RetrieveAPIView):
+class OwnerBookingListView(generics.ListAPIView):
+    """
+    Base view for a user's or a team's bookings.
+    ``when`` selects ``upcoming`` (default, ACTIVE bookings from today),
+    ``past`` (bookings before today) or ``all``.
+    """
+    
+    serializer_class = BookingListSerializer
+    
+    def get_owner_filter(self):
+        raise NotImplementedError
+    
+    def get_queryset(self):
+        queryset = Booking.objects.filter(self.get_owner_filter()).select_related(
+            'room', 'user', 'team'
+        )
+        
+        today = timezone.localdate()
+        when = self.request.query_params.get('when', 'upcoming')
+        if when == 'upcoming':
+            queryset = queryset.filter(status='ACTIVE', date__gte=today).order_by('date', 'start_time')
+        elif when == 'past':
+            queryset = queryset.filter(date__lt=today).order_by('-date', '-start_time')
+        else:
+            queryset = queryset.order_by('-date', '-start_time')
+        
+        return queryset
+
+
+class UserBookingListView(OwnerBookingListView):
+    """List a user's bookings, including those made by their teams."""
+    
+    def get_owner_filter(self):
+        user = get_object_or_404(User, pk=self.kwargs['user_id'])
+        # Team bookings are matched with a subquery on the membership table
+        # so both sides are resolved by the (user|team, status, date) indexes
+        team_ids = Team.members.through.objects.filter(user_id=user.pk).values('team_id')
+        return Q(user_id=user.pk) | Q(team_id__in=Subquery(team_ids))
+
+
+class TeamBookingListView(OwnerBookingListView):
+    """List a team's bookings."""
+    
+    def get_owner_filter(self):
+        team = get_object_or_404(Team, pk=self.kwargs['team_id'])
+        return Q(team_id=team.pk)
+
+
+class BookingDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Get booking details by booking ID."""
     
     serializer_class = BookingSerializer
     lookup_field = 'booking_id'
+    conditional_models = (Booking, ArchivedBooking, Room, User, Team)
     
     def get_queryset(self):
         return Booking.objects.select_related('room', 'user', 'team')
+    
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Old bookings are moved out of the live table by archive_bookings
+            archived = ArchivedBooking.objects.select_related(
+                'room', 'user', 'team'
+            ).filter(booking_id=self.kwargs[self.lookup_field]).first()
+            if archived is None:
+                raise
+            return archived.to_booking()
 
 
 @api_view(['POST'])
+@idempotent
 def cancel_booking(request, booking_id):
     """Cancel a booking."""
     try:
-        booking = Booking.objects.get(booking_id=booking_id, status='ACTIVE')
-        booking.cancel()
+        with transaction.atomic(using=get_site_database()):
+            booking = Booking.objects.get(booking_id=booking_id, status='ACTIVE')
+            booking.cancel()
         
         serializer = BookingSerializer(booking)
         return Response(
@@ -150,7 +446,7 @@ def cancel_booking(request, booking_id):
             },
             status=status.HTTP_200_OK
         )
-        
+    
     except Booking.DoesNotExist:
         return Response(
             {"error": "Active booking not found"},
@@ -163,6 +459,118 @@ def cancel_booking(request, booking_id):
         )
 
 
+class BookingSeriesCreateView(generics.CreateAPIView):
+    """Create a recurring booking series."""
+    
+    serializer_class = BookingSeriesSerializer
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        quota_response = get_quota_response(
+            get_series_dates(BookingSeries(**data)), data['start_time'], data['end_time'],
+            user=data.get('user'), team=data.get('team')
+        )
+        if quota_response:
+            return quota_response
+        
+        series = serializer.save()
+        
+        return Response(
+            {
+                "message": f"Booking series created with {len(serializer.bookings)} occurrences",
+                "series": BookingSeriesSerializer(series).data,
+                "bookings": BookingListSerializer(serializer.bookings, many=True).data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class BookingSeriesDetailView(generics.RetrieveAPIView):
+    """Get a recurring booking series."""
+    
+    serializer_class = BookingSeriesSerializer
+    queryset = BookingSeries.objects.select_related('room', 'user', 'team')
+
+
+@api_view(['POST'])
+def cancel_booking_series(request, pk):
+    """Cancel a recurring series and all of its upcoming occurrences."""
+    try:
+        series = BookingSeries.objects.get(pk=pk, status='ACTIVE')
+    except BookingSeries.DoesNotExist:
+        return Response(
+            {"error": "Active booking series not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    bookings = cancel_series(series)
+    return Response(
+        {
+            "message": f"Booking series cancelled ({len(bookings)} occurrences)",
+            "series": BookingSeriesSerializer(series).data
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+class WaitlistCreateView(generics.CreateAPIView):
+    """Join the waitlist for a full room or room type."""
+    
+    serializer_class = WaitlistEntrySerializer
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        duplicate = WaitlistEntry.objects.filter(
+            status='WAITING',
+            room=data.get('room'),
+            room_type=data.get('room_type', ''),
+            date=data['date'],
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            user=data.get('user'),
+            team=data.get('team'),
+        )
+        if duplicate.exists():
+            return Response(
+                {"error": "Already waiting for this time slot"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        entry = serializer.save()
+        return Response(
+            {
+                "message": "Added to the waitlist",
+                "entry": WaitlistEntrySerializer(entry).data
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class WaitlistEntryDetailView(generics.RetrieveDestroyAPIView):
+    """Show a waitlist entry, or leave the waitlist."""
+    
+    serializer_class = WaitlistEntrySerializer
+    queryset = WaitlistEntry.objects.select_related('user', 'team', 'booking')
+    
+    def destroy(self, request, *args, **kwargs):
+        entry = self.get_object()
+        if entry.status != 'WAITING':
+            return Response(
+                {"error": "Waitlist entry is no longer waiting"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        entry.status = 'CANCELLED'
+        entry.save(update_fields=['status'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['GET'])
 def available_rooms(request):
     """Get available rooms for a specific time slot."""
@@ -171,52 +579,99 @@ def available_rooms(request):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    date = serializer.validated_data['date']
-    start_time = serializer.validated_data['start_time']
-    end_time = serializer.validated_data['end_time']
-    room_type = serializer.validated_data.get('room_type')
-    
-    # Get all active rooms
-    rooms = Room.objects.filter(is_active=True)
-    if room_type:
-        rooms = rooms.filter(room_type=room_type)
-    
-    available_rooms = []
-    
-    for room in rooms:
-        # Check for overlapping bookings
-        overlapping_bookings = Booking.objects.filter(
-            room=room,
-            date=date,
-            status='ACTIVE',
-            start_time__lt=end_time,
-            end_time__gt=start_time
-        )
-        
-        if room.is_private_room or room.is_conference_room:
-            # Private and conference rooms are available if no overlapping bookings
-            if not overlapping_bookings.exists():
-                available_rooms.append({
-                    'room': RoomSerializer(room).data,
-                    'available_capacity': room.capacity,
-                    'current_occupancy': 0
-                })
-        
-        elif room.is_shared_desk:
-            # Shared desks are available if capacity allows
-            current_occupancy = sum(booking.occupancy_count for booking in overlapping_bookings)
-            available_capacity = room.capacity - current_occupancy
-            
-            if available_capacity > 0:
-                available_rooms.append({
-                    'room': RoomSerializer(room).data,
-                    'available_capacity': available_capacity,
-                    'current_occupancy': current_occupancy
-                })
-    
-    return Response({
+    # Identical concurrent queries in this worker share one computation
+    payload = single_flight.do(
+        request_key(request, 'available_rooms'),
+        lambda: get_available_rooms(**serializer.validated_data)
+    )
+    return Response(payload)
+
+
+def get_available_rooms(date, start_time, end_time, room_type=None, location=None):
+    """
+    Build the available_rooms payload for a time slot.
+    Served from the warmed snapshot when there is one, otherwise from one
+    query for the rooms and one for their bookings.
+    """
+    available_rooms = [
+        {
+            'room': room if isinstance(room, dict) else RoomSerializer(room).data,
+            'available_capacity': available_capacity,
+            'current_occupancy': occupancy
+        }
+        for room, occupancy, available_capacity
+        in load_available_rooms(date, start_time, end_time, room_type, location)
+    ]
+    return {
         'date': date,
         'time_slot': f"{start_time} - {end_time}",
         'available_rooms': available_rooms,
         'total_available': len(available_rooms)
-    })
+    }
+
+
+async def availability_events(request):
+    """
+    Server-sent event stream of availability deltas.
+    Optional filters: ``date`` (YYYY-MM-DD) and ``room`` (comma separated ids).
+    With a site selected (X-Site / ``site``) only that site's events are sent.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "The event stream requires the ASGI application (config.asgi)."},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    date = request.GET.get('date')
+    if date:
+        try:
+            date = datetime.strptime(date, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            return JsonResponse(
+                {"error": "Invalid date, expected YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    room_ids = None
+    if request.GET.get('room'):
+        try:
+            room_ids = {int(room_id) for room_id in request.GET['room'].split(',')}
+        except ValueError:
+            return JsonResponse(
+                {"error": "Invalid room, expected comma separated room ids."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    site = get_current_site()
+    subscription = get_broker().subscribe()
+    heartbeat = settings.BOOKING_EVENT_HEARTBEAT_SECONDS
+    
+    async def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                if site and event['site'] != site:
+                    continue
+                if date and event['date'] != date:
+                    continue
+                if room_ids is not None and event['room'] not in room_ids:
+                    continue
+                
+                yield f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        finally:
+            subscription.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
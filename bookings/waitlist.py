@@ -0,0 +1,98 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.occupancy import to_minutes
+from .availability import load_day
+from .models import Booking, WaitlistEntry
+from .quotas import get_quota_error
+
+
+def get_waiters(booking):
+    """
+    WAITING entries, oldest first, that the cancelled booking could serve:
+    same date, an overlapping window, and either the same room or the
+    room's type. Uses the (date, id) partial index.
+    """
+    return WaitlistEntry.objects.filter(
+        Q(room_id=booking.room_id) | Q(room__isnull=True, room_type=booking.room.room_type),
+        status='WAITING',
+        date=booking.date,
+        start_time__lt=booking.end_time,
+        end_time__gt=booking.start_time,
+    ).select_related('user', 'team').order_by('id')
+
+
+def get_position(entry):
+    """1-based place of a WAITING entry among waiters for the same target and window."""
+    target = {'room_id': entry.room_id} if entry.room_id else {'room__isnull': True, 'room_type': entry.room_type}
+    return WaitlistEntry.objects.filter(
+        status='WAITING',
+        date=entry.date,
+        start_time__lt=entry.end_time,
+        end_time__gt=entry.start_time,
+        id__lte=entry.pk,
+        **target
+    ).count()
+
+
+def room_fits(candidate):
+    """Re-validate a candidate booking against live bookings and holds."""
+    day = load_day(
+        [candidate.room], candidate.date, candidate.start_time, candidate.end_time, use_snapshot=False
+    )
+    return day.rooms[candidate.room.pk].fits(
+        to_minutes(candidate.start_time), to_minutes(candidate.end_time), candidate.occupancy_count
+    )
+
+
+def promote_waiters(booking):
+    """
+    Book waiters into the room a cancelled booking freed.
+    
+    Runs inside the cancellation's transaction. Waiters are tried in FIFO
+    order; one whose rules, quota or seat count no longer fit stays
+    waiting. Each promotion gets its own savepoint, so a waiter rejected
+    on save never rolls back the cancellation. A private or conference
+    room takes the first fitting waiter, a shared desk keeps taking
+    waiters while seats remain. Returns the promoted entries.
+    """
+    room = booking.room
+    promoted = []
+    
+    for entry in get_waiters(booking):
+        candidate = Booking(
+            room=room,
+            date=entry.date,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+            user=entry.user,
+            team=entry.team,
+        )
+        if candidate.get_rule_errors():
+            continue
+        if get_quota_error([entry.date], entry.start_time, entry.end_time, user=entry.user, team=entry.team):
+            continue
+        if not room_fits(candidate):
+            continue
+        
+        # Lets the notification receiver send a promotion instead of a plain confirmation
+        candidate.waitlist_entry = entry
+        try:
+            with transaction.atomic(using=booking._state.db):
+                candidate.save()
+                
+                entry.status = 'PROMOTED'
+                entry.booking = candidate
+                entry.promoted_at = timezone.now()
+                entry.save(update_fields=['status', 'booking', 'promoted_at'])
+        except ValidationError:
+            # e.g. an overlapping booking the live checks above did not see
+            continue
+        promoted.append(entry)
+        
+        if not room.is_shared_desk:
+            break
+    
+    return promoted
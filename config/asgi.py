@@ -1,5 +1,8 @@
 """
 ASGI config for FreJun project.
+
+Serve with an ASGI server (e.g. ``uvicorn config.asgi:application``) to
+enable the availability event stream at /api/v1/rooms/available/events/.
 """
 
 import os
@@ -28,6 +28,7 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = [
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
 ]
 
@@ -35,11 +36,15 @@ LOCAL_APPS = [
     'users',
     'rooms',
     'bookings',
+    'analytics',
+    'core',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.tracing.TraceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -48,6 +53,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.SiteMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -78,6 +85,35 @@ DATABASES = {
     }
 }
 
+# Office sites. Each site's rooms and bookings live in their own database so
+# per-site writes don't contend; users and teams stay in 'default'.
+# e.g. BOOKING_SITES=annex,lab adds db_annex.sqlite3 and db_lab.sqlite3
+DEFAULT_SITE = 'default'
+SITE_DATABASES = {DEFAULT_SITE: 'default'}
+for _site in filter(None, os.environ.get('BOOKING_SITES', '').split(',')):
+    DATABASES[f'site_{_site}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{_site}.sqlite3',
+    }
+    SITE_DATABASES[_site] = f'site_{_site}'
+
+# Read replicas: primary alias -> replica aliases. Safe requests read from a
+# replica unless the client wrote in the last REPLICA_PIN_SECONDS.
+# e.g. DB_REPLICAS=2 adds db.replica1.sqlite3 and db.replica2.sqlite3 per
+# primary, refreshed from it by `manage.py sync_replicas`
+DATABASE_REPLICAS = {}
+REPLICA_PIN_SECONDS = 10
+for _alias in list(SITE_DATABASES.values()):
+    for _i in range(1, int(os.environ.get('DB_REPLICAS', '0')) + 1):
+        DATABASES[f'{_alias}_replica{_i}'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': Path(DATABASES[_alias]['NAME']).with_suffix(f'.replica{_i}.sqlite3'),
+            'TEST': {'MIRROR': _alias},
+        }
+        DATABASE_REPLICAS.setdefault(_alias, []).append(f'{_alias}_replica{_i}')
+
+DATABASE_ROUTERS = ['core.routers.SiteRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -109,6 +145,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+        'rest_framework.authentication.TokenAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
@@ -118,8 +159,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
+    'DEFAULT_THROTTLE_RATES': {
+        # Token bucket: bursts up to 30, refilled at 30 per minute
+        'booking_create': '30/min',
+    },
 }
 
+# Cache used by the token-bucket throttles
+THROTTLE_CACHE = 'default'
+
+# Idempotency-Key support: first responses are replayed for retries
+IDEMPOTENCY_CACHE = 'default'
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+
+# Conditional GET: the header sent with validators (change tokens are
+# stored per database in core.TableVersion)
+CONDITIONAL_GET_CACHE_CONTROL = 'private, no-cache'
+
+# Rows written per transaction by the user/team bulk import
+USER_IMPORT_BATCH_SIZE = 1000
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Only for development
 CORS_ALLOWED_ORIGINS = [
@@ -127,6 +186,14 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# Cache (local memory per process; point this at a shared cache such as
+# Redis when running several workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -134,4 +201,65 @@ AUTH_USER_MODEL = 'users.User'
 # CELERY_BROKER_URL = 'redis://localhost:6379/0'
 # CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+# Booking archive: bookings older than the horizon move to the archive table
+BOOKING_ARCHIVE_HORIZON_DAYS = 90
+BOOKING_ARCHIVE_BATCH_SIZE = 500
+
+# Recurring booking series: upper bound on occurrences materialized at once
+BOOKING_SERIES_MAX_OCCURRENCES = 260
+
+# Booking holds: short-lived reservations kept in the cache, not the database
+BOOKING_HOLD_CACHE = 'default'
+BOOKING_HOLD_TTL_SECONDS = 120
+
+# Availability event stream (SSE). The in-process broker only reaches clients
+# of the same worker; plug in a shared broker for multi-worker deployments.
+BOOKING_EVENT_BROKER = 'bookings.events.InProcessBroker'
+BOOKING_EVENT_HEARTBEAT_SECONDS = 15
+
+# Batch meeting scheduler bounds
+MEETING_SCHEDULER_MAX_REQUESTS = 200
+MEETING_SCHEDULER_MAX_ITERATIONS = 10000
+MEETING_SCHEDULER_TIME_BUDGET_SECONDS = 2.0
+
+# Booking quotas, counted per owner per day (None disables a limit)
+BOOKING_QUOTAS = {
+    'MAX_ACTIVE_BOOKINGS_PER_USER': 4,
+    'MAX_ACTIVE_BOOKINGS_PER_TEAM': 6,
+    'MAX_HOURS_PER_DAY': 9,
+}
+
+# Precomputed availability (warm_availability); deltas keep it current
+AVAILABILITY_SNAPSHOT_CACHE = 'default'
+AVAILABILITY_SNAPSHOT_DAYS = 7
+
+# Transactional outbox: booking emails and webhooks, delivered by drain_outbox
+BOOKING_WEBHOOK_URLS = [url for url in os.environ.get('BOOKING_WEBHOOK_URLS', '').split(',') if url]
+BOOKING_WEBHOOK_TIMEOUT = 5
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_LEASE_SECONDS = 60
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE_SECONDS = 5
+OUTBOX_RETRY_MAX_SECONDS = 3600
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'bookings@example.com')
+
+# Opt-in request profiling (cProfile + SQL timings), browsable by admins at
+# /api/v1/profiles/. Requests are profiled at PROFILING_SAMPLE_RATE, or when
+# they send PROFILING_HEADER (whose value must match PROFILING_TOKEN if set).
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_HEADER = 'X-Profile'
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 200
 
+# Opt-in traffic recording for `manage.py replay_trace`: every request under
+# TRACE_PATH_PREFIX is appended to TRACE_FILE as one JSON line. Bodies over
+# TRACE_MAX_BODY_BYTES are not kept; TRACE_REDACT_FIELDS are masked.
+TRACE_ENABLED = os.environ.get('TRACE_ENABLED', '') == '1'
+TRACE_FILE = os.environ.get('TRACE_FILE', str(BASE_DIR / 'traces' / 'requests.jsonl'))
+TRACE_PATH_PREFIX = '/api/v1/'
+TRACE_MAX_BODY_BYTES = 64 * 1024
+TRACE_REDACT_FIELDS = {'password'}
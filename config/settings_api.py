@@ -0,0 +1,47 @@
+"""
+API-only settings for the /api/v1/ worker pool.
+
+Same apps, databases and API behaviour as config.settings, minus the
+admin, sessions, messages, CSRF, clickjacking and template machinery.
+Clients authenticate with a token header, so no request touches the
+session table. Select with DJANGO_SETTINGS_MODULE=config.settings_api.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+# Browser-facing apps the JSON API never uses
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in {
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    }
+]
+
+# Only middleware that does work for a token-authenticated JSON request
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in {
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    }
+]
+
+ROOT_URLCONF = 'config.urls_api'
+
+# JSONRenderer only, no templates to render
+TEMPLATES = []
+
+# `Authorization: Token <key>`, from POST /api/v1/auth/token/
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.TokenAuthentication',
+    ],
+}
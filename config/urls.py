@@ -1,9 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path
+
+from .urls_api import urlpatterns as api_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/v1/', include('bookings.urls')),
-    path('api/v1/', include('rooms.urls')),
-    path('api/v1/', include('users.urls')),
-]
+] + api_urlpatterns
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.authtoken.views import obtain_auth_token
+
+# The API alone, served by config.settings_api; config.urls adds the admin
+urlpatterns = [
+    path('api/v1/auth/token/', obtain_auth_token, name='auth-token'),
+    path('api/v1/', include('bookings.urls')),
+    path('api/v1/', include('rooms.urls')),
+    path('api/v1/', include('users.urls')),
+    path('api/v1/', include('analytics.urls')),
+    path('api/v1/', include('core.urls')),
+]
@@ -0,0 +1,103 @@
+import hashlib
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import status
+
+from .sites import get_current_site
+
+
+class ChangeTracker:
+    """
+    Per-table change tokens kept in the database (core.TableVersion).
+    
+    Every write to a table replaces its token, so a token only matches
+    while the table is unchanged. Tokens live next to the data: each
+    process, management command and replica sees the version of the rows
+    it actually reads. A table never written since the database was
+    created has no row and reads as the empty token.
+    """
+    
+    def mark_changed(self, model, using=None):
+        # Imported here: this module loads while the app registry is populated
+        from .models import TableVersion
+        using = using or router.db_for_write(model)
+        label = model._meta.label_lower
+        values = {'token': uuid.uuid4().hex, 'changed_at': timezone.now()}
+        versions = TableVersion.objects.using(using)
+        if not versions.filter(table=label).update(**values):
+            # A single statement: on SQLite a read-then-insert transaction
+            # fails with "database is locked" when another writer is active.
+            # Losing the race leaves the other writer's token, which is new too.
+            versions.bulk_create([TableVersion(table=label, **values)], ignore_conflicts=True)
+    
+    def get_versions(self, models):
+        """(token, changed_at timestamp) per model, read from the database serving its reads."""
+        from .models import TableVersion
+        labels_by_database = defaultdict(list)
+        for model in models:
+            labels_by_database[router.db_for_read(model)].append(model._meta.label_lower)
+        
+        found = {}
+        for database, labels in labels_by_database.items():
+            found.update(
+                (table, (token, int(changed_at.timestamp())))
+                for table, token, changed_at in TableVersion.objects.using(database).filter(
+                    table__in=labels
+                ).values_list('table', 'token', 'changed_at')
+            )
+        return [found.get(model._meta.label_lower, ('', 0)) for model in models]
+
+
+change_tracker = ChangeTracker()
+
+
+def get_validators(request, models):
+    """Return (etag, last_modified) for a GET on data from the given tables."""
+    versions = change_tracker.get_versions(models)
+    # The site can come from a header, so it is part of the validator too
+    digest = hashlib.sha1(f'{get_current_site()}:{request.get_full_path()}'.encode())
+    for token, _ in versions:
+        digest.update(f'{token};'.encode())
+    return quote_etag(digest.hexdigest()), max(modified for _, modified in versions)
+
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or '')
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified support for read views.
+    
+    Validators come from the change tokens of `conditional_models`, so a
+    matching request gets a 304 after one small query per database,
+    before the view's queries or serialization run.
+    """
+    
+    conditional_models = ()
+    
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = get_validators(request, self.conditional_models)
+        if is_not_modified(request, etag, last_modified):
+            # Imported here: this module loads at app startup via core.signals
+            from rest_framework.response import Response
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = settings.CONDITIONAL_GET_CACHE_CONTROL
+        return response
@@ -0,0 +1,86 @@
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections reused across requests, one idle
+    connection per (scheme, host, port) per pool.
+    
+    Avoids a TCP (and TLS) handshake per webhook when a worker delivers a
+    batch to the same receivers.
+    """
+    
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+    
+    def _acquire(self, scheme, netloc):
+        with self._lock:
+            connection = self._idle.pop((scheme, netloc), None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(netloc, timeout=self.timeout)
+        return connection
+    
+    def _release(self, scheme, netloc, connection):
+        with self._lock:
+            if (scheme, netloc) in self._idle:
+                connection.close()
+            else:
+                self._idle[(scheme, netloc)] = connection
+    
+    def request(self, method, url, body=None, headers=None):
+        """Send a request and return (status, body bytes)."""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HTTPError(f'Unsupported URL: {url}')
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh connection in that case
+        for attempt in range(2):
+            connection = self._acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(parts.scheme, parts.netloc, connection)
+            return response.status, data
+    
+    def post_json(self, url, payload, headers=None):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        status, data = self.request('POST', url, body=body, headers={
+            'Content-Type': 'application/json',
+            **(headers or {}),
+        })
+        if status >= 300:
+            raise HTTPError(f'{url} answered {status}')
+        return status, data
+    
+    def close(self):
+        with self._lock:
+            connections, self._idle = list(self._idle.values()), {}
+        for connection in connections:
+            connection.close()
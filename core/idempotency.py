@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import json
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+from rest_framework.utils.encoders import JSONEncoder
+
+from .locks import LockTimeout, cache_lock
+from .sites import get_default_site
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyStore:
+    """
+    First responses to requests carrying an Idempotency-Key, kept in the
+    Django cache for IDEMPOTENCY_TTL_SECONDS as compact JSON.
+    """
+    
+    key_prefix = 'idempotency'
+    lock_timeout = 30
+    
+    @property
+    def cache(self):
+        return caches[settings.IDEMPOTENCY_CACHE]
+    
+    def make_key(self, request, idempotency_key):
+        """Keys are scoped to the site and the caller, so clients never see each other's responses."""
+        if request.user and request.user.is_authenticated:
+            caller = f'user:{request.user.pk}'
+        else:
+            caller = f'ip:{BaseThrottle().get_ident(request)}'
+        digest = hashlib.sha256(
+            f'{get_default_site()}:{caller}:{request.method}:{request.path}:{idempotency_key}'.encode()
+        ).hexdigest()
+        return f'{self.key_prefix}:{digest}'
+    
+    def get(self, key):
+        return self.cache.get(key)
+    
+    def save(self, key, fingerprint, response):
+        record = json.dumps(
+            [fingerprint, response.status_code, response.data],
+            cls=JSONEncoder,
+            separators=(',', ':'),
+        )
+        self.cache.set(key, record, settings.IDEMPOTENCY_TTL_SECONDS)
+    
+    def in_flight(self, key):
+        """Mark a key as in flight; raises LockTimeout if another request holds it."""
+        return cache_lock(self.cache, f'{key}:lock', self.lock_timeout, wait=0)
+
+
+idempotency_store = IdempotencyStore()
+
+
+def request_fingerprint(request):
+    return hashlib.sha256(
+        json.dumps(request.data, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def idempotent(handler):
+    """
+    Replay the stored first response for retried requests.
+    
+    Requests without an Idempotency-Key header run normally. The first
+    request with a key runs the handler and stores its response (except
+    server errors and throttling); retries get that response back without
+    re-running validation or touching the database.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            return handler(*args, **kwargs)
+        
+        key = idempotency_store.make_key(request, idempotency_key)
+        fingerprint = request_fingerprint(request)
+        
+        record = idempotency_store.get(key)
+        if record is None:
+            with ExitStack() as stack:
+                try:
+                    stack.enter_context(idempotency_store.in_flight(key))
+                except LockTimeout:
+                    return Response(
+                        {"error": "A request with this Idempotency-Key is still in progress."},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                
+                # The first request may have finished between the read and the lock
+                record = idempotency_store.get(key)
+                if record is None:
+                    response = handler(*args, **kwargs)
+                    if response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+                        idempotency_store.save(key, fingerprint, response)
+                    return response
+        
+        stored_fingerprint, status_code, data = json.loads(record)
+        if stored_fingerprint != fingerprint:
+            return Response(
+                {"error": "Idempotency-Key was already used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        
+        response = Response(data, status=status_code)
+        response[REPLAY_HEADER] = 'true'
+        return response
+    
+    return wrapper
@@ -0,0 +1,30 @@
+import secrets
+import time
+from contextlib import contextmanager
+
+
+class LockTimeout(Exception):
+    pass
+
+
+@contextmanager
+def cache_lock(cache, key, timeout, wait=None, poll=0.005):
+    """
+    Hold `key` in the cache as a lock shared by every worker.
+    
+    Waits up to `wait` seconds (default: `timeout`) and raises LockTimeout
+    instead of going on unlocked. The key expires after `timeout` seconds in case the holder
+    dies, so on release it is only deleted if it still holds this holder's
+    token: a lock that expired and was taken by another worker stays theirs.
+    """
+    token = secrets.token_hex(8)
+    deadline = time.monotonic() + (timeout if wait is None else wait)
+    while not cache.add(key, token, timeout):
+        if time.monotonic() >= deadline:
+            raise LockTimeout(key)
+        time.sleep(poll)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
@@ -0,0 +1,86 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+
+from core.sites import use_site
+from rooms.models import Room
+from rooms.provisioning import DEFAULT_SPEC, load_spec, provision
+
+
+def has_pending_migrations(alias):
+    """Whether `migrate` would apply anything to the database."""
+    executor = MigrationExecutor(connections[alias])
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
+class Command(BaseCommand):
+    help = 'Prepare databases, rooms and the admin user in one process, skipping steps already done'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--spec',
+            default=None,
+            help='Room spec to apply on every start (default: provision the 15-room layout only into empty sites)',
+        )
+        parser.add_argument(
+            '--no-superuser',
+            action='store_true',
+            help='Do not create the admin superuser',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Container start-up work: migrate, provision rooms, create the
+        superuser. Each step checks first, so a warm restart only reads.
+        """
+        self.migrate()
+        try:
+            self.provision_rooms(options['spec'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        if not options['no_superuser']:
+            self.create_superuser()
+
+    def migrate(self):
+        # Site databases share the migration graph; replicas are filled by sync_replicas
+        for alias in dict.fromkeys(settings.SITE_DATABASES.values()):
+            if has_pending_migrations(alias):
+                self.stdout.write(f"Migrating {alias}...")
+                call_command('migrate', database=alias, interactive=False, verbosity=0)
+            else:
+                self.stdout.write(f"{alias}: migrations up to date")
+
+    def provision_rooms(self, spec_path):
+        spec = load_spec(spec_path) if spec_path else DEFAULT_SPEC
+        for site in settings.SITE_DATABASES:
+            with use_site(site):
+                if spec_path is None and Room.objects.exists():
+                    self.stdout.write(f"{site}: rooms already provisioned")
+                    continue
+                result = provision(spec)
+            self.stdout.write(
+                f"{site}: {result['created']} rooms created, {result['updated']} updated, "
+                f"{result['deactivated']} deactivated"
+            )
+
+    def create_superuser(self):
+        # Same variables as `createsuperuser --noinput`
+        username = os.environ.get('DJANGO_SUPERUSER_USERNAME', 'admin')
+        User = get_user_model()
+        if User.objects.filter(username=username).exists():
+            self.stdout.write("Superuser already exists")
+            return
+        
+        User.objects.create_superuser(
+            username,
+            os.environ.get('DJANGO_SUPERUSER_EMAIL', 'admin@example.com'),
+            os.environ.get('DJANGO_SUPERUSER_PASSWORD', 'admin123'),
+            age=30,
+            gender='M',
+        )
+        self.stdout.write(self.style.SUCCESS(f"Superuser created: {username}"))
@@ -0,0 +1,484 @@
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import StringIO
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import Resolver404, resolve, reverse
+
+from core.http import ConnectionPool
+from core.replicas import get_primary, is_replica
+from core.tracing import read_trace
+
+# Values that legitimately differ between a recording and its replay
+IGNORED_FIELDS = {
+    'created_at', 'updated_at', 'cancelled_at', 'promoted_at', 'archived_at', 'expires_at', 'token',
+}
+
+# IDs the fresh database hands out differently. Random string IDs (a
+# waitlist entry's `booking` is a booking_id) are unique on their own;
+# integer keys are mapped per kind of object, and per site for objects
+# stored in a site's database.
+TOKEN_FIELDS = {'booking_id', 'hold_id', 'booking'}
+SITE_KINDS = {'room', 'booking', 'series', 'waitlist'}
+
+# Request and response fields holding objects, or keys, of a kind
+FIELD_KINDS = {
+    'user': 'user', 'members': 'user', 'member_ids': 'user', 'created_by': 'user',
+    'team': 'team', 'room': 'room', 'series': 'series', 'entry': 'waitlist',
+}
+
+# Kind of the objects each endpoint returns, and of its <pk> path argument
+ROUTE_KINDS = {
+    'user-list': 'user',
+    'team-list': 'team',
+    'room-list': 'room',
+    'booking-series-create': 'series',
+    'booking-series-detail': 'series',
+    'booking-series-cancel': 'series',
+    'booking-waitlist-create': 'waitlist',
+    'booking-waitlist-detail': 'waitlist',
+}
+PATH_KINDS = {'user_id': 'user', 'team_id': 'team'}
+
+MAX_REPORTED_DIVERGENCES = 20
+
+
+def normalize(value, ignored):
+    if isinstance(value, dict):
+        return {key: normalize(item, ignored) for key, item in value.items() if key not in ignored}
+    if isinstance(value, list):
+        return [normalize(item, ignored) for item in value]
+    return value
+
+
+def first_difference(expected, actual, where=''):
+    """Location of the first difference between two JSON values, or None."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(expected.keys() | actual.keys()):
+            if key not in expected or key not in actual:
+                return f'{where}.{key}'
+            difference = first_difference(expected[key], actual[key], f'{where}.{key}')
+            if difference:
+                return difference
+        return None
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return f'{where}[] length {len(expected)} != {len(actual)}'
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            difference = first_difference(left, right, f'{where}[{index}]')
+            if difference:
+                return difference
+        return None
+    return None if expected == actual else (where or '.')
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def route_of(path):
+    """The URL pattern a path resolves to, so latencies group per endpoint."""
+    try:
+        return '/' + resolve(path.split('?', 1)[0]).route
+    except Resolver404:
+        return path.split('?', 1)[0]
+
+
+def route_kind(path):
+    try:
+        return ROUTE_KINDS.get(resolve(path.split('?', 1)[0]).url_name)
+    except Resolver404:
+        return None
+
+
+def site_of(record):
+    """The site a request was sent to, as SiteMiddleware picks it; None for the default."""
+    query = dict(parse_qsl(record['path'].partition('?')[2]))
+    site = (record.get('headers') or {}).get('X-Site') or query.get('site')
+    return None if site == settings.DEFAULT_SITE else site
+
+
+def is_key(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def find_rooms(value, kind, site, found):
+    """Collect room number -> ID, per site, from the rooms in a response."""
+    if isinstance(value, dict):
+        if kind == 'room' and is_key(value.get('id')) and 'room_number' in value:
+            found[site][value['room_number']] = value['id']
+        for key, item in value.items():
+            find_rooms(item, FIELD_KINDS.get(key, kind if key == 'results' else None), site, found)
+    elif isinstance(value, list):
+        for item in value:
+            find_rooms(item, kind, site, found)
+
+
+class IdMap:
+    """
+    Recorded IDs and the IDs the replay target gave the same objects.
+    
+    Learned by walking each recorded response alongside the replayed one,
+    then applied to the paths and bodies of later requests, and to the
+    recorded responses before they are compared.
+    """
+    
+    def __init__(self):
+        self.tokens = {}
+        self.keys = defaultdict(dict)
+    
+    def scope(self, kind, site):
+        return (kind, site if kind in SITE_KINDS else None)
+    
+    def add(self, kind, site, recorded, replayed):
+        if is_key(recorded) and is_key(replayed) and recorded != replayed:
+            # First pairing wins: a later, diverged response must not remap it
+            self.keys[self.scope(kind, site)].setdefault(recorded, replayed)
+    
+    def learn(self, recorded, replayed, kind, site):
+        """Pair up the IDs of a recorded response with those of its replay."""
+        if isinstance(recorded, dict) and isinstance(replayed, dict):
+            for key in recorded.keys() & replayed.keys():
+                if key in TOKEN_FIELDS and isinstance(recorded[key], str) and isinstance(replayed[key], str):
+                    self.tokens.setdefault(recorded[key], replayed[key])
+                elif key == 'id':
+                    if kind:
+                        self.add(kind, site, recorded[key], replayed[key])
+                else:
+                    child_kind = FIELD_KINDS.get(key, kind if key == 'results' else None)
+                    self.learn(recorded[key], replayed[key], child_kind, site)
+        elif isinstance(recorded, list) and isinstance(replayed, list) and len(recorded) == len(replayed):
+            for recorded_item, replayed_item in zip(recorded, replayed):
+                self.learn(recorded_item, replayed_item, kind, site)
+        elif kind:
+            self.add(kind, site, recorded, replayed)
+    
+    def translate(self, value, kind, site):
+        """`value` (a request body or recorded response) with learned IDs swapped in."""
+        if isinstance(value, dict):
+            return {
+                key: self.translate(
+                    item, kind if key in ('id', 'results') else FIELD_KINDS.get(key), site
+                )
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.translate(item, kind, site) for item in value]
+        if isinstance(value, str):
+            if value in self.tokens:
+                return self.tokens[value]
+            if kind and value.isdigit():
+                return str(self.keys[self.scope(kind, site)].get(int(value), value))
+            return value
+        if kind and is_key(value):
+            return self.keys[self.scope(kind, site)].get(value, value)
+        return value
+    
+    def translate_path(self, path, site):
+        path, _, query = path.partition('?')
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return path + ('?' + query if query else '')
+        kind = ROUTE_KINDS.get(match.url_name)
+        kwargs = {
+            name: self.translate(value, PATH_KINDS.get(name, kind), site)
+            for name, value in match.kwargs.items()
+        }
+        path = reverse(match.view_name, kwargs=kwargs)
+        if query:
+            path += '?' + urlencode([
+                (name, self.translate(value, FIELD_KINDS.get(name), site))
+                for name, value in parse_qsl(query, keep_blank_values=True)
+            ])
+        return path
+    
+    def translate_record(self, record):
+        """The request to send for a recorded one."""
+        site = site_of(record)
+        body = record.get('body')
+        if body is not None and record.get('content_type') == 'application/json':
+            try:
+                body = json.dumps(self.translate(json.loads(body), None, site))
+            except ValueError:
+                pass
+        elif body is not None:
+            body = urlencode([
+                (name, self.translate(value, FIELD_KINDS.get(name), site))
+                for name, value in parse_qsl(body, keep_blank_values=True)
+            ])
+        return {**record, 'path': self.translate_path(record['path'], site), 'body': body}
+
+
+class Command(BaseCommand):
+    help = 'Replay a recorded API trace against a fresh database and report latency and divergence'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'trace',
+            nargs='?',
+            default=None,
+            help='JSONL trace recorded by TraceMiddleware (default: TRACE_FILE)',
+        )
+        parser.add_argument(
+            '--speed',
+            type=float,
+            default=0,
+            help='Multiple of the recorded pace (1 = real time, 2 = twice as fast); 0 sends as fast as possible',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Requests in flight at once; 1 replays strictly in recorded order',
+        )
+        parser.add_argument(
+            '--url',
+            default=None,
+            help='Replay over HTTP against a running server (already on a fresh database) instead of in-process',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Replay only the first N requests',
+        )
+        parser.add_argument(
+            '--ignore-field',
+            action='append',
+            default=[],
+            help='Extra response field to leave out of the divergence check (repeatable)',
+        )
+    
+    def handle(self, *args, **options):
+        path = options['trace'] or settings.TRACE_FILE
+        try:
+            records = sorted(read_trace(path), key=lambda record: record.get('ts', 0))
+        except OSError as e:
+            raise CommandError(str(e))
+        records = records[:options['limit']]
+        if not records:
+            raise CommandError(f'No requests recorded in {path}')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+        
+        self.ignored = IGNORED_FIELDS | set(options['ignore_field'])
+        self.ids = IdMap()
+        if options['url']:
+            if not options['url'].startswith(('http://', 'https://')):
+                raise CommandError('--url must be an http:// or https:// address')
+            self.pool = ConnectionPool(timeout=30)
+            self.base_url = options['url'].rstrip('/')
+            try:
+                self.map_rooms(records, self.send_http)
+                results = self.replay(records, self.send_http, options['speed'], options['concurrency'])
+            except OSError as e:
+                raise CommandError(f"Cannot reach {options['url']}: {e}")
+            finally:
+                self.pool.close()
+        else:
+            self.clients = threading.local()
+            with self.fresh_databases():
+                self.map_rooms(records, self.send_local)
+                results = self.replay(records, self.send_local, options['speed'], options['concurrency'])
+        
+        self.report(records, results)
+    
+    @contextmanager
+    def fresh_databases(self):
+        """
+        Throwaway copies of every database: migrated, with rooms provisioned.
+        Runs in Django's test environment, so the test client's host is
+        allowed and mail stays in memory.
+        """
+        setup_test_environment()
+        directory = tempfile.mkdtemp(prefix='replay-')
+        for alias in connections:
+            test_settings = connections[alias].settings_dict.setdefault('TEST', {})
+            if is_replica(alias):
+                test_settings['MIRROR'] = get_primary(alias)
+            elif connections[alias].vendor == 'sqlite':
+                # Files rather than shared memory, so worker threads don't contend on table locks
+                test_settings['NAME'] = os.path.join(directory, f'{alias}.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            call_command('bootstrap', no_superuser=True, stdout=StringIO())
+            # The replay must not append itself to the trace it is reading
+            with override_settings(TRACE_ENABLED=False):
+                yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            shutil.rmtree(directory, ignore_errors=True)
+            teardown_test_environment()
+    
+    def map_rooms(self, records, send):
+        """
+        Rooms are provisioned, not created by the trace, so no response pairs
+        them up: match the recorded rooms to the target's by room number.
+        """
+        recorded = defaultdict(dict)
+        for record in records:
+            find_rooms(record.get('response'), route_kind(record['path']), site_of(record), recorded)
+        
+        for site, rooms in recorded.items():
+            target = defaultdict(dict)
+            path = reverse('room-list')
+            while path:
+                status, content = send({
+                    'method': 'GET', 'path': path, 'headers': {'X-Site': site} if site else {},
+                })
+                if status != 200:
+                    self.stderr.write(
+                        f'Cannot list the rooms of site {site or settings.DEFAULT_SITE} (status {status})'
+                    )
+                    break
+                page = json.loads(content)
+                find_rooms(page, 'room', site, target)
+                path = page.get('next') and urlsplit(page['next'])._replace(scheme='', netloc='').geturl()
+            for room_number, recorded_id in rooms.items():
+                if room_number in target[site]:
+                    self.ids.add('room', site, recorded_id, target[site][room_number])
+    
+    def replay(self, records, send, speed, concurrency):
+        """Send every record, paced by `speed`; returns (status, JSON body, ms) per record."""
+        first_ts = records[0].get('ts', 0)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            for record in records:
+                if speed > 0:
+                    delay = (record.get('ts', first_ts) - first_ts) / speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                futures.append(executor.submit(self.timed, send, record))
+                if concurrency == 1:
+                    # Strict recorded order: wait for each response before the next request
+                    futures[-1].result()
+            results = [future.result() for future in futures]
+        self.elapsed = time.perf_counter() - start
+        return results
+    
+    def timed(self, send, record):
+        # Translated when sent, so IDs learned from every earlier response apply
+        request = self.ids.translate_record(record)
+        start = time.perf_counter()
+        status, content = send(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        try:
+            data = json.loads(content) if content else None
+        except ValueError:
+            data = None
+        if status == record.get('status') and record.get('response') is not None:
+            self.ids.learn(record['response'], data, route_kind(record['path']), site_of(record))
+        return status, data, elapsed_ms
+    
+    def get_headers(self, record):
+        headers = dict(record.get('headers') or {})
+        if record.get('body') is not None:
+            headers['Content-Type'] = record['content_type']
+        return headers
+    
+    def send_local(self, record):
+        client = getattr(self.clients, 'client', None)
+        if client is None:
+            client = self.clients.client = Client(raise_request_exception=False)
+        extra = {
+            'HTTP_' + name.upper().replace('-', '_'): value
+            for name, value in (record.get('headers') or {}).items()
+        }
+        response = client.generic(
+            record['method'],
+            record['path'],
+            data=(record.get('body') or '').encode('utf-8'),
+            content_type=record.get('content_type') or 'application/octet-stream',
+            **extra
+        )
+        if response.streaming:
+            return response.status_code, b''
+        return response.status_code, response.content
+    
+    def send_http(self, record):
+        body = record.get('body')
+        return self.pool.request(
+            record['method'],
+            self.base_url + record['path'],
+            body=body.encode('utf-8') if body is not None else None,
+            headers=self.get_headers(record),
+        )
+    
+    def report(self, records, results):
+        latencies = defaultdict(list)
+        recorded = defaultdict(list)
+        divergences = []
+        status_mismatches = body_mismatches = omitted = 0
+        
+        for record, (status, data, elapsed_ms) in zip(records, results):
+            route = f"{record['method']} {route_of(record['path'])}"
+            latencies[route].append(elapsed_ms)
+            if record.get('ms') is not None:
+                recorded[route].append(record['ms'])
+            if record.get('body_omitted'):
+                omitted += 1
+            
+            if status != record.get('status'):
+                status_mismatches += 1
+                divergences.append(f"{record['method']} {record['path']}: status {record.get('status')} -> {status}")
+            elif record.get('response') is not None:
+                expected = self.ids.translate(record['response'], route_kind(record['path']), site_of(record))
+                difference = first_difference(normalize(expected, self.ignored), normalize(data, self.ignored))
+                if difference:
+                    body_mismatches += 1
+                    divergences.append(f"{record['method']} {record['path']}: body differs at {difference}")
+        
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{len(records)} requests in {self.elapsed:.2f}s ({len(records) / self.elapsed:.1f} req/s)'
+        ))
+        self.stdout.write(
+            f"{'endpoint':<56}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'rec p50':>10}"
+        )
+        everything = []
+        for route in sorted(latencies, key=lambda route: -len(latencies[route])):
+            samples = sorted(latencies[route])
+            everything.extend(samples)
+            recorded_p50 = statistics.median(recorded[route]) if recorded[route] else float('nan')
+            self.stdout.write(
+                f"{route[:55]:<56}{len(samples):>7}{percentile(samples, .5):>9.1f}"
+                f"{percentile(samples, .95):>9.1f}{percentile(samples, .99):>9.1f}"
+                f"{samples[-1]:>9.1f}{recorded_p50:>10.1f}"
+            )
+        everything.sort()
+        self.stdout.write(
+            f"{'all (ms)':<56}{len(everything):>7}{percentile(everything, .5):>9.1f}"
+            f"{percentile(everything, .95):>9.1f}{percentile(everything, .99):>9.1f}{everything[-1]:>9.1f}"
+        )
+        
+        self.stdout.write('')
+        if omitted:
+            self.stdout.write(f'{omitted} requests were recorded without their body (uploads or large bodies)')
+        if not divergences:
+            self.stdout.write(self.style.SUCCESS('No divergence from the recorded responses'))
+            return
+        self.stdout.write(self.style.WARNING(
+            f'{status_mismatches} status and {body_mismatches} body divergences:'
+        ))
+        for line in divergences[:MAX_REPORTED_DIVERGENCES]:
+            self.stdout.write('  ' + line)
+        if len(divergences) > MAX_REPORTED_DIVERGENCES:
+            self.stdout.write(f'  ... and {len(divergences) - MAX_REPORTED_DIVERGENCES} more')
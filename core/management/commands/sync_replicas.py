@@ -0,0 +1,47 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Copy SQLite primaries onto their file-based read replicas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep syncing every this many seconds (simulates replication lag)',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured (set DB_REPLICAS).')
+        
+        while True:
+            self.sync()
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
+
+    def sync(self):
+        for primary, replicas in settings.DATABASE_REPLICAS.items():
+            source = settings.DATABASES[primary]
+            if source['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f'{primary} is not SQLite; use the server\'s own replication.')
+            
+            src = sqlite3.connect(str(source['NAME']))
+            try:
+                for replica in replicas:
+                    dst = sqlite3.connect(str(settings.DATABASES[replica]['NAME']))
+                    try:
+                        # The backup API copies a consistent snapshot, even mid-write
+                        src.backup(dst)
+                    finally:
+                        dst.close()
+            finally:
+                src.close()
+            
+            self.stdout.write(f"Synced {primary} -> {', '.join(replicas)}")
@@ -0,0 +1,51 @@
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Run a local stub webhook receiver that logs every delivery'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument(
+            '--fail-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of deliveries answered with 500, to exercise retries',
+        )
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+        fail_rate = options['fail_rate']
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like a real receiver, so pooled connections are reused
+            protocol_version = 'HTTP/1.1'
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                failing = random.random() < fail_rate
+                try:
+                    event = json.loads(body).get('event')
+                except ValueError:
+                    event = None
+                stdout.write(f"{'500' if failing else '200'} {self.path} {event} {body.decode(errors='replace')}")
+                
+                self.send_response(500 if failing else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Listening on http://127.0.0.1:{options['port']}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.http import JsonResponse
+
+from .replicas import RoutingState, routing_state
+from .sites import use_site
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class SiteMiddleware:
+    """
+    Select the office site for a request from the X-Site header or the
+    ``site`` query parameter. Requests without one use DEFAULT_SITE for
+    writes; list endpoints may fan out across all sites.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        site = request.headers.get('X-Site') or request.GET.get('site')
+        if site is not None and site not in settings.SITE_DATABASES:
+            return JsonResponse({"error": f"Unknown site '{site}'."}, status=400)
+        
+        with use_site(site):
+            return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from replicas, with read-your-writes pinning.
+    
+    A request that writes sets a short-lived cookie; while it is present
+    the client's reads go to the primary, so it never sees replica lag
+    hide its own write.
+    """
+    
+    cookie_name = 'db_pin'
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        pinned = self.cookie_name in request.COOKIES
+        state = RoutingState(allow_replica=request.method in SAFE_METHODS and not pinned)
+        
+        with routing_state(state):
+            response = self.get_response(request)
+        
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class TableVersion(models.Model):
+    """
+    Change token of one table, stored in the database that holds the table.
+    
+    Every write replaces the token in the writer's transaction, so it
+    commits (and is copied to replicas) together with the data it describes.
+    """
+    
+    table = models.CharField(max_length=100, primary_key=True)
+    token = models.CharField(max_length=32)
+    changed_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.table} {self.token}"
@@ -0,0 +1,213 @@
+"""
+Room-type-aware occupancy rules, in plain Python.
+
+Everything that decides whether a window on a room can be booked lives
+here: business hours, which bookers a room type accepts, how many seats
+a booking takes, and the per-room interval lists that exclusivity,
+shared-desk headcount and fragmentation are computed from. Nothing in
+this module touches the ORM or the cache; callers fetch a day once
+(see bookings.availability) and ask the schedule. Times are minutes
+since midnight.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import time
+
+PRIVATE = 'PRIVATE'
+CONFERENCE = 'CONFERENCE'
+SHARED = 'SHARED'
+
+# Bookings are allowed between 9 AM and 6 PM
+OPENING_TIME = time(9, 0)
+CLOSING_TIME = time(18, 0)
+OPENING_MINUTE = OPENING_TIME.hour * 60
+CLOSING_MINUTE = CLOSING_TIME.hour * 60
+
+# Users under this age are children: counted, but take no seat
+CHILD_AGE = 10
+
+# Conference rooms are for teams of at least this many members
+CONFERENCE_MIN_MEMBERS = 3
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def is_child(age):
+    return age < CHILD_AGE
+
+
+def booking_seats(user_age=None, team_adults=None):
+    """
+    Seats a booking takes: a team's adult members, else 1 for an adult
+    booker. A booker of unknown age counts as an adult.
+    """
+    if team_adults is not None:
+        return team_adults
+    return 0 if user_age is not None and is_child(user_age) else 1
+
+
+def is_conference_eligible(member_count):
+    return member_count >= CONFERENCE_MIN_MEMBERS
+
+
+def within_business_hours(start, end):
+    return start >= OPENING_MINUTE and end <= CLOSING_MINUTE
+
+
+def room_rule_error(room_type, is_team, member_count=None):
+    """
+    Why a room type does not accept this booker, or None.
+    `member_count` is only needed for a team on a conference room.
+    """
+    if room_type == PRIVATE and is_team:
+        return "Private rooms can only be booked by individual users."
+    if room_type == CONFERENCE:
+        if not is_team:
+            return "Conference rooms can only be booked by teams with 3+ members."
+        if not is_conference_eligible(member_count):
+            return "Conference rooms require teams with at least 3 members."
+    # Shared desks take anyone, up to capacity
+    return None
+
+
+@dataclass(slots=True)
+class Interval:
+    """A booking or hold on a room: [start, end) taking `seats` seats."""
+    
+    start: int
+    end: int
+    seats: int = 1
+    key: object = None
+
+
+@dataclass(slots=True)
+class RoomSchedule:
+    """
+    One room's intervals for a day, sorted by start.
+    
+    Overlap queries bisect on the start list; since no interval is longer
+    than `longest`, only those starting after `start - longest` can reach
+    into the window.
+    """
+    
+    room_id: int
+    room_type: str
+    capacity: int
+    label: str = ''
+    intervals: list = field(default_factory=list)
+    starts: list = field(default_factory=list)
+    longest: int = 0
+    
+    @property
+    def is_shared(self):
+        return self.room_type == SHARED
+    
+    def add(self, interval):
+        index = bisect_right(self.starts, interval.start)
+        self.starts.insert(index, interval.start)
+        self.intervals.insert(index, interval)
+        self.longest = max(self.longest, interval.end - interval.start)
+    
+    def overlapping(self, start, end):
+        low = bisect_right(self.starts, start - self.longest)
+        high = bisect_left(self.starts, end)
+        return [interval for interval in self.intervals[low:high] if interval.end > start]
+    
+    def occupancy(self, start, end):
+        """Seats taken by everything overlapping the window."""
+        return sum(interval.seats for interval in self.overlapping(start, end))
+    
+    def is_free(self, start, end):
+        return not self.overlapping(start, end)
+    
+    def has_free_seat(self, start, end):
+        """Whether a booking may be added: no overlap, or a shared desk not yet full."""
+        if self.is_shared:
+            return self.occupancy(start, end) < self.capacity
+        return self.is_free(start, end)
+    
+    def fits(self, start, end, seats):
+        """Whether `seats` more seats fit; a seatless booking always fits a shared desk."""
+        if self.is_shared:
+            return self.occupancy(start, end) + seats <= self.capacity
+        return self.is_free(start, end)
+    
+    def availability(self, start, end):
+        """(current occupancy, available capacity) if the room can be offered, else None."""
+        if self.is_shared:
+            occupancy = self.occupancy(start, end)
+            if occupancy < self.capacity:
+                return occupancy, self.capacity - occupancy
+            return None
+        if self.is_free(start, end):
+            return 0, self.capacity
+        return None
+    
+    def gap_waste(self, start, end):
+        """
+        Minutes left over in the free gap (within business hours) the window
+        would be placed in, or None if the window overlaps an interval.
+        """
+        gap_start, gap_end = OPENING_MINUTE, CLOSING_MINUTE
+        for interval in self.intervals:
+            if interval.start < end and interval.end > start:
+                return None
+            if interval.end <= start:
+                gap_start = max(gap_start, interval.end)
+            elif interval.start >= end:
+                gap_end = min(gap_end, interval.start)
+        return (start - gap_start) + (gap_end - end)
+
+
+@dataclass(slots=True)
+class DaySchedule:
+    """The schedules of a set of rooms on one day."""
+    
+    rooms: dict = field(default_factory=dict)
+    
+    def add_room(self, room_id, room_type, capacity, label=''):
+        schedule = self.rooms[room_id] = RoomSchedule(room_id, room_type, capacity, label)
+        return schedule
+    
+    def add(self, room_id, interval):
+        schedule = self.rooms.get(room_id)
+        if schedule is not None:
+            schedule.add(interval)
+    
+    def available(self, start, end, room_type=None):
+        """(schedule, occupancy, available capacity) for each room that can take the window."""
+        result = []
+        for schedule in self.rooms.values():
+            if room_type and schedule.room_type != room_type:
+                continue
+            availability = schedule.availability(start, end)
+            if availability is not None:
+                result.append((schedule, *availability))
+        return result
+    
+    def rank(self, start, end, seats, room_type=None):
+        """
+        Rooms that fit the window, best candidate first.
+        
+        Shared desks use best fit: the fullest desk that still seats the
+        booking. Private and conference rooms minimize fragmentation: the
+        room whose surrounding free gap is tightest, so long gaps stay
+        bookable. Ties go to the lower label.
+        """
+        ranked = []
+        for schedule in self.rooms.values():
+            if room_type and schedule.room_type != room_type:
+                continue
+            if schedule.is_shared:
+                free_seats = schedule.capacity - schedule.occupancy(start, end)
+                if free_seats > 0 and free_seats >= seats:
+                    ranked.append((free_seats - seats, schedule.label, schedule))
+            else:
+                waste = schedule.gap_waste(start, end)
+                if waste is not None:
+                    ranked.append((waste, schedule.label, schedule))
+        
+        ranked.sort(key=lambda candidate: candidate[:2])
+        return [schedule for _, _, schedule in ranked]
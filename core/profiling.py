@@ -0,0 +1,161 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$')
+
+
+class QueryRecorder:
+    """execute_wrapper that records every SQL statement with its timing."""
+    
+    def __init__(self):
+        self.queries = []
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+class ProfileStore:
+    """Profiles on disk: a .prof (pstats) and a .json (metadata, SQL) per request."""
+    
+    @property
+    def directory(self):
+        return Path(settings.PROFILING_DIR)
+    
+    def save(self, profiler, meta, queries):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(self.directory / f'{profile_id}.prof')
+        
+        meta = {
+            **meta,
+            'id': profile_id,
+            'query_count': len(queries),
+            'query_ms': round(sum(query['ms'] for query in queries), 3),
+            'queries': queries,
+        }
+        with open(self.directory / f'{profile_id}.json', 'w') as f:
+            json.dump(meta, f, separators=(',', ':'))
+        
+        self.rotate()
+        return profile_id
+    
+    def rotate(self):
+        """Keep only the newest PROFILING_MAX_FILES profiles (ids sort by time)."""
+        profiles = sorted(self.directory.glob('*.json'))
+        for path in profiles[:-settings.PROFILING_MAX_FILES]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.prof').unlink(missing_ok=True)
+    
+    def list(self):
+        if not self.directory.exists():
+            return []
+        summaries = []
+        for path in sorted(self.directory.glob('*.json'), reverse=True):
+            with open(path) as f:
+                meta = json.load(f)
+            meta.pop('queries', None)
+            summaries.append(meta)
+        return summaries
+    
+    def get_path(self, profile_id, suffix):
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        path = self.directory / f'{profile_id}{suffix}'
+        return path if path.exists() else None
+    
+    def get(self, profile_id, sort='cumulative', limit=40):
+        """Metadata, SQL list and the top of the call graph as text."""
+        meta_path = self.get_path(profile_id, '.json')
+        prof_path = self.get_path(profile_id, '.prof')
+        if meta_path is None or prof_path is None:
+            return None
+        
+        with open(meta_path) as f:
+            meta = json.load(f)
+        
+        output = io.StringIO()
+        stats = pstats.Stats(str(prof_path), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        meta['stats'] = output.getvalue()
+        return meta
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling: a cProfile call graph plus every SQL
+    statement with its timing, for a sampled fraction of requests or any
+    request carrying PROFILING_HEADER.
+    
+    Removed from the stack entirely (MiddlewareNotUsed) unless
+    PROFILING_ENABLED is set, so it costs nothing when off.
+    """
+    
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def should_profile(self, request):
+        header = request.headers.get(settings.PROFILING_HEADER)
+        if header is not None:
+            token = settings.PROFILING_TOKEN
+            return not token or header == token
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+    
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if response.streaming:
+            # The body is produced after we return; a profile would be empty
+            return response
+        
+        profile_id = profile_store.save(profiler, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'ms': round(elapsed_ms, 3),
+            'pid': os.getpid(),
+            'created_at': timezone.now().isoformat(),
+        }, recorder.queries)
+        response['X-Profile-Id'] = profile_id
+        return response
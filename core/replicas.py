@@ -0,0 +1,120 @@
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Apps read right after being written by another request (a login or a
+# new API token, then the next call), so they never use replicas
+PRIMARY_ONLY_APPS = {'sessions', 'authtoken'}
+
+
+class RoutingState:
+    """Per-request routing flags, shared by everything the request runs."""
+    
+    def __init__(self, allow_replica=False):
+        self.allow_replica = allow_replica
+        self.wrote = False
+        # Replica picked per primary, so every read of the request (and the
+        # conditional GET validators) sees the same snapshot
+        self.replicas = {}
+
+
+_routing_state = ContextVar('routing_state', default=None)
+
+
+@contextmanager
+def routing_state(state):
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+class RoutingMetrics:
+    """Process-local counters of routing decisions, keyed (decision, alias)."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+    
+    def record(self, decision, alias):
+        with self._lock:
+            self._counts[(decision, alias)] += 1
+    
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        result = {}
+        for (decision, alias), count in sorted(counts.items()):
+            result.setdefault(decision, {})[alias] = count
+        return result
+    
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+routing_metrics = RoutingMetrics()
+
+
+def get_replicas(alias):
+    return settings.DATABASE_REPLICAS.get(alias, [])
+
+
+def get_primary(alias):
+    """Primary alias for a replica alias (or the alias itself)."""
+    for primary, replicas in settings.DATABASE_REPLICAS.items():
+        if alias in replicas:
+            return primary
+    return alias
+
+
+def is_replica(alias):
+    return get_primary(alias) != alias
+
+
+def choose_read_database(alias):
+    """
+    Pick the database for a read on `alias`.
+    
+    Replicas are used only inside requests that allow them (safe methods
+    from clients not pinned by a recent write) and before the request
+    itself has written anything.
+    """
+    if is_replica(alias):
+        # Related lookups stay on the replica their instance came from
+        routing_metrics.record('replica', alias)
+        return alias
+    
+    replicas = get_replicas(alias)
+    if not replicas:
+        return alias
+    
+    state = _routing_state.get()
+    if state is None or not state.allow_replica:
+        routing_metrics.record('primary', alias)
+        return alias
+    if state.wrote:
+        routing_metrics.record('pinned', alias)
+        return alias
+    
+    replica = state.replicas.get(alias)
+    if replica is None:
+        replica = state.replicas[alias] = random.choice(replicas)
+    routing_metrics.record('replica', replica)
+    return replica
+
+
+def record_write(alias):
+    primary = get_primary(alias)
+    state = _routing_state.get()
+    if state is not None:
+        state.wrote = True
+    if get_replicas(primary):
+        routing_metrics.record('write', primary)
+    return primary
@@ -0,0 +1,44 @@
+from .replicas import PRIMARY_ONLY_APPS, choose_read_database, is_replica, record_write
+from .sites import SITE_APPS, get_site_database, is_site_model
+
+
+class SiteRouter:
+    """
+    Route site-scoped apps (rooms, bookings, analytics) to the database of
+    the selected site; shared apps always use 'default'.
+    
+    Objects loaded from a site database keep using it for related lookups,
+    so results merged across sites can still be serialized.
+    
+    Reads may then be sent to a replica of that database (see
+    core.replicas); writes always go to the primary.
+    """
+    
+    def _db_for_model(self, model, **hints):
+        if not is_site_model(model):
+            return 'default'
+        instance = hints.get('instance')
+        if instance is not None and is_site_model(type(instance)) and instance._state.db:
+            return instance._state.db
+        return get_site_database()
+    
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return 'default'
+        return choose_read_database(self._db_for_model(model, **hints))
+    
+    def db_for_write(self, model, **hints):
+        return record_write(self._db_for_model(model, **hints))
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Bookings reference shared users and teams across databases
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if is_replica(db):
+            # Replicas are copies of their primary (see sync_replicas)
+            return False
+        if db == 'default':
+            return True
+        # Every primary keeps the change tokens of its own tables
+        return app_label in SITE_APPS or app_label == 'core'
@@ -0,0 +1,44 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .conditional import change_tracker
+from .models import TableVersion
+from .replicas import get_primary
+
+
+@receiver(post_save, dispatch_uid='core.track_save')
+@receiver(post_delete, dispatch_uid='core.track_delete')
+def track_table_change(sender, using=None, **kwargs):
+    """Invalidate conditional GET validators for the written table."""
+    # Historical models (migrations) and the version table itself are not tracked
+    if sender._meta.apps is not apps or sender is TableVersion:
+        return
+    change_tracker.mark_changed(sender, using)
+
+
+@receiver(m2m_changed, dispatch_uid='core.track_m2m')
+def track_m2m_change(sender, instance, action, model, using=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # Membership changes alter the serialized payload of both sides
+    change_tracker.mark_changed(instance.__class__, using)
+    change_tracker.mark_changed(model, using)
+
+
+@receiver(connection_created, dispatch_uid='core.attach_shared_database')
+def attach_shared_database(sender, connection, **kwargs):
+    """
+    Make shared tables (users, teams) visible to SQLite site databases.
+    
+    SQLite resolves a table missing from the main file in attached files,
+    so bookings keep joining users and teams without cross-database code.
+    """
+    if connection.vendor != 'sqlite' or get_primary(connection.alias) == 'default':
+        return
+    if get_primary(connection.alias) not in settings.SITE_DATABASES.values():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('ATTACH DATABASE %s AS shared', [str(settings.DATABASES['default']['NAME'])])
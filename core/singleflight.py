@@ -0,0 +1,61 @@
+import threading
+
+from .sites import get_current_site
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical computations within one worker process.
+    
+    The first caller for a key runs the function; callers arriving while it
+    runs wait and receive the same result (or exception) instead of
+    recomputing it. Nothing is cached once the computation finishes.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        
+        return call.result
+
+
+single_flight = SingleFlight()
+
+
+def request_key(request, prefix):
+    """Single-flight key for a GET request: site, path and sorted query parameters."""
+    params = sorted(request.query_params.lists())
+    return (
+        prefix, get_current_site(), request.path,
+        tuple((name, tuple(values)) for name, values in params),
+    )
@@ -0,0 +1,104 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+
+# Apps whose tables live in each site's database; everything else
+# (users, teams, auth, admin) is shared and stays on 'default'
+SITE_APPS = {'rooms', 'bookings', 'analytics'}
+
+_current_site = ContextVar('current_site', default=None)
+
+
+def get_sites():
+    return list(settings.SITE_DATABASES)
+
+
+def get_current_site():
+    """The site selected for this request or command, or None."""
+    return _current_site.get()
+
+
+def get_default_site():
+    """Field default: the selected site, else DEFAULT_SITE."""
+    return _current_site.get() or settings.DEFAULT_SITE
+
+
+def get_site_database(site=None):
+    """Database alias for a site (default: the selected site)."""
+    return settings.SITE_DATABASES[site or get_default_site()]
+
+
+def is_site_model(model):
+    return model._meta.app_label in SITE_APPS
+
+
+@contextmanager
+def use_site(site):
+    if site is not None and site not in settings.SITE_DATABASES:
+        raise ValueError(f"Unknown site '{site}'.")
+    token = _current_site.set(site)
+    try:
+        yield
+    finally:
+        _current_site.reset(token)
+
+
+def fan_out(func, sites=None):
+    """
+    Run func(site) for every site in parallel, each with its site selected.
+    Returns {site: result}.
+    """
+    sites = sites or get_sites()
+    
+    def run(site):
+        try:
+            with use_site(site):
+                return func(site)
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+    
+    if len(sites) == 1:
+        with use_site(sites[0]):
+            return {sites[0]: func(sites[0])}
+    
+    # Threads don't inherit context variables; give each a copy of ours so
+    # request-scoped state (e.g. replica routing) carries over
+    contexts = [copy_context() for _ in sites]
+    with ThreadPoolExecutor(max_workers=len(sites)) as executor:
+        results = executor.map(lambda context, site: context.run(run, site), contexts, sites)
+        return dict(zip(sites, results))
+
+
+class SiteMergedResults:
+    """
+    One queryset evaluated on every site's database, merged in order.
+    
+    Sliceable and countable so DRF pagination can use it directly; a page
+    fetches at most offset + page size rows from each site, in parallel.
+    """
+    
+    ordered = True
+    
+    def __init__(self, get_queryset, key, reverse=False):
+        self.get_queryset = get_queryset
+        self.key = key
+        self.reverse = reverse
+    
+    def count(self):
+        return sum(fan_out(lambda site: self.get_queryset().count()).values())
+    
+    def __len__(self):
+        return self.count()
+    
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.stop is None:
+            raise TypeError('SiteMergedResults only supports bounded slices.')
+        per_site = fan_out(lambda site: list(self.get_queryset()[:index.stop]))
+        merged = heapq.merge(*per_site.values(), key=self.key, reverse=self.reverse)
+        return list(islice(merged, index.start or 0, index.stop))
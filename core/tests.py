@@ -0,0 +1,191 @@
+import json
+import random
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.occupancy import (
+    CLOSING_MINUTE, CONFERENCE, OPENING_MINUTE, PRIVATE, SHARED, Interval, RoomSchedule,
+)
+from core.management.commands.replay_trace import Command as ReplayTrace
+from core.throttling import BookingCreateRateThrottle
+from rooms.models import Room
+
+
+def random_window(rng):
+    """A window on the 15-minute grid within business hours, of any length."""
+    start = rng.randrange(OPENING_MINUTE, CLOSING_MINUTE, 15)
+    end = rng.randrange(start + 15, CLOSING_MINUTE + 15, 15)
+    return start, end
+
+
+class RoomScheduleTests(SimpleTestCase):
+    """RoomSchedule's bisected lookups must agree with a scan of every interval."""
+    
+    def test_matches_linear_scan(self):
+        rng = random.Random(49)
+        for _ in range(300):
+            schedule = RoomSchedule(1, rng.choice([PRIVATE, CONFERENCE, SHARED]), rng.randint(1, 6))
+            intervals = []
+            for _ in range(rng.randint(0, 12)):
+                interval = Interval(*random_window(rng), seats=rng.randint(0, 3))
+                intervals.append(interval)
+                schedule.add(interval)
+            
+            for _ in range(20):
+                start, end = random_window(rng)
+                seats = rng.randint(0, 3)
+                overlapping = [i for i in intervals if i.start < end and i.end > start]
+                occupancy = sum(i.seats for i in overlapping)
+                context = (schedule.room_type, schedule.capacity, intervals, start, end, seats)
+                
+                self.assertCountEqual(schedule.overlapping(start, end), overlapping, context)
+                self.assertEqual(schedule.occupancy(start, end), occupancy, context)
+                if schedule.is_shared:
+                    self.assertEqual(schedule.has_free_seat(start, end), occupancy < schedule.capacity, context)
+                    self.assertEqual(schedule.fits(start, end, seats), occupancy + seats <= schedule.capacity, context)
+                    expected = (occupancy, schedule.capacity - occupancy) if occupancy < schedule.capacity else None
+                else:
+                    self.assertEqual(schedule.has_free_seat(start, end), not overlapping, context)
+                    self.assertEqual(schedule.fits(start, end, seats), not overlapping, context)
+                    expected = None if overlapping else (0, schedule.capacity)
+                self.assertEqual(schedule.availability(start, end), expected, context)
+                
+                if overlapping:
+                    self.assertIsNone(schedule.gap_waste(start, end), context)
+                else:
+                    gap_start = max([OPENING_MINUTE] + [i.end for i in intervals if i.end <= start])
+                    gap_end = min([CLOSING_MINUTE] + [i.start for i in intervals if i.start >= end])
+                    self.assertEqual(schedule.gap_waste(start, end), (start - gap_start) + (gap_end - end), context)
+    
+    def test_seatless_booking_fits_a_full_shared_desk(self):
+        schedule = RoomSchedule(1, SHARED, 2)
+        schedule.add(Interval(600, 660, 2))
+        self.assertFalse(schedule.has_free_seat(600, 660))
+        self.assertTrue(schedule.fits(600, 660, 0))
+        self.assertFalse(schedule.fits(600, 660, 1))
+
+
+# Replica copies are only refreshed by sync_replicas, so read the primary
+@override_settings(DATABASE_REPLICAS={})
+class ConditionalGetTests(TestCase):
+    """A list answers 304 until one of the tables it reads from changes."""
+    
+    def test_etag_round_trip(self):
+        client = APIClient()
+        Room.objects.create(room_number='E1', room_type='PRIVATE', capacity=1)
+        
+        response = client.get('/api/v1/rooms/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        
+        response = client.get('/api/v1/rooms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        
+        Room.objects.create(room_number='E2', room_type='PRIVATE', capacity=1)
+        response = client.get('/api/v1/rooms/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class TokenBucketThrottleTests(TestCase):
+    """Booking creation is limited per client, atomically across threads."""
+    
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+    
+    @mock.patch.object(BookingCreateRateThrottle, 'THROTTLE_RATES', {'booking_create': '2/min'})
+    def test_over_the_rate_gets_429(self):
+        client = APIClient()
+        for _ in range(2):
+            self.assertEqual(client.post('/api/v1/bookings/', {}, format='json').status_code, 400)
+        response = client.post('/api/v1/bookings/', {}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+    
+    @mock.patch.object(BookingCreateRateThrottle, 'THROTTLE_RATES', {'booking_create': '20/day'})
+    def test_concurrent_requests_share_one_bucket(self):
+        request = mock.Mock(user=None, META={'REMOTE_ADDR': '10.0.0.1'})
+        allowed = []
+        get = LocMemCache.get
+        
+        def slow_get(self, *args, **kwargs):
+            # Widen the window between reading and writing a bucket
+            value = get(self, *args, **kwargs)
+            time.sleep(0.001)
+            return value
+        
+        def spend():
+            for _ in range(10):
+                allowed.append(BookingCreateRateThrottle().allow_request(request, None))
+        
+        threads = [threading.Thread(target=spend) for _ in range(8)]
+        with mock.patch.object(LocMemCache, 'get', slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 20)
+
+
+def trace_record(method, path, status, response, body=None):
+    return {
+        'ts': 0, 'method': method, 'path': path, 'headers': {}, 'content_type': 'application/json',
+        'body': json.dumps(body) if body is not None else None, 'status': status, 'ms': 1.0,
+        'response': response,
+    }
+
+
+def recorded_user(pk, username, age):
+    return {
+        'id': pk, 'username': username, 'first_name': '', 'last_name': '', 'email': '',
+        'age': age, 'gender': 'F', 'is_child': False,
+    }
+
+
+# The test runner already provides empty databases, and the replay's worker
+# thread needs to see its own commits
+@mock.patch.object(ReplayTrace, 'fresh_databases', nullcontext)
+class ReplayTraceTests(TransactionTestCase):
+    """replay_trace maps recorded IDs and reports only genuine divergences."""
+    
+    def replay(self, records):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as trace:
+            trace.write(''.join(json.dumps(record) + '\n' for record in records))
+            trace.flush()
+            out = StringIO()
+            call_command('replay_trace', trace.name, stdout=out)
+        return out.getvalue()
+    
+    def test_faithful_replay_has_no_divergence(self):
+        # The recording ran against a database that had handed out 40 users already
+        output = self.replay([
+            trace_record('POST', '/api/v1/users/', 201, recorded_user(41, 'ada', 36),
+                         {'username': 'ada', 'password': '***', 'age': 36, 'gender': 'F'}),
+            trace_record('GET', '/api/v1/users/41/bookings/', 200,
+                         {'count': 0, 'next': None, 'previous': None, 'results': []}),
+        ])
+        self.assertIn('No divergence from the recorded responses', output)
+    
+    def test_reports_status_and_body_divergences(self):
+        output = self.replay([
+            trace_record('POST', '/api/v1/users/', 201, recorded_user(41, 'ada', 37),
+                         {'username': 'ada', 'password': '***', 'age': 36, 'gender': 'F'}),
+            trace_record('GET', '/api/v1/users/999/bookings/', 200,
+                         {'count': 0, 'next': None, 'previous': None, 'results': []}),
+        ])
+        self.assertIn('1 status and 1 body divergences:', output)
+        self.assertIn('POST /api/v1/users/: body differs at .age', output)
+        self.assertIn('GET /api/v1/users/999/bookings/: status 200 -> 404', output)
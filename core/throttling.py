@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from .locks import LockTimeout, cache_lock
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token-bucket rate limiting per client, stored in the Django cache.
+    
+    A rate of ``N/period`` (from DEFAULT_THROTTLE_RATES) gives each client a
+    bucket of N tokens refilled at N per period, so short bursts are allowed
+    while the sustained rate stays bounded. The cache alias is configurable;
+    the default local-memory cache keeps tests self-contained. Each bucket
+    is read and written under a cache lock, so workers sharing the cache
+    cannot both spend its last token.
+    """
+    
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    lock_timeout = 1
+    
+    def __init__(self):
+        super().__init__()
+        self.cache = caches[settings.THROTTLE_CACHE]
+    
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+    
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        
+        capacity, period = self.num_requests, self.duration
+        refill_per_second = capacity / period
+        
+        try:
+            with cache_lock(self.cache, self.key + '_lock', self.lock_timeout):
+                now = time.time()
+                tokens, updated_at = self.cache.get(self.key, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+                
+                if tokens < 1:
+                    self.wait_seconds = (1 - tokens) / refill_per_second
+                    return False
+                
+                self.cache.set(self.key, (tokens - 1, now), period)
+        except LockTimeout:
+            # The client's bucket is that contended: treat it as empty
+            self.wait_seconds = self.lock_timeout
+            return False
+        return True
+    
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class BookingCreateRateThrottle(TokenBucketThrottle):
+    scope = 'booking_create'
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import QueryDict
+
+# Request headers that change what the API does; credentials are never recorded
+TRACED_HEADERS = ('X-Site', 'Idempotency-Key', 'If-None-Match', 'If-Modified-Since')
+
+# Bodies that are recorded; uploads and anything else are only marked omitted
+TEXT_CONTENT_TYPES = ('application/json', 'application/x-www-form-urlencoded')
+
+REDACTED = '***'
+
+
+class TraceWriter:
+    """
+    Appends one JSON line per request to the trace file.
+    Shared by every request thread; the file is opened on first write.
+    """
+    
+    def __init__(self, path=None):
+        self._path = path
+        self._file = None
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self):
+        return Path(self._path or settings.TRACE_FILE)
+    
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':'), default=str) + '\n'
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+            self._file.write(line)
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+trace_writer = TraceWriter()
+
+
+def read_trace(path):
+    """Request records from a trace file, in order. Other lines are skipped."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'method' in record and 'path' in record:
+                yield record
+
+
+def redact(body, content_type):
+    """Mask TRACE_REDACT_FIELDS in a JSON or form body."""
+    fields = settings.TRACE_REDACT_FIELDS
+    if content_type == 'application/json':
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+        if isinstance(data, dict) and fields & data.keys():
+            data.update(dict.fromkeys(fields & data.keys(), REDACTED))
+            return json.dumps(data)
+        return body
+    
+    data = QueryDict(body)
+    if not fields & data.keys():
+        return body
+    return urlencode([
+        (key, REDACTED if key in fields else value)
+        for key, values in data.lists() for value in values
+    ])
+
+
+def get_request_body(request):
+    """The request body as text, or None when it cannot be recorded."""
+    if request.content_type not in TEXT_CONTENT_TYPES:
+        return None
+    if int(request.META.get('CONTENT_LENGTH') or 0) > settings.TRACE_MAX_BODY_BYTES:
+        return None
+    try:
+        return redact(request.body.decode('utf-8'), request.content_type)
+    except UnicodeDecodeError:
+        return None
+
+
+def get_response_body(response):
+    """The decoded JSON response, or None for streams, large or non-JSON bodies."""
+    if response.streaming or not response.get('Content-Type', '').startswith('application/json'):
+        return None
+    if len(response.content) > settings.TRACE_MAX_BODY_BYTES:
+        return None
+    try:
+        return json.loads(response.content)
+    except ValueError:
+        return None
+
+
+class TraceMiddleware:
+    """
+    Record API traffic for replay_trace: method, path, the headers that
+    matter, body, status, timing and the JSON response, appended to
+    TRACE_FILE as JSONL.
+    
+    Removed from the stack (MiddlewareNotUsed) unless TRACE_ENABLED is set.
+    """
+    
+    def __init__(self, get_response):
+        if not settings.TRACE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if not request.path.startswith(settings.TRACE_PATH_PREFIX):
+            return self.get_response(request)
+        
+        # Read before the view consumes the stream; Django keeps it for the parsers
+        has_body = int(request.META.get('CONTENT_LENGTH') or 0) > 0
+        body = get_request_body(request) if has_body else None
+        
+        started = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        record = {
+            'ts': round(started, 6),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'headers': {
+                name: request.headers[name] for name in TRACED_HEADERS if name in request.headers
+            },
+            'content_type': request.content_type if body is not None else None,
+            'body': body,
+            'status': response.status_code,
+            'ms': round(elapsed_ms, 3),
+            'response': get_response_body(response),
+        }
+        if has_body and body is None:
+            record['body_omitted'] = True
+        trace_writer.write(record)
+        return response
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import db_routing_metrics, profile_detail, profile_list
+
+urlpatterns = [
+    path('metrics/db-routing/', db_routing_metrics, name='db-routing-metrics'),
+    path('profiles/', profile_list, name='profile-list'),
+    path('profiles/<str:profile_id>/', profile_detail, name='profile-detail'),
+]
@@ -0,0 +1,49 @@
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .profiling import profile_store
+from .replicas import routing_metrics
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_routing_metrics(request):
+    """Counts of database routing decisions in this worker process."""
+    return Response(routing_metrics.snapshot())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request profiles, newest first."""
+    return Response(profile_store.list())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """
+    One profile: SQL statements and the top of the call graph.
+    ``?sort=tottime`` changes the ordering, ``?download=1`` returns the
+    raw .prof file for snakeviz / pstats.
+    """
+    if request.query_params.get('download'):
+        path = profile_store.get_path(profile_id, '.prof')
+        if path is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+    
+    sort = request.query_params.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        return Response(
+            {"error": "sort must be cumulative, tottime or ncalls."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    profile = profile_store.get(profile_id, sort=sort)
+    if profile is None:
+        return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(profile)
@@ -1,9 +1,16 @@
 from django.contrib import admin
-from .models import Room
+from .models import Location, Room
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'building', 'floor', 'is_active']
+    list_filter = ['building', 'is_active']
+    search_fields = ['code', 'name']
 
 
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
-    list_display = ['room_number', 'room_type', 'capacity', 'is_active']
-    list_filter = ['room_type', 'is_active']
+    list_display = ['room_number', 'room_type', 'capacity', 'location', 'is_active']
+    list_filter = ['room_type', 'location', 'is_active']
     search_fields = ['room_number']
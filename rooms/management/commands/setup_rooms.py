@@ -1,54 +1,46 @@
-from django.core.management.base import BaseCommand
-from rooms.models import Room
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.sites import use_site
+from rooms.provisioning import DEFAULT_SPEC, SpecError, load_spec, provision
 
 
 class Command(BaseCommand):
-    help = 'Create initial room data as per requirements'
+    help = 'Provision locations and rooms from a JSON/YAML spec (default: the 15-room layout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--spec',
+            default=None,
+            help='Path to a JSON or YAML spec (YAML needs PyYAML)',
+        )
+        parser.add_argument(
+            '--site',
+            choices=list(settings.SITE_DATABASES),
+            default=settings.DEFAULT_SITE,
+            help='Office site whose database receives the rooms',
+        )
+        parser.add_argument(
+            '--keep-missing',
+            action='store_true',
+            help='Leave rooms that are not in the spec active',
+        )
 
     def handle(self, *args, **options):
-        """Create the 15 rooms as specified in requirements:
-        - 8 Private Rooms
-        - 4 Conference Rooms  
-        - 3 Shared Desks (each allows up to 4 users)
         """
-        
-        # Delete existing rooms
-        Room.objects.all().delete()
-        
-        rooms_to_create = []
-        
-        # Create 8 Private Rooms (capacity 1)
-        for i in range(1, 9):
-            rooms_to_create.append(Room(
-                room_number=f"P{i:02d}",
-                room_type='PRIVATE',
-                capacity=1
-            ))
-        
-        # Create 4 Conference Rooms (capacity varies, but typically larger)
-        for i in range(1, 5):
-            rooms_to_create.append(Room(
-                room_number=f"C{i:02d}",
-                room_type='CONFERENCE',
-                capacity=8  # Assuming 8 person capacity for conference rooms
-            ))
-        
-        # Create 3 Shared Desks (capacity 4 each)
-        for i in range(1, 4):
-            rooms_to_create.append(Room(
-                room_number=f"S{i:02d}",
-                room_type='SHARED',
-                capacity=4
-            ))
-        
-        # Bulk create all rooms
-        Room.objects.bulk_create(rooms_to_create)
+        Upsert rooms by room number. Rooms missing from the spec are
+        deactivated rather than deleted, so existing bookings are kept.
+        """
+        try:
+            spec = load_spec(options['spec']) if options['spec'] else DEFAULT_SPEC
+            with use_site(options['site']):
+                result = provision(spec, deactivate_missing=not options['keep_missing'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
         
         self.stdout.write(
             self.style.SUCCESS(
-                f'Successfully created {len(rooms_to_create)} rooms:\n'
-                f'- 8 Private Rooms (P01-P08)\n'
-                f'- 4 Conference Rooms (C01-C04)\n'
-                f'- 3 Shared Desks (S01-S03)'
+                f"Provisioned {result['locations']} locations: "
+                f"{result['created']} rooms created, {result['updated']} updated, "
+                f"{result['deactivated']} deactivated"
             )
         )
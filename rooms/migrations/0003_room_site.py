@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:08
+
+import core.sites
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='site',
+            field=models.CharField(default=core.sites.get_default_site, editable=False, max_length=20),
+        ),
+    ]
@@ -1,12 +1,33 @@
 from django.db import models
 
+from core.sites import get_default_site
+
+
+class Location(models.Model):
+    """A floor or area of a building that groups rooms."""
+    
+    code = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=100)
+    building = models.CharField(max_length=100, blank=True)
+    floor = models.IntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['code']
+    
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
 
 class Room(models.Model):
     """
-    Room model representing the 15 total rooms in the workspace.
+    Room model. The default layout (see setup_rooms) has 15 rooms:
     - 8 Private Rooms (capacity 1)
     - 4 Conference Rooms (capacity varies, requires teams of 3+)
     - 3 Shared Desks (capacity 4 each)
+    Larger sites are provisioned from a spec, grouped by Location.
     """
     
     ROOM_TYPES = [
@@ -18,12 +39,22 @@ class Room(models.Model):
     room_number = models.CharField(max_length=10, unique=True)
     room_type = models.CharField(max_length=10, choices=ROOM_TYPES)
     capacity = models.PositiveIntegerField()
+    location = models.ForeignKey(
+        Location, on_delete=models.PROTECT, related_name='rooms', null=True, blank=True
+    )
+    site = models.CharField(max_length=20, default=get_default_site, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['room_number']
+        indexes = [
+            # Availability and room lists filter active rooms by location and type
+            models.Index(
+                fields=['location', 'is_active', 'room_type'], name='room_location_active_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"Room {self.room_number} ({self.get_room_type_display()})"
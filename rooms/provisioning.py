@@ -0,0 +1,157 @@
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.conditional import change_tracker
+from core.sites import get_default_site, get_site_database
+from .models import Location, Room
+from .signals import rooms_provisioned
+
+ROOM_TYPES = {code for code, _ in Room.ROOM_TYPES}
+
+# The original 15-room layout, used when setup_rooms is run without a spec
+DEFAULT_SPEC = {
+    'locations': [
+        {
+            'code': 'MAIN',
+            'name': 'Main floor',
+            'rooms': [
+                {'prefix': 'P', 'count': 8, 'room_type': 'PRIVATE', 'capacity': 1},
+                {'prefix': 'C', 'count': 4, 'room_type': 'CONFERENCE', 'capacity': 8},
+                {'prefix': 'S', 'count': 3, 'room_type': 'SHARED', 'capacity': 4},
+            ],
+        },
+    ],
+}
+
+
+class SpecError(ValueError):
+    """The provisioning spec is malformed."""
+
+
+def load_spec(path):
+    """Load a spec from JSON, or YAML when PyYAML is installed."""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SpecError('YAML specs need PyYAML (pip install PyYAML); or use JSON.')
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def expand_rooms(location_code, entries):
+    """
+    Yield room dicts for a location.
+    
+    An entry is either a single room (`room_number`) or a numbered range
+    (`prefix`, `count`, optional `start`), e.g. prefix "3P" -> 3P01, 3P02...
+    """
+    for entry in entries:
+        room_type = entry.get('room_type')
+        if room_type not in ROOM_TYPES:
+            raise SpecError(f"{location_code}: room_type must be one of {', '.join(sorted(ROOM_TYPES))}.")
+        capacity = entry.get('capacity')
+        if not isinstance(capacity, int) or capacity < 1:
+            raise SpecError(f'{location_code}: capacity must be a positive integer.')
+        
+        if 'room_number' in entry:
+            numbers = [str(entry['room_number'])]
+        elif 'prefix' not in entry or not isinstance(entry.get('count'), int):
+            raise SpecError(f"{location_code}: a room entry needs 'room_number' or 'prefix' and 'count'.")
+        else:
+            start = entry.get('start', 1)
+            numbers = [f"{entry['prefix']}{i:02d}" for i in range(start, start + entry['count'])]
+        
+        for number in numbers:
+            yield {'room_number': number, 'room_type': room_type, 'capacity': capacity}
+
+
+def parse_spec(spec):
+    """Validate a spec and return (locations, rooms) as unsaved model instances."""
+    if not isinstance(spec, dict) or not isinstance(spec.get('locations'), list):
+        raise SpecError("Spec must be an object with a 'locations' list.")
+    
+    locations = []
+    rooms = {}
+    for entry in spec['locations']:
+        code = entry.get('code')
+        if not code:
+            raise SpecError("Every location needs a 'code'.")
+        locations.append(Location(
+            code=code,
+            name=entry.get('name', code),
+            building=entry.get('building', ''),
+            floor=entry.get('floor'),
+            is_active=True,
+        ))
+        for room in expand_rooms(code, entry.get('rooms', [])):
+            if room['room_number'] in rooms:
+                raise SpecError(f"Room {room['room_number']} is declared twice.")
+            if len(room['room_number']) > Room._meta.get_field('room_number').max_length:
+                raise SpecError(f"Room number {room['room_number']} is too long.")
+            rooms[room['room_number']] = (code, room)
+    
+    return locations, rooms
+
+
+def provision(spec, deactivate_missing=True):
+    """
+    Idempotently apply a spec.
+    
+    Locations and rooms are upserted by code / room_number. Rooms and
+    locations missing from the spec are deactivated, never deleted, so
+    their bookings are kept. Returns counts for reporting.
+    """
+    locations, room_specs = parse_spec(spec)
+    now = timezone.now()
+    
+    with transaction.atomic(using=get_site_database()):
+        Location.objects.bulk_create(
+            locations,
+            update_conflicts=True,
+            unique_fields=['code'],
+            update_fields=['name', 'building', 'floor', 'is_active', 'updated_at'],
+        )
+        # Upserted rows don't get their pks back, so map codes in one query
+        location_ids = dict(Location.objects.filter(
+            code__in=[location.code for location in locations]
+        ).values_list('code', 'pk'))
+        
+        existing = set(Room.objects.filter(
+            room_number__in=list(room_specs)
+        ).values_list('room_number', flat=True))
+        
+        Room.objects.bulk_create(
+            [
+                Room(location_id=location_ids[code], is_active=True, **room)
+                for code, room in room_specs.values()
+            ],
+            update_conflicts=True,
+            unique_fields=['room_number'],
+            update_fields=['room_type', 'capacity', 'location', 'is_active', 'updated_at'],
+        )
+        
+        deactivated = 0
+        if deactivate_missing:
+            deactivated = Room.objects.filter(is_active=True).exclude(
+                room_number__in=list(room_specs)
+            ).update(is_active=False, updated_at=now)
+            Location.objects.filter(is_active=True).exclude(
+                code__in=list(location_ids)
+            ).update(is_active=False, updated_at=now)
+        
+        # bulk_create and update() skip signals, so invalidate room ETags here
+        change_tracker.mark_changed(Room)
+        change_tracker.mark_changed(Location)
+    
+    rooms_provisioned.send(sender=Room, site=get_default_site())
+    
+    return {
+        'locations': len(locations),
+        'created': len(room_specs) - len(existing),
+        'updated': len(existing),
+        'deactivated': deactivated,
+    }
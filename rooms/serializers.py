@@ -1,5 +1,13 @@
 from rest_framework import serializers
-from .models import Room
+from .models import Location, Room
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    """Serializer for Location model."""
+    
+    class Meta:
+        model = Location
+        fields = ['id', 'code', 'name', 'building', 'floor']
 
 
 class RoomSerializer(serializers.ModelSerializer):
@@ -11,7 +19,7 @@ class RoomSerializer(serializers.ModelSerializer):
         model = Room
         fields = [
             'id', 'room_number', 'room_type', 'room_type_display',
-            'capacity', 'is_active'
+            'capacity', 'location', 'is_active'
         ]
         read_only_fields = ['id']
 
@@ -26,6 +34,7 @@ class RoomAvailabilitySerializer(serializers.Serializer):
         choices=Room.ROOM_TYPES,
         required=False
     )
+    location = serializers.CharField(max_length=20, required=False)
     
     def validate(self, data):
         """Validate time slot constraints."""
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by provision() after its bulk upserts commit, with `site`: they skip
+# the per-Room post_save, so receivers caching room data must refresh here
+rooms_provisioned = Signal()
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import RoomListView
+from .views import LocationListView, RoomListView
 
 urlpatterns = [
     path('rooms/', RoomListView.as_view(), name='room-list'),
+    path('locations/', LocationListView.as_view(), name='location-list'),
 ]
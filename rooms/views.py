@@ -1,12 +1,16 @@
 from rest_framework import generics
-from .models import Room
-from .serializers import RoomSerializer
+from rest_framework.response import Response
+from core.conditional import ConditionalGetMixin
+from core.singleflight import request_key, single_flight
+from .models import Location, Room
+from .serializers import LocationSerializer, RoomSerializer
 
 
-class RoomListView(generics.ListAPIView):
+class RoomListView(ConditionalGetMixin, generics.ListAPIView):
     """List all active rooms."""
     
     serializer_class = RoomSerializer
+    conditional_models = (Room, Location)
     
     def get_queryset(self):
         queryset = Room.objects.filter(is_active=True)
@@ -16,4 +20,25 @@ class RoomListView(generics.ListAPIView):
         if room_type:
             queryset = queryset.filter(room_type=room_type)
         
-        return queryset
\ No newline at end of file
+        # Filter by location code if provided
+        location = self.request.query_params.get('location')
+        if location:
+            queryset = queryset.filter(location__code=location)
+        
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # Identical concurrent requests in this worker share one computation
+        data = single_flight.do(
+            request_key(request, 'room_list'),
+            lambda: super(RoomListView, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+
+class LocationListView(ConditionalGetMixin, generics.ListAPIView):
+    """List active locations (floors)."""
+    
+    serializer_class = LocationSerializer
+    queryset = Location.objects.filter(is_active=True)
+    conditional_models = (Location,)
@@ -0,0 +1,263 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from core.conditional import change_tracker
+from .models import User, Team
+
+USER_FIELDS = ['username', 'first_name', 'last_name', 'email', 'age', 'gender']
+GENDERS = {code for code, _ in User.GENDER_CHOICES}
+
+FORMATS = ('csv', 'ndjson')
+
+# Per-row errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class RowError(ValueError):
+    """A single record that cannot be imported."""
+
+
+def detect_format(filename, default='csv'):
+    if filename.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if filename.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_records(stream, fmt):
+    """
+    Lazily yield (line_number, record) from a text stream.
+    
+    Only one line is held in memory at a time, so file size is unbounded.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None
+                continue
+            yield line_number, record
+
+
+def open_text(binary_file):
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def parse_ids(value):
+    """Member and creator IDs come as lists (NDJSON) or ';'-separated text (CSV)."""
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.replace(',', ';').split(';') if part.strip()]
+    if not isinstance(value, list):
+        value = [value]
+    try:
+        return [int(item) for item in value]
+    except (TypeError, ValueError):
+        raise RowError('IDs must be integers.')
+
+
+def validate_model(instance, fields):
+    """
+    Run the model's validators (formats, lengths, choices) on the imported
+    fields of one row. Uniqueness and foreign keys are checked per batch.
+    """
+    exclude = [field.name for field in instance._meta.fields if field.name not in fields]
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as e:
+        raise RowError(' '.join(
+            f"{field}: {message}" for field, messages in e.message_dict.items() for message in messages
+        ))
+
+
+def build_user(record, password):
+    missing = [field for field in USER_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise RowError(f"Missing fields: {', '.join(missing)}.")
+    
+    try:
+        age = int(record['age'])
+    except (TypeError, ValueError):
+        raise RowError('age must be an integer.')
+    if age < 0:
+        raise RowError('age must be positive.')
+    
+    gender = str(record['gender']).upper()
+    if gender not in GENDERS:
+        raise RowError(f"gender must be one of {', '.join(sorted(GENDERS))}.")
+    
+    user = User(
+        username=str(record['username']).strip(),
+        first_name=record['first_name'],
+        last_name=record['last_name'],
+        email=record['email'],
+        age=age,
+        gender=gender,
+        password=password,
+    )
+    validate_model(user, USER_FIELDS)
+    return user
+
+
+class Importer:
+    """
+    Batched import of users or teams.
+    
+    Records are read lazily and written one batch at a time, each batch in
+    its own transaction, so memory is bounded by the batch size.
+    """
+    
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+    
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+    
+    def run(self, records):
+        for batch in batched(records, self.batch_size):
+            with transaction.atomic():
+                self.import_batch(batch)
+        self.mark_changed()
+        return self.get_report()
+    
+    def get_report(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+    
+    def import_batch(self, batch):
+        raise NotImplementedError
+    
+    def mark_changed(self):
+        raise NotImplementedError
+
+
+class UserImporter(Importer):
+    
+    def __init__(self, batch_size=None):
+        super().__init__(batch_size)
+        # Imported accounts cannot log in until a password is set. One
+        # unusable marker is shared instead of generating one per row,
+        # which would dominate import time.
+        self.password = make_password(None)
+    
+    def import_batch(self, batch):
+        users = []
+        for line_number, record in batch:
+            try:
+                if not isinstance(record, dict):
+                    raise RowError('Malformed record.')
+                users.append((line_number, build_user(record, self.password)))
+            except RowError as e:
+                self.add_error(line_number, str(e))
+        
+        # One IN query per batch for usernames that are already taken
+        existing = set(User.objects.filter(
+            username__in=[user.username for _, user in users]
+        ).values_list('username', flat=True))
+        
+        new_users = []
+        for line_number, user in users:
+            if user.username in existing:
+                self.add_error(line_number, f"Username '{user.username}' already exists.")
+                continue
+            existing.add(user.username)
+            new_users.append(user)
+        
+        User.objects.bulk_create(new_users)
+        self.created += len(new_users)
+    
+    def mark_changed(self):
+        # bulk_create skips post_save, so conditional GET tokens are bumped here
+        change_tracker.mark_changed(User)
+
+
+class TeamImporter(Importer):
+    
+    def import_batch(self, batch):
+        rows = []
+        for line_number, record in batch:
+            try:
+                if not isinstance(record, dict):
+                    raise RowError('Malformed record.')
+                name = str(record.get('name') or '').strip()
+                if not name:
+                    raise RowError('Missing fields: name.')
+                creator_ids = parse_ids(record.get('created_by'))
+                if len(creator_ids) != 1:
+                    raise RowError('created_by must be a single user ID.')
+                member_ids = parse_ids(record.get('members') or record.get('member_ids'))
+                validate_model(Team(name=name), ['name'])
+                rows.append((line_number, name, creator_ids[0], set(member_ids)))
+            except RowError as e:
+                self.add_error(line_number, str(e))
+        
+        # All creator and member IDs of the batch are validated in one IN query
+        referenced = set()
+        for _, _, creator_id, member_ids in rows:
+            referenced.add(creator_id)
+            referenced.update(member_ids)
+        known = set(User.objects.filter(pk__in=referenced).values_list('pk', flat=True))
+        
+        teams = []
+        memberships = []
+        for line_number, name, creator_id, member_ids in rows:
+            unknown = sorted(({creator_id} | member_ids) - known)
+            if unknown:
+                self.add_error(line_number, f"Unknown user IDs: {', '.join(map(str, unknown))}.")
+                continue
+            teams.append(Team(name=name, created_by_id=creator_id))
+            memberships.append(member_ids)
+        
+        Team.objects.bulk_create(teams)
+        Membership = Team.members.through
+        Membership.objects.bulk_create([
+            Membership(team_id=team.pk, user_id=user_id)
+            for team, member_ids in zip(teams, memberships)
+            for user_id in member_ids
+        ])
+        self.created += len(teams)
+    
+    def mark_changed(self):
+        change_tracker.mark_changed(Team)
+        change_tracker.mark_changed(Team.members.through)
+
+
+IMPORTERS = {
+    'users': UserImporter,
+    'teams': TeamImporter,
+}
+
+
+def import_records(stream, kind, fmt, batch_size=None):
+    """Import users or teams from a text stream; returns a report dict."""
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unsupported kind '{kind}', expected users or teams.")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected csv or ndjson.")
+    return IMPORTERS[kind](batch_size=batch_size).run(iter_records(stream, fmt))
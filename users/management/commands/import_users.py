@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from users.importers import FORMATS, IMPORTERS, detect_format, import_records, open_text
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users or teams from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument(
+            '--kind',
+            choices=sorted(IMPORTERS),
+            default='users',
+            help='What the file contains (teams reference existing user IDs)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.USER_IMPORT_BATCH_SIZE,
+            help='Number of rows written per transaction',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        try:
+            with open(path, 'rb') as f:
+                report = import_records(
+                    open_text(f), options['kind'], fmt, batch_size=options['batch_size']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} {options['kind']}, {report['failed']} rows failed"
+            )
+        )
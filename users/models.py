@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from core.occupancy import CHILD_AGE, is_child, is_conference_eligible
+
 
 class User(AbstractUser):
     """
@@ -25,7 +27,7 @@ class User(AbstractUser):
     @property
     def is_child(self):
         """Children are defined as users under 10 years old."""
-        return self.age < 10
+        return is_child(self.age)
 
 
 class Team(models.Model):
@@ -49,13 +51,13 @@ class Team(models.Model):
     @property
     def adult_member_count(self):
         """Count of adult members (excluding children under 10)."""
-        return self.members.filter(age__gte=10).count()
+        return self.members.filter(age__gte=CHILD_AGE).count()
     
     @property
     def child_member_count(self):
         """Count of child members (under 10 years old)."""
-        return self.members.filter(age__lt=10).count()
+        return self.members.filter(age__lt=CHILD_AGE).count()
         
     def is_eligible_for_conference_room(self):
         """Teams need 3+ members to book conference rooms."""
-        return self.member_count >= 3
+        return is_conference_eligible(self.member_count)
@@ -0,0 +1,66 @@
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.importers import import_records
+from users.models import Team, User
+
+
+class DirectoryImportTests(TestCase):
+    """CSV and NDJSON imports create valid rows and report the rest by line."""
+    
+    def test_csv_users(self):
+        upload = SimpleUploadedFile('people.csv', (
+            'username,first_name,last_name,email,age,gender\n'
+            'ada,Ada,Lovelace,ada@example.com,36,F\n'
+            'grace,Grace,Hopper,grace@example.com,old,F\n'
+            'alan,Alan,Turing,,41,M\n'
+            'ada,Ada,Byron,ada2@example.com,36,F\n'
+            'edsger,Edsger,Dijkstra,edsger@example.com,72,m\n'
+        ).encode())
+        response = APIClient().post('/api/v1/users/import/', {'file': upload}, format='multipart')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'created': 2, 'failed': 3, 'errors': [
+            {'line': 3, 'error': 'age must be an integer.'},
+            {'line': 4, 'error': 'Missing fields: email.'},
+            {'line': 5, 'error': "Username 'ada' already exists."},
+        ]})
+        self.assertEqual(
+            list(User.objects.order_by('username').values_list('username', 'gender')),
+            [('ada', 'F'), ('edsger', 'M')],
+        )
+        self.assertFalse(User.objects.get(username='ada').has_usable_password())
+    
+    def test_ndjson_teams_with_memberships(self):
+        users = [
+            User.objects.create(username=name, age=30, gender='O') for name in ['ada', 'grace', 'alan']
+        ]
+        ids = [user.pk for user in users]
+        lines = [
+            {'name': 'Engine', 'created_by': ids[0], 'members': ids},
+            {'name': 'Compiler', 'created_by': ids[1], 'member_ids': f'{ids[1]};{ids[2]}'},
+            {'name': 'Ghosts', 'created_by': ids[0], 'members': [ids[0], 999]},
+            {'created_by': ids[0]},
+        ]
+        stream = io.StringIO('\n'.join(json.dumps(line) for line in lines) + '\n{not json\n')
+        report = import_records(stream, 'teams', 'ndjson', batch_size=2)
+        
+        self.assertEqual((report['created'], report['failed']), (2, 3))
+        self.assertCountEqual(report['errors'], [
+            {'line': 3, 'error': 'Unknown user IDs: 999.'},
+            {'line': 4, 'error': 'Missing fields: name.'},
+            {'line': 5, 'error': 'Malformed record.'},
+        ])
+        self.assertEqual(set(Team.objects.get(name='Engine').members.all()), set(users))
+        self.assertEqual(set(Team.objects.get(name='Compiler').members.all()), set(users[1:]))
+    
+    def test_unsupported_format_is_rejected(self):
+        upload = SimpleUploadedFile('people.txt', b'')
+        response = APIClient().post(
+            '/api/v1/users/import/', {'file': upload, 'format': 'xml'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import UserListCreateView, TeamListCreateView
+from .views import UserListCreateView, TeamListCreateView, import_directory
 
 urlpatterns = [
     path('users/', UserListCreateView.as_view(), name='user-list'),
     path('teams/', TeamListCreateView.as_view(), name='team-list'),
+    path('users/import/', import_directory, name='user-import'),
 ]
@@ -1,12 +1,18 @@
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from core.conditional import ConditionalGetMixin
+from .importers import detect_format, import_records, open_text
 from .models import User, Team
 from .serializers import UserSerializer, TeamSerializer
 
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create users."""
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    conditional_models = (User,)
 
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -15,10 +21,11 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
 
 
-class TeamListCreateView(generics.ListCreateAPIView):
+class TeamListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create teams."""
     queryset = Team.objects.all().prefetch_related('members')
     serializer_class = TeamSerializer
+    conditional_models = (Team, User)
     
     def perform_create(self, serializer):
         # For now, we'll use the first user as creator
@@ -42,4 +49,29 @@ class TeamListCreateView(generics.ListCreateAPIView):
 class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, or delete a team."""
     queryset = Team.objects.all().prefetch_related('members')
-    serializer_class = TeamSerializer
\ No newline at end of file
+    serializer_class = TeamSerializer
+
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser])
+def import_directory(request):
+    """
+    Bulk import users or teams from an uploaded CSV or NDJSON file.
+    
+    Large uploads are spooled to disk by Django and read line by line.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response(
+            {"error": "Upload a CSV or NDJSON file in the 'file' field."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    kind = request.data.get('kind', 'users')
+    fmt = request.data.get('format') or detect_format(upload.name)
+    try:
+        report = import_records(open_text(upload.file), kind, fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(report, status=status.HTTP_200_OK)